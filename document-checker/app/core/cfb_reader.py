@@ -0,0 +1,247 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import mmap
+import struct
+
+# Сигнатура составного файла (Compound File Binary, OLE2)
+CFB_SIGNATURE = b'\xD0\xCF\x11\xE0\xA1\xB1\x1A\xE1'
+
+# Специальные номера секторов
+FREE_SECTOR = 0xFFFFFFFF
+END_OF_CHAIN = 0xFFFFFFFE
+MAX_REGULAR_SECTOR = 0xFFFFFFFA
+
+# Отсутствующий элемент каталога
+NO_STREAM = 0xFFFFFFFF
+
+# Типы элементов каталога
+STORAGE_OBJECT = 1
+STREAM_OBJECT = 2
+ROOT_STORAGE_OBJECT = 5
+
+# Размер заголовка, элемента каталога и число ссылок DIFAT в заголовке
+HEADER_SIZE = 512
+DIRECTORY_ENTRY_SIZE = 128
+HEADER_DIFAT_ENTRIES = 109
+
+class DirectoryEntry:
+    """
+    Элемент каталога составного файла (хранилище или поток).
+    """
+    def __init__(self, data):
+        name_length = struct.unpack_from('<H', data, 64)[0]
+        self.name = data[:max(0, name_length - 2)].decode('utf-16-le', errors='replace')
+        self.entry_type = data[66]
+        self.left, self.right, self.child = struct.unpack_from('<III', data, 68)
+        self.start_sector = struct.unpack_from('<I', data, 116)[0]
+        self.size = struct.unpack_from('<Q', data, 120)[0]
+
+class CompoundFile:
+    """
+    Чтение потоков составного файла (формат OLE2 / CFB: .doc, .xls).
+
+    Файл отображается в память, таблицы размещения (FAT, MiniFAT) и каталог
+    читаются один раз при открытии, поток собирается по цепочке секторов
+    только при обращении к нему.
+    """
+    def __init__(self, file_path):
+        self._file = open(file_path, 'rb')
+        try:
+            self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Пустой файл не отображается в память
+            self._file.close()
+            raise ValueError("Файл не является составным документом OLE2")
+
+        try:
+            self._read_header()
+            self._read_fat()
+            self._read_directory()
+            self._read_mini_fat()
+        except Exception:
+            self.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Освобождает отображение файла"""
+        if self._data is not None:
+            self._data.close()
+            self._data = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _read_header(self):
+        """Разбирает заголовок составного файла"""
+        data = self._data
+        if len(data) < HEADER_SIZE or data[:8] != CFB_SIGNATURE:
+            raise ValueError("Файл не является составным документом OLE2")
+
+        self.sector_size = 1 << struct.unpack_from('<H', data, 0x1E)[0]
+        self.mini_sector_size = 1 << struct.unpack_from('<H', data, 0x20)[0]
+        self._fat_sector_count = struct.unpack_from('<I', data, 0x2C)[0]
+        self._first_directory_sector = struct.unpack_from('<I', data, 0x30)[0]
+        self.mini_stream_cutoff = struct.unpack_from('<I', data, 0x38)[0]
+        self._first_mini_fat_sector = struct.unpack_from('<I', data, 0x3C)[0]
+        self._first_difat_sector = struct.unpack_from('<I', data, 0x44)[0]
+        self._difat_sector_count = struct.unpack_from('<I', data, 0x48)[0]
+        self._header_difat = struct.unpack_from('<%dI' % HEADER_DIFAT_ENTRIES, data, 0x4C)
+
+        if self.sector_size not in (512, 4096):
+            raise ValueError("Неподдерживаемый размер сектора составного файла")
+
+        # Число секторов в файле - предел длины любой цепочки
+        self._sector_count = max(0, (len(data) - HEADER_SIZE) // self.sector_size)
+
+    def _sector(self, sector_id):
+        """Возвращает содержимое сектора"""
+        if sector_id >= self._sector_count:
+            raise ValueError("Ссылка на сектор за пределами файла")
+        offset = (sector_id + 1) * self.sector_size
+        return self._data[offset:offset + self.sector_size]
+
+    def _read_fat(self):
+        """Собирает таблицу размещения секторов по DIFAT"""
+        fat_sectors = [sid for sid in self._header_difat if sid <= MAX_REGULAR_SECTOR]
+
+        # Продолжение DIFAT в отдельных секторах: последняя ссылка сектора - следующий сектор DIFAT
+        per_sector = self.sector_size // 4 - 1
+        sector_id = self._first_difat_sector
+        for _ in range(self._difat_sector_count):
+            if sector_id > MAX_REGULAR_SECTOR:
+                break
+            entries = struct.unpack('<%dI' % (per_sector + 1), self._sector(sector_id))
+            fat_sectors.extend(sid for sid in entries[:per_sector] if sid <= MAX_REGULAR_SECTOR)
+            sector_id = entries[per_sector]
+
+        fat_sectors = fat_sectors[:self._fat_sector_count]
+        count = self.sector_size // 4
+        self._fat = []
+        for sector_id in fat_sectors:
+            self._fat.extend(struct.unpack('<%dI' % count, self._sector(sector_id)))
+
+    def _chain(self, start_sector, table, limit):
+        """
+        Возвращает цепочку секторов по таблице размещения.
+
+        Args:
+            start_sector (int): Первый сектор
+            table (list): FAT или MiniFAT
+            limit (int): Наибольшая допустимая длина цепочки (защита от циклов)
+
+        Returns:
+            list: Номера секторов цепочки
+        """
+        chain = []
+        sector_id = start_sector
+        while sector_id <= MAX_REGULAR_SECTOR:
+            if len(chain) >= limit or sector_id >= len(table):
+                raise ValueError("Поврежденная цепочка секторов составного файла")
+            chain.append(sector_id)
+            sector_id = table[sector_id]
+        return chain
+
+    def _read_chain(self, start_sector, size=None):
+        """Читает данные по цепочке обычных секторов"""
+        chain = self._chain(start_sector, self._fat, self._sector_count)
+        data = b''.join(self._sector(sector_id) for sector_id in chain)
+        return data if size is None else data[:size]
+
+    def _read_directory(self):
+        """Читает каталог составного файла"""
+        directory = self._read_chain(self._first_directory_sector)
+        self._entries = [DirectoryEntry(directory[offset:offset + DIRECTORY_ENTRY_SIZE])
+                         for offset in range(0, len(directory) - DIRECTORY_ENTRY_SIZE + 1, DIRECTORY_ENTRY_SIZE)]
+
+        # В версии 3 (сектор 512 байт) старшие 32 бита размера потока не используются
+        if self.sector_size == 512:
+            for entry in self._entries:
+                entry.size &= 0xFFFFFFFF
+
+        if not self._entries or self._entries[0].entry_type != ROOT_STORAGE_OBJECT:
+            raise ValueError("В составном файле отсутствует корневой каталог")
+
+    def _read_mini_fat(self):
+        """Читает таблицу размещения мини-секторов и мини-поток корневого каталога"""
+        self._mini_fat = []
+        self._mini_stream = b''
+        if self._first_mini_fat_sector > MAX_REGULAR_SECTOR:
+            return
+
+        mini_fat = self._read_chain(self._first_mini_fat_sector)
+        self._mini_fat = list(struct.unpack('<%dI' % (len(mini_fat) // 4), mini_fat))
+
+        root = self._entries[0]
+        if root.start_sector <= MAX_REGULAR_SECTOR:
+            self._mini_stream = self._read_chain(root.start_sector, root.size)
+
+    def _children(self, entry):
+        """Возвращает дочерние элементы хранилища (обход дерева каталога)"""
+        children = []
+        pending = [entry.child]
+        visited = set()
+        while pending:
+            index = pending.pop()
+            if index == NO_STREAM or index in visited or index >= len(self._entries):
+                continue
+            visited.add(index)
+            child = self._entries[index]
+            children.append(child)
+            pending.extend((child.left, child.right))
+        return children
+
+    def find_entry(self, path):
+        """
+        Находит элемент каталога по пути.
+
+        Args:
+            path (str): Путь вида 'WordDocument' или 'ObjectPool/_123/Ole'
+
+        Returns:
+            DirectoryEntry: Элемент каталога или None, если его нет
+        """
+        entry = self._entries[0]
+        for name in path.split('/'):
+            name = name.lower()
+            entry = next((child for child in self._children(entry) if child.name.lower() == name), None)
+            if entry is None:
+                return None
+        return entry
+
+    def has_stream(self, path):
+        """Проверяет наличие потока по пути"""
+        entry = self.find_entry(path)
+        return entry is not None and entry.entry_type == STREAM_OBJECT
+
+    def read_stream(self, path):
+        """
+        Читает поток целиком.
+
+        Args:
+            path (str): Путь к потоку
+
+        Returns:
+            bytes: Содержимое потока
+
+        Raises:
+            KeyError: Если потока нет
+        """
+        entry = self.find_entry(path)
+        if entry is None or entry.entry_type != STREAM_OBJECT:
+            raise KeyError(path)
+
+        if entry.size < self.mini_stream_cutoff:
+            # Небольшие потоки хранятся в мини-потоке корневого каталога
+            limit = len(self._mini_stream) // self.mini_sector_size + 1
+            chain = self._chain(entry.start_sector, self._mini_fat, limit)
+            size = self.mini_sector_size
+            data = b''.join(self._mini_stream[sector_id * size:(sector_id + 1) * size] for sector_id in chain)
+            return data[:entry.size]
+
+        return self._read_chain(entry.start_sector, entry.size)
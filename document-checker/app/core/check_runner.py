@@ -0,0 +1,243 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import hashlib
+import json
+import os
+
+from app.core.com_pool import ComFallbackDeferred, defer_com_fallback
+from app.core.excel_checker import check_excel_file
+from app.core.file_utils import detect_file_size_category, get_file_type, is_locked_file
+from app.core.word_checker import check_word_file
+from app.utils.threading_utils import check_cancelled, report_phase
+
+# Режимы выполнения проверки
+EXECUTION_AUTO = "auto"
+EXECUTION_THREADS = "threads"
+EXECUTION_PROCESSES = "processes"
+
+# В автоматическом режиме процессы запускаются, если файлов не меньше этого числа
+PROCESS_MODE_MIN_FILES = 16
+
+# Наибольшее число файлов в одной порции для процесса-исполнителя
+MAX_CHUNK_SIZE = 32
+
+# Окно отправки: одновременно в работе не больше этого числа файлов (потоки)
+# или порций (процессы) на одного рабочего; остальные файлы ждут в очереди поиска
+FILES_IN_FLIGHT_PER_WORKER = 4
+CHUNKS_IN_FLIGHT_PER_WORKER = 2
+
+# Сколько найденных файлов ожидают отправки: среди них планировщик выбирает
+# самые трудоемкие, поэтому окно больше числа задач в работе
+PENDING_FILES_LIMIT = 1024
+
+# Потоки для проверки через Office: приложения Office обрабатывают документы
+# практически последовательно, поэтому эти файлы проверяются отдельно от остальных
+OFFICE_LANE_WORKERS = 2
+
+# Лимиты на проверку одного файла по умолчанию: время (в секундах) и память
+# процесса-исполнителя (в МБ); 0 - без ограничения
+DEFAULT_FILE_TIMEOUT = 300
+DEFAULT_MAX_MEMORY_MB = 2048
+
+# Версия правил проверки: входит в хэш настроек, поэтому при ее увеличении
+# результаты из кэша прошлых версий не используются
+CHECKS_VERSION = 1
+
+class CheckPlan:
+    """
+    Настройки проверки одного запуска.
+
+    Содержит только простые значения, поэтому передается в процессы-исполнители
+    (сериализуется pickle) вместо объекта приложения с переменными tkinter.
+    Лимиты времени и памяти на файл не влияют на результат и не входят в хэш настроек.
+    """
+    def __init__(self, enable_value_search=False, search_values=None, first_issue_only=False,
+                 skip_large_files=True, file_timeout=0, max_memory_mb=0):
+        self.enable_value_search = enable_value_search
+        self.search_values = list(search_values or [])
+        self.first_issue_only = first_issue_only
+        self.skip_large_files = skip_large_files
+        self.file_timeout = file_timeout
+        self.max_memory_mb = max_memory_mb
+
+    def settings_hash(self):
+        """
+        Хэш настроек, влияющих на результат проверки файла (ключ кэша результатов).
+
+        Returns:
+            str: Шестнадцатеричный хэш
+        """
+        settings = {
+            'version': CHECKS_VERSION,
+            'search_values': self.search_values if self.enable_value_search else [],
+            'first_issue_only': self.first_issue_only,
+            'skip_large_files': self.skip_large_files
+        }
+        return hashlib.sha256(json.dumps(settings, ensure_ascii=False, sort_keys=True).encode('utf-8')).hexdigest()
+
+def check_file(file_path, file_name, plan, file_size=None, cancel_token=None):
+    """
+    Проверяет файл в соответствии с его типом.
+
+    Args:
+        file_path (str): Путь к файлу
+        file_name (str): Имя файла
+        plan (CheckPlan): Настройки проверки
+        file_size (int, optional): Размер файла, если уже известен из обхода папки
+        cancel_token (CancellationToken, optional): Признак отмены проверки
+
+    Returns:
+        dict: Результат проверки
+
+    Raises:
+        CheckCancelled: Если проверка отменена, пока файл проверялся
+    """
+    check_cancelled(cancel_token)
+    file_type = get_file_type(file_path)
+
+    # Проверка, не заблокирован ли файл
+    report_phase("проверка доступа к файлу")
+    if is_locked_file(file_path):
+        return {
+            'file_name': file_name,
+            'file_type': file_type,
+            'file_path': file_path,
+            'result': "Ошибка",
+            'comment': "Файл заблокирован другим процессом"
+        }
+
+    # Определяем категорию размера файла
+    if file_size is None:
+        file_size = os.path.getsize(file_path)
+    size_category = detect_file_size_category(file_path, file_size)
+
+    # Добавляем размер в информацию о файле для логирования
+    file_size_mb = file_size / (1024 * 1024)
+    file_size_str = f"{file_size_mb:.2f} МБ"
+
+    # При очень больших файлах (>100 МБ) и если выбрана опция пропуска больших файлов
+    if size_category == "very_large" and plan.skip_large_files:
+        return {
+            'file_name': file_name,
+            'file_type': file_type,
+            'file_path': file_path,
+            'result': "Пропущен",
+            'comment': f"Файл слишком большой ({file_size_str}). Пропущен согласно настройкам."
+        }
+
+    # Значения для поиска разобраны один раз на запуск проверки
+    enable_search = plan.enable_value_search
+    search_values = plan.search_values if enable_search else []
+
+    # Проверяем файл в соответствии с его типом
+    if file_type == "Word":
+        return check_word_file(file_path, file_name, enable_search, search_values, plan.first_issue_only, cancel_token)
+    elif file_type == "Excel":
+        return check_excel_file(file_path, file_name, enable_search, search_values, plan.first_issue_only, cancel_token)
+    else:
+        return {
+            'file_name': file_name,
+            'file_type': "Неизвестный",
+            'file_path': file_path,
+            'result': "Ошибка",
+            'comment': "Неподдерживаемый тип файла"
+        }
+
+def init_process_worker():
+    """
+    Инициализация процесса-исполнителя. Модули проверки уже импортированы
+    вместе с этим модулем и остаются загруженными между запусками; Office
+    в процессах не запускается - такие файлы возвращаются основному процессу.
+    """
+    defer_com_fallback(True)
+
+def check_files_chunk(chunk, plan, on_result=None):
+    """
+    Проверяет порцию файлов в процессе-исполнителе.
+
+    Args:
+        chunk (list): Тройки (индекс файла, путь к файлу, размер файла или None)
+        plan (CheckPlan): Настройки проверки
+        on_result (callable, optional): Вызывается с (индекс, путь, результат) сразу после
+                                        проверки каждого файла, не дожидаясь конца порции
+
+    Returns:
+        list: Тройки (индекс файла, путь к файлу, результат); результат None означает,
+              что файл нужно проверить через Office в основном процессе
+    """
+    results = []
+    for file_index, file_path, file_size in chunk:
+        file_name = os.path.basename(file_path)
+        try:
+            result = check_file(file_path, file_name, plan, file_size)
+        except ComFallbackDeferred:
+            result = None
+        except Exception as e:
+            result = {
+                'file_name': file_name,
+                'file_type': get_file_type(file_path),
+                'file_path': file_path,
+                'result': "Ошибка",
+                'comment': f"Ошибка проверки: {str(e)}"
+            }
+        results.append((file_index, file_path, result))
+        if on_result is not None:
+            on_result(file_index, file_path, result)
+    return results
+
+def make_interrupted_result(file_path, result, comment):
+    """
+    Результат файла, проверка которого прервана (превышен лимит или сбой процесса).
+
+    Args:
+        file_path (str): Путь к файлу
+        result (str): Итог проверки ("Тайм-аут" или "Ошибка")
+        comment (str): Причина с этапом, на котором проверка была прервана
+
+    Returns:
+        dict: Результат проверки
+    """
+    return {
+        'file_name': os.path.basename(file_path),
+        'file_type': get_file_type(file_path),
+        'file_path': file_path,
+        'result': result,
+        'comment': comment
+    }
+
+def in_flight_limits(max_workers):
+    """
+    Размеры окна отправки задач для числа рабочих.
+
+    Args:
+        max_workers (int): Число рабочих
+
+    Returns:
+        tuple: (наибольшее число файлов в потоках, наибольшее число порций в процессах,
+                наибольшее число найденных, но не отправленных файлов)
+    """
+    files_limit = max(1, max_workers) * FILES_IN_FLIGHT_PER_WORKER
+    chunks_limit = max(1, max_workers) * CHUNKS_IN_FLIGHT_PER_WORKER
+    return files_limit, chunks_limit, max(files_limit, PENDING_FILES_LIMIT)
+
+def resolve_execution_mode(mode, files_count, max_workers):
+    """
+    Выбирает исполнителя проверки.
+
+    В автоматическом режиме файлы разбираются процессами (разбор удерживает GIL,
+    потоки почти не дают ускорения), если файлов и рабочих достаточно; проверка
+    через Office всегда выполняется потоками основного процесса.
+
+    Args:
+        mode (str): EXECUTION_AUTO, EXECUTION_THREADS или EXECUTION_PROCESSES
+        files_count (int): Число файлов для проверки
+        max_workers (int): Число рабочих
+
+    Returns:
+        str: EXECUTION_THREADS или EXECUTION_PROCESSES
+    """
+    if mode == EXECUTION_AUTO:
+        if max_workers > 1 and files_count >= PROCESS_MODE_MIN_FILES:
+            return EXECUTION_PROCESSES
+        return EXECUTION_THREADS
+    return mode if mode in (EXECUTION_THREADS, EXECUTION_PROCESSES) else EXECUTION_THREADS
@@ -0,0 +1,233 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import colorsys
+from functools import lru_cache
+
+# Названия классов цветов
+YELLOW = 'yellow'
+RED = 'red'
+GREEN = 'green'
+BLUE = 'blue'
+
+# Правила классификации в пространстве HSV:
+# (класс, оттенок от, оттенок до (градусы), мин. насыщенность, мин. яркость)
+# Диапазон оттенка красного переходит через 0, поэтому задан двумя правилами.
+# Порог насыщенности желтого включает светло-желтый FFFFCC (насыщенность 0.2)
+COLOR_RULES = [
+    (RED, 0, 15, 0.5, 0.5),
+    (RED, 340, 360, 0.5, 0.5),
+    (YELLOW, 45, 70, 0.18, 0.6),
+    (GREEN, 85, 160, 0.4, 0.4),
+    (BLUE, 200, 250, 0.4, 0.4)
+]
+
+# Стандартная палитра Excel (индексы 0-63)
+DEFAULT_INDEXED_COLORS = [
+    '000000', 'FFFFFF', 'FF0000', '00FF00', '0000FF', 'FFFF00', 'FF00FF', '00FFFF',
+    '000000', 'FFFFFF', 'FF0000', '00FF00', '0000FF', 'FFFF00', 'FF00FF', '00FFFF',
+    '800000', '008000', '000080', '808000', '800080', '008080', 'C0C0C0', '808080',
+    '9999FF', '993366', 'FFFFCC', 'CCFFFF', '660066', 'FF8080', '0066CC', 'CCCCFF',
+    '000080', 'FF00FF', 'FFFF00', '00FFFF', '800080', '800000', '008080', '0000FF',
+    '00CCFF', 'CCFFFF', 'CCFFCC', 'FFFF99', '99CCFF', 'FF99CC', 'CC99FF', 'FFCC99',
+    '3366FF', '33CCCC', '99CC00', 'FFCC00', 'FF9900', 'FF6600', '666699', '969696',
+    '003366', '339966', '003300', '333300', '993300', '993366', '333399', '333333'
+]
+
+# Смещение ColorIndex Excel (COM, 1-56) относительно индексов палитры
+COM_COLOR_INDEX_OFFSET = 7
+
+# Стандартные цвета Office (нижний ряд палитры выбора цвета)
+OFFICE_STANDARD_COLORS = [
+    'C00000', 'FF0000', 'FFC000', 'FFFF00', '92D050', '00B050', '00B0F0', '0070C0', '002060', '7030A0'
+]
+
+@lru_cache(maxsize=4096)
+def classify_rgb(rgb):
+    """
+    Определяет класс цвета по таблице правил HSV.
+    Результат кэшируется для каждого различного цвета.
+
+    Args:
+        rgb (tuple): Цвет (r, g, b)
+
+    Returns:
+        str: Класс цвета (YELLOW, RED, ...) или None, если цвет не отслеживается
+    """
+    if rgb is None:
+        return None
+    h, s, v = colorsys.rgb_to_hsv(*(channel / 255.0 for channel in rgb))
+    hue = h * 360
+    for name, hue_from, hue_to, min_saturation, min_value in COLOR_RULES:
+        if hue_from <= hue <= hue_to and s >= min_saturation and v >= min_value:
+            return name
+    return None
+
+def parse_hex_color(value):
+    """
+    Переводит цвет вида 'FFRRGGBB' или 'RRGGBB' в кортеж (r, g, b).
+
+    Returns:
+        tuple: (r, g, b) или None, если значение некорректно
+    """
+    if not value or not isinstance(value, str):
+        return None
+    value = value.strip()[-6:]
+    if len(value) != 6:
+        return None
+    try:
+        return (int(value[0:2], 16), int(value[2:4], 16), int(value[4:6], 16))
+    except ValueError:
+        return None
+
+def classify_hex(value):
+    """Определяет класс цвета, заданного строкой 'RRGGBB' или 'AARRGGBB'"""
+    return classify_rgb(parse_hex_color(value))
+
+def com_color_to_rgb(value):
+    """
+    Переводит цвет COM (число в формате BGR) в кортеж (r, g, b).
+
+    Returns:
+        tuple: (r, g, b) или None, если цвет не задан
+    """
+    if value is None or value < 0:
+        return None
+    value = int(value)
+    return (value % 256, (value // 256) % 256, (value // 65536) % 256)
+
+def classify_com_color(color=None, color_index=None):
+    """
+    Определяет класс цвета, полученного через COM (Interior, Tab и т.п.).
+
+    Args:
+        color (int, optional): Значение свойства Color (BGR)
+        color_index (int, optional): Значение свойства ColorIndex (1-56)
+
+    Returns:
+        str: Класс цвета или None
+    """
+    if isinstance(color_index, int) and 1 <= color_index <= 56:
+        return classify_hex(DEFAULT_INDEXED_COLORS[color_index + COM_COLOR_INDEX_OFFSET])
+    if isinstance(color, (int, float)):
+        return classify_rgb(com_color_to_rgb(color))
+    return None
+
+def rgb_to_com_color(rgb):
+    """Переводит кортеж (r, g, b) в цвет COM (число в формате BGR)"""
+    r, g, b = rgb
+    return r + g * 256 + b * 65536
+
+@lru_cache(maxsize=16)
+def com_colors_of_class(color_class):
+    """
+    Возвращает цвета COM стандартной палитры и стандартных цветов Office,
+    относящиеся к классу. Используется для поиска по формату (FindFormat),
+    которому нужен точный цвет, а не класс.
+
+    Args:
+        color_class (str): Класс цвета (YELLOW, RED, ...)
+
+    Returns:
+        tuple: Цвета в формате BGR без повторов
+    """
+    colors = []
+    for value in DEFAULT_INDEXED_COLORS + OFFICE_STANDARD_COLORS:
+        if classify_hex(value) == color_class:
+            color = rgb_to_com_color(parse_hex_color(value))
+            if color not in colors:
+                colors.append(color)
+    return tuple(colors)
+
+def apply_tint(rgb, tint):
+    """
+    Применяет к цвету оттенок (tint) по правилам Office.
+
+    Args:
+        rgb (tuple): Исходный цвет (r, g, b)
+        tint (float): Оттенок от -1 (темнее) до 1 (светлее)
+
+    Returns:
+        tuple: Итоговый цвет (r, g, b)
+    """
+    if not tint:
+        return rgb
+    h, l, s = colorsys.rgb_to_hls(*(channel / 255.0 for channel in rgb))
+    if tint < 0:
+        l = l * (1.0 + tint)
+    else:
+        l = l * (1.0 - tint) + tint
+    return tuple(int(round(channel * 255)) for channel in colorsys.hls_to_rgb(h, l, s))
+
+class WorkbookColors:
+    """
+    Разрешение цветов книги Excel (индексированная палитра, тема, RGB с оттенком)
+    и их классификация. Создается один раз на книгу, результаты кэшируются
+    для каждого различного описания цвета.
+    """
+    def __init__(self, indexed_colors=None, theme_colors=None):
+        self.indexed_colors = indexed_colors or DEFAULT_INDEXED_COLORS
+        self.theme_colors = theme_colors or []
+        self._cache = {}
+
+    def set_indexed_colors(self, indexed_colors):
+        """Заменяет палитру книги (например, из indexedColors в styles.xml)"""
+        self.indexed_colors = indexed_colors
+        self._cache.clear()
+
+    def resolve_attrs(self, rgb=None, indexed=None, theme=None, tint=0):
+        """
+        Переводит описание цвета в RGB.
+
+        Args:
+            rgb (str, optional): Цвет 'AARRGGBB' или 'RRGGBB'
+            indexed (int, optional): Индекс палитры
+            theme (int, optional): Индекс цвета темы
+            tint (float): Оттенок
+
+        Returns:
+            tuple: (r, g, b) или None, если цвет не удалось определить
+        """
+        key = (rgb, indexed, theme, tint)
+        if key in self._cache:
+            return self._cache[key]
+
+        resolved = None
+        if rgb:
+            resolved = parse_hex_color(rgb)
+        elif indexed is not None:
+            if 0 <= indexed < len(self.indexed_colors):
+                resolved = parse_hex_color(self.indexed_colors[indexed])
+        elif theme is not None:
+            if 0 <= theme < len(self.theme_colors):
+                resolved = parse_hex_color(self.theme_colors[theme])
+
+        if resolved is not None and tint:
+            resolved = apply_tint(resolved, tint)
+
+        self._cache[key] = resolved
+        return resolved
+
+    def resolve(self, color):
+        """
+        Переводит XML-элемент цвета (fgColor, tabColor и т.п.) в RGB.
+
+        Args:
+            color (Element): Элемент с атрибутами rgb, indexed, theme, tint
+
+        Returns:
+            tuple: (r, g, b) или None, если цвет не задан или автоматический
+        """
+        if color is None or color.get('auto') in ('1', 'true'):
+            return None
+        indexed = color.get('indexed')
+        theme = color.get('theme')
+        return self.resolve_attrs(
+            rgb=color.get('rgb'),
+            indexed=int(indexed) if indexed is not None else None,
+            theme=int(theme) if theme is not None else None,
+            tint=float(color.get('tint', 0) or 0)
+        )
+
+    def classify(self, color):
+        """Определяет класс XML-элемента цвета (см. classify_rgb)"""
+        return classify_rgb(self.resolve(color))
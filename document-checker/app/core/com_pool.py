@@ -0,0 +1,556 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import os
+import signal
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from queue import Empty, Queue
+
+from app.utils.threading_utils import CheckCancelled, check_cancelled
+
+try:
+    import pythoncom
+    import win32com.client
+except ImportError:
+    # Вне Windows доступен только тестовый бэкенд (FakeOfficeBackend)
+    pythoncom = None
+
+# Названия приложений Office
+WORD_APPLICATION = "Word"
+EXCEL_APPLICATION = "Excel"
+
+# Сколько документов открывает один экземпляр приложения до перезапуска
+DEFAULT_MAX_DOCUMENTS = 50
+
+# Предельное время открытия одного документа (в секундах)
+DEFAULT_OPEN_TIMEOUT = 60
+
+# Сколько ждать штатного завершения экземпляра при остановке пула (в секундах)
+SHUTDOWN_TIMEOUT = 10
+
+# Как часто при ожидании документа опрашивается признак отмены (в секундах)
+CANCEL_POLL_INTERVAL = 0.05
+
+# Ошибки COM, при которых проверка документа считается невозможной
+COM_ERRORS = (pythoncom.com_error,) if pythoncom is not None else ()
+
+class ComFallbackDeferred(Exception):
+    """
+    Проверка через Office отложена: процесс не запускает приложения Office,
+    файл должен быть проверен в основном процессе.
+    """
+
+class OfficeBackend(ABC):
+    """
+    Интерфейс приложения Office для пула экземпляров.
+
+    Все методы, кроме terminate, вызываются только из потока экземпляра.
+    Бэкенд, в котором реализованы не все методы, нельзя создать.
+    """
+    app_name = None
+
+    @abstractmethod
+    def start(self):
+        """Запускает приложение"""
+
+    @abstractmethod
+    def open_document(self, file_path):
+        """Открывает документ только для чтения и возвращает его объект"""
+
+    @abstractmethod
+    def close_document(self, document):
+        """Закрывает документ без сохранения"""
+
+    @abstractmethod
+    def is_alive(self):
+        """Проверяет, что приложение отвечает"""
+
+    @abstractmethod
+    def quit(self):
+        """Завершает приложение штатно"""
+
+    @abstractmethod
+    def terminate(self):
+        """Принудительно завершает приложение (может вызываться из другого потока)"""
+
+class Win32OfficeBackend(OfficeBackend):
+    """
+    Общая часть бэкендов Word и Excel через win32com.
+    """
+    prog_id = None
+
+    def __init__(self):
+        self.app = None
+        self.process_id = None
+
+    def start(self):
+        if pythoncom is None:
+            raise RuntimeError("win32com недоступен")
+        pythoncom.CoInitialize()
+        try:
+            # Отдельный процесс, а не уже открытое пользователем приложение
+            self.app = win32com.client.DispatchEx(self.prog_id)
+            self.configure()
+        except Exception:
+            self.app = None
+            pythoncom.CoUninitialize()
+            raise
+        try:
+            self.process_id = self.find_process_id()
+        except Exception:
+            self.process_id = None
+
+    def configure(self):
+        """Настраивает приложение для фоновой работы"""
+        self.app.Visible = False
+        self.app.DisplayAlerts = False
+
+    def find_process_id(self):
+        """Определяет идентификатор процесса приложения (для принудительного завершения)"""
+        return None
+
+    def is_alive(self):
+        try:
+            return bool(self.app.Name)
+        except Exception:
+            return False
+
+    def quit(self):
+        try:
+            if self.app is not None:
+                self.app.Quit()
+        finally:
+            self.app = None
+            pythoncom.CoUninitialize()
+
+    def terminate(self):
+        if self.process_id:
+            try:
+                os.kill(self.process_id, signal.SIGTERM)
+            except OSError:
+                pass
+
+class Win32WordBackend(Win32OfficeBackend):
+    """Microsoft Word через win32com"""
+    app_name = WORD_APPLICATION
+    prog_id = "Word.Application"
+
+    def configure(self):
+        super().configure()
+        self.app.AutomationSecurity = 3  # msoAutomationSecurityForceDisable - отключаем макросы
+
+    def find_process_id(self):
+        import win32gui
+        import win32process
+        # У Word нет свойства Hwnd: находим окно по уникальному заголовку
+        caption = f"document-checker-{uuid.uuid4().hex}"
+        self.app.Caption = caption
+        hwnd = win32gui.FindWindow("OpusApp", caption)
+        return win32process.GetWindowThreadProcessId(hwnd)[1] if hwnd else None
+
+    def open_document(self, file_path):
+        return self.app.Documents.Open(
+            file_path,
+            ReadOnly=True,              # Только для чтения
+            AddToRecentFiles=False,     # Не добавлять в список недавних
+            Visible=False,              # Невидимый режим
+            OpenAndRepair=False,        # Не пытаться восстанавливать
+            DoNotLoadVbaAndOpenDocm=True # Не загружать VBA для DOCM
+        )
+
+    def close_document(self, document):
+        document.Close(SaveChanges=False)
+
+class Win32ExcelBackend(Win32OfficeBackend):
+    """Microsoft Excel через win32com"""
+    app_name = EXCEL_APPLICATION
+    prog_id = "Excel.Application"
+
+    def configure(self):
+        super().configure()
+        self.app.ScreenUpdating = False  # Выключаем обновление экрана для ускорения
+
+    def find_process_id(self):
+        import win32process
+        return win32process.GetWindowThreadProcessId(self.app.Hwnd)[1]
+
+    def open_document(self, file_path):
+        return self.app.Workbooks.Open(file_path, ReadOnly=True, UpdateLinks=False)
+
+    def close_document(self, document):
+        document.Close(False)
+
+class FakeOfficeBackend(OfficeBackend):
+    """
+    Бэкенд без Office для тестов и замеров на любой платформе.
+
+    Имитирует время запуска приложения и открытия документа; объект документа
+    строит переданная фабрика.
+    """
+    def __init__(self, app_name, document_factory=None, start_delay=0.0, open_delay=0.0):
+        self.app_name = app_name
+        self.document_factory = document_factory
+        self.start_delay = start_delay
+        self.open_delay = open_delay
+        self.alive = False
+        self._terminated = threading.Event()
+
+    def start(self):
+        time.sleep(self.start_delay)
+        self.alive = True
+
+    def open_document(self, file_path):
+        # Прерывание ожидания имитирует гибель процесса при принудительном завершении
+        if self._terminated.wait(self.open_delay):
+            self.alive = False
+            raise RuntimeError("Приложение завершено принудительно")
+        if self.document_factory is not None:
+            return self.document_factory(file_path)
+        return file_path
+
+    def close_document(self, document):
+        pass
+
+    def is_alive(self):
+        return self.alive
+
+    def quit(self):
+        self.alive = False
+
+    def terminate(self):
+        self._terminated.set()
+
+class OfficeJob:
+    """Задание на обработку одного документа экземпляром приложения"""
+    def __init__(self, file_path, handler):
+        self.file_path = file_path
+        self.handler = handler
+        self.opened = threading.Event()
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class OfficeInstance:
+    """
+    Один экземпляр приложения Office в собственном потоке.
+
+    Объекты COM привязаны к потоку, в котором созданы, поэтому приложение
+    запускается, используется и завершается только в потоке экземпляра.
+    Приложение перезапускается после max_documents документов, после ошибки
+    и если перестало отвечать.
+    """
+    def __init__(self, backend_factory, max_documents, name):
+        self._backend_factory = backend_factory
+        self.max_documents = max_documents
+        self.backend = None
+
+        # Статистика экземпляра
+        self.starts = 0
+        self.documents_processed = 0
+        self._documents_since_start = 0
+
+        self._jobs = Queue()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, job):
+        """Передает задание в поток экземпляра"""
+        self._jobs.put(job)
+
+    def stop(self):
+        """Завершает поток экземпляра после текущих заданий"""
+        self._jobs.put(None)
+
+    def join(self, timeout=None):
+        """Ожидает завершения потока экземпляра"""
+        self._thread.join(timeout)
+
+    def terminate(self):
+        """Принудительно завершает приложение, зависшее при открытии документа"""
+        backend = self.backend
+        if backend is not None:
+            backend.terminate()
+
+    def _run(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                break
+            self._execute(job)
+        self._stop_backend()
+
+    def _ensure_backend(self):
+        """Запускает приложение или перезапускает его, если оно не отвечает"""
+        if self.backend is not None and not self.backend.is_alive():
+            self._stop_backend()
+        if self.backend is None:
+            backend = self._backend_factory()
+            backend.start()
+            self.backend = backend
+            self.starts += 1
+            self._documents_since_start = 0
+
+    def _stop_backend(self):
+        """Завершает приложение, игнорируя ошибки уже завершенного процесса"""
+        backend = self.backend
+        self.backend = None
+        if backend is not None:
+            try:
+                backend.quit()
+            except Exception:
+                pass
+
+    def _execute(self, job):
+        try:
+            self._ensure_backend()
+            document = self.backend.open_document(job.file_path)
+            job.opened.set()
+            try:
+                job.result = job.handler(document)
+            finally:
+                self.backend.close_document(document)
+
+            self.documents_processed += 1
+            self._documents_since_start += 1
+            if self._documents_since_start >= self.max_documents:
+                self._stop_backend()
+        except CheckCancelled as e:
+            # Проверка отменена обработчиком - документ уже закрыт, приложение остается рабочим
+            job.error = e
+        except Exception as e:
+            # После любой ошибки приложение перезапускается для следующего документа
+            job.error = e
+            self._stop_backend()
+        finally:
+            job.opened.set()
+            job.done.set()
+
+class OfficeInstancePool:
+    """
+    Пул долгоживущих экземпляров одного приложения Office.
+
+    Экземпляры создаются по мере необходимости, но не больше size (по числу
+    рабочих потоков проверки), и переиспользуются для следующих документов,
+    поэтому запуск приложения (несколько секунд) не повторяется для каждого файла.
+    """
+    def __init__(self, app_name, backend_factory, size=1, max_documents=DEFAULT_MAX_DOCUMENTS,
+                 open_timeout=DEFAULT_OPEN_TIMEOUT, job_timeout=None):
+        self.app_name = app_name
+        self.backend_factory = backend_factory
+        self.size = max(1, size)
+        self.max_documents = max_documents
+        self.open_timeout = open_timeout
+        self.job_timeout = job_timeout
+
+        self._instances = []
+        self._idle = Queue()
+        self._lock = threading.Lock()
+
+    @property
+    def instances_started(self):
+        """Сколько раз запускалось приложение во всех экземплярах"""
+        return sum(instance.starts for instance in self._instances)
+
+    @property
+    def documents_processed(self):
+        """Сколько документов обработали экземпляры пула"""
+        return sum(instance.documents_processed for instance in self._instances)
+
+    def _acquire(self):
+        """Возвращает свободный экземпляр, при необходимости создавая новый"""
+        while True:
+            try:
+                instance = self._idle.get_nowait()
+            except Empty:
+                with self._lock:
+                    if len(self._instances) < self.size:
+                        instance = OfficeInstance(self.backend_factory, self.max_documents,
+                                                  f"{self.app_name}-{len(self._instances) + 1}")
+                        self._instances.append(instance)
+                        return instance
+                instance = self._idle.get()
+
+            # None означает, что место освободилось после исключения экземпляра
+            if instance is not None:
+                return instance
+
+    def _discard(self, instance):
+        """Исключает экземпляр из пула; вместо него при необходимости создается новый"""
+        with self._lock:
+            if instance in self._instances:
+                self._instances.remove(instance)
+        instance.stop()
+        # Будим ожидающий поток, чтобы он создал экземпляр на освободившемся месте
+        self._idle.put(None)
+
+    @staticmethod
+    def _wait(event, timeout, cancel_token):
+        """Ждет события не дольше timeout; прекращает ожидание при отмене проверки"""
+        if cancel_token is None:
+            return event.wait(timeout)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not event.wait(CANCEL_POLL_INTERVAL):
+            if cancel_token.cancelled or (deadline is not None and time.monotonic() >= deadline):
+                return False
+        return True
+
+    def process(self, file_path, handler, cancel_token=None):
+        """
+        Открывает документ в одном из экземпляров и обрабатывает его.
+
+        Args:
+            file_path (str): Путь к документу
+            handler (callable): Функция от объекта документа; выполняется в потоке
+                                экземпляра, ее результат возвращается
+            cancel_token (CancellationToken, optional): Признак отмены; если отмена запрошена,
+                                                        пока Office занят документом, экземпляр завершается
+
+        Returns:
+            object: Результат handler
+
+        Raises:
+            TimeoutError: Если документ не открылся за open_timeout секунд
+                          или не был обработан за job_timeout секунд
+            CheckCancelled: Если проверка отменена
+        """
+        instance = self._acquire()
+        job = OfficeJob(file_path, handler)
+        instance.submit(job)
+
+        if not self._wait(job.opened, self.open_timeout, cancel_token):
+            # Зависшее приложение завершается принудительно, экземпляр больше не используется
+            instance.terminate()
+            self._discard(instance)
+            check_cancelled(cancel_token)
+            raise TimeoutError(f"Документ не открылся за {self.open_timeout} с")
+
+        if not self._wait(job.done, self.job_timeout, cancel_token):
+            # Обработка зависла (например, Word ждет ответа в диалоге) - так же завершаем экземпляр
+            instance.terminate()
+            self._discard(instance)
+            check_cancelled(cancel_token)
+            raise TimeoutError(f"Обработка документа в {self.app_name} не завершилась за {self.job_timeout} с")
+        self._idle.put(instance)
+
+        if job.error is not None:
+            raise job.error
+        return job.result
+
+    def shutdown(self):
+        """Завершает все экземпляры приложения"""
+        with self._lock:
+            instances = list(self._instances)
+            self._instances = []
+        for instance in instances:
+            instance.stop()
+        # Приложения завершаются в своих потоках - дожидаемся, чтобы не оставить процессы Office
+        for instance in instances:
+            instance.join(SHUTDOWN_TIMEOUT)
+
+# Бэкенды по умолчанию и общие настройки пулов
+BACKEND_FACTORIES = {
+    WORD_APPLICATION: Win32WordBackend,
+    EXCEL_APPLICATION: Win32ExcelBackend
+}
+
+_pool_settings = {
+    'size': 1,
+    'max_documents': DEFAULT_MAX_DOCUMENTS,
+    'open_timeout': DEFAULT_OPEN_TIMEOUT,
+    'job_timeout': None,
+    'backend_factories': dict(BACKEND_FACTORIES)
+}
+_pools = {}
+_pools_lock = threading.Lock()
+
+# Проверка через Office отключена в процессах-исполнителях
+# и в потоках быстрой проверки (для них - отметка в данных потока)
+_com_fallback_deferred = False
+_com_fallback_thread_state = threading.local()
+
+def defer_com_fallback(deferred=True, current_thread=False):
+    """
+    Включает или отключает отложенную проверку через Office в текущем процессе
+    или только в текущем потоке.
+
+    Args:
+        deferred (bool): Если True, вместо запуска Office возникает ComFallbackDeferred
+        current_thread (bool): Если True, настройка действует только в текущем потоке
+    """
+    global _com_fallback_deferred
+    if current_thread:
+        _com_fallback_thread_state.deferred = deferred
+    else:
+        _com_fallback_deferred = deferred
+
+def ensure_com_fallback_allowed(file_path):
+    """
+    Проверяет, что в текущем процессе и потоке можно запускать Office.
+
+    Raises:
+        ComFallbackDeferred: Если проверка через Office отложена
+    """
+    if getattr(_com_fallback_thread_state, 'deferred', _com_fallback_deferred):
+        raise ComFallbackDeferred(file_path)
+
+def configure_office_pools(size=None, max_documents=None, open_timeout=None, job_timeout=None,
+                           backend_factories=None):
+    """
+    Задает настройки пулов приложений Office. Действующие пулы завершаются,
+    новые создаются с новыми настройками при первом обращении.
+
+    Args:
+        size (int, optional): Наибольшее число экземпляров каждого приложения
+        max_documents (int, optional): Документов на экземпляр до перезапуска
+        open_timeout (float, optional): Предельное время открытия документа в секундах
+        job_timeout (float, optional): Предельное время обработки открытого документа
+                                       в секундах (0 - без ограничения)
+        backend_factories (dict, optional): Название приложения -> фабрика бэкенда
+                                            (например, FakeOfficeBackend для тестов)
+    """
+    shutdown_office_pools()
+    with _pools_lock:
+        if size is not None:
+            _pool_settings['size'] = size
+        if max_documents is not None:
+            _pool_settings['max_documents'] = max_documents
+        if open_timeout is not None:
+            _pool_settings['open_timeout'] = open_timeout
+        if job_timeout is not None:
+            _pool_settings['job_timeout'] = job_timeout or None
+        if backend_factories is not None:
+            _pool_settings['backend_factories'].update(backend_factories)
+
+def get_office_pool(app_name):
+    """
+    Возвращает пул экземпляров приложения Office.
+
+    Args:
+        app_name (str): WORD_APPLICATION или EXCEL_APPLICATION
+
+    Returns:
+        OfficeInstancePool: Пул приложения
+    """
+    with _pools_lock:
+        pool = _pools.get(app_name)
+        if pool is None:
+            pool = OfficeInstancePool(
+                app_name,
+                _pool_settings['backend_factories'][app_name],
+                size=_pool_settings['size'],
+                max_documents=_pool_settings['max_documents'],
+                open_timeout=_pool_settings['open_timeout'],
+                job_timeout=_pool_settings['job_timeout']
+            )
+            _pools[app_name] = pool
+        return pool
+
+def shutdown_office_pools():
+    """Завершает все запущенные приложения Office"""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown()
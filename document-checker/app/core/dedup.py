@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import hashlib
+import os
+import struct
+
+# Размер блоков начала и конца файла для быстрого хэша
+PARTIAL_BLOCK_SIZE = 64 * 1024
+
+# Размер блока чтения для полного хэша
+FULL_HASH_CHUNK_SIZE = 1024 * 1024
+
+# Запись конца центрального каталога ZIP (EOCD) и ее размер без комментария
+ZIP_EOCD_SIGNATURE = b'PK\x05\x06'
+ZIP_EOCD_SIZE = 22
+
+# Наибольший размер центрального каталога ZIP, включаемого в быстрый хэш
+MAX_CENTRAL_DIRECTORY_SIZE = 4 * 1024 * 1024
+
+def read_zip_central_directory(file, size, tail):
+    """
+    Читает центральный каталог ZIP по записи EOCD в конце файла.
+    Каталог содержит CRC32 и размеры всех частей пакета, поэтому для DOCX и XLSX
+    он отличает файлы с разным содержимым почти так же надежно, как полный хэш.
+
+    Args:
+        file: Открытый файл
+        size (int): Размер файла
+        tail (bytes): Последний блок файла
+
+    Returns:
+        bytes: Центральный каталог или b'', если файл не ZIP
+    """
+    position = tail.rfind(ZIP_EOCD_SIGNATURE)
+    if position < 0 or len(tail) - position < ZIP_EOCD_SIZE:
+        return b''
+    directory_size, directory_offset = struct.unpack_from('<II', tail, position + 12)
+    if directory_size > MAX_CENTRAL_DIRECTORY_SIZE or directory_offset + directory_size > size:
+        return b''
+    file.seek(directory_offset)
+    return file.read(directory_size)
+
+def partial_hash(file_path, size):
+    """
+    Быстрый хэш файла: начало, конец и центральный каталог ZIP.
+
+    Args:
+        file_path (str): Путь к файлу
+        size (int): Размер файла
+
+    Returns:
+        str: Шестнадцатеричный хэш
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    with open(file_path, 'rb') as file:
+        digest.update(file.read(PARTIAL_BLOCK_SIZE))
+        if size > PARTIAL_BLOCK_SIZE:
+            file.seek(max(PARTIAL_BLOCK_SIZE, size - PARTIAL_BLOCK_SIZE))
+            tail = file.read(PARTIAL_BLOCK_SIZE)
+            digest.update(tail)
+            digest.update(read_zip_central_directory(file, size, tail))
+    return digest.hexdigest()
+
+def full_hash(file_path):
+    """Полный хэш содержимого файла"""
+    digest = hashlib.blake2b(digest_size=32)
+    with open(file_path, 'rb') as file:
+        for chunk in iter(lambda: file.read(FULL_HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class DuplicateDetector:
+    """
+    Поиск файлов с одинаковым содержимым в пределах запуска.
+
+    Файлы сравниваются поэтапно: по размеру (без чтения файла), затем по
+    быстрому хэшу, и только при его совпадении - по полному хэшу. Файл с
+    уникальным размером не читается вовсе.
+    """
+    def __init__(self):
+        # Размер -> файлы этого размера, еще не прочитанные
+        self._unhashed_by_size = {}
+        # (размер, быстрый хэш) -> пути файлов-образцов
+        self._by_partial_hash = {}
+        # Путь -> полный хэш (вычисляется только при совпадении быстрых хэшей)
+        self._full_hashes = {}
+
+    def _register(self, file_path, size):
+        """Вычисляет быстрый хэш файла и запоминает его; возвращает ключ группы"""
+        key = (size, partial_hash(file_path, size))
+        self._by_partial_hash.setdefault(key, []).append(file_path)
+        return key
+
+    def _full_hash(self, file_path):
+        if file_path not in self._full_hashes:
+            self._full_hashes[file_path] = full_hash(file_path)
+        return self._full_hashes[file_path]
+
+    def find_original(self, found_file):
+        """
+        Определяет, встречался ли уже файл с таким же содержимым.
+
+        Args:
+            found_file (FoundFile): Найденный файл (с размером из обхода папки)
+
+        Returns:
+            str: Путь к ранее найденному файлу с тем же содержимым или None
+        """
+        size = found_file.size
+        if size is None:
+            return None
+
+        try:
+            if size not in self._unhashed_by_size:
+                # Первый файл такого размера: читать его пока не нужно
+                self._unhashed_by_size[size] = [found_file.path]
+                return None
+
+            # Появился второй файл того же размера - хэшируем отложенные файлы
+            for file_path in self._unhashed_by_size[size]:
+                try:
+                    self._register(file_path, size)
+                except OSError:
+                    pass
+            self._unhashed_by_size[size] = []
+
+            key = (size, partial_hash(found_file.path, size))
+            candidates = self._by_partial_hash.get(key, [])
+            if candidates:
+                file_hash = self._full_hash(found_file.path)
+                for candidate in candidates:
+                    try:
+                        if self._full_hash(candidate) == file_hash:
+                            return candidate
+                    except OSError:
+                        continue
+
+            self._by_partial_hash.setdefault(key, []).append(found_file.path)
+        except OSError:
+            # Файл недоступен для чтения - он будет проверен (и получит ошибку) обычным порядком
+            pass
+        return None
+
+def result_verdict(result):
+    """
+    Вердикт проверки без сведений о самом файле - то, что можно передать копиям.
+    Хранится для каждого проверенного файла до конца запуска.
+
+    Args:
+        result (dict): Результат проверки
+
+    Returns:
+        tuple: (тип файла, результат, комментарий)
+    """
+    return (result['file_type'], result['result'], result['comment'])
+
+def make_duplicate_result(verdict, file_path, original_path):
+    """
+    Результат проверки файла-копии по вердикту файла с тем же содержимым.
+
+    Args:
+        verdict (tuple): Вердикт исходного файла, см. result_verdict
+        file_path (str): Путь к файлу-копии
+        original_path (str): Путь к исходному файлу
+
+    Returns:
+        dict: Результат для файла-копии со ссылкой на исходный файл
+    """
+    file_type, result, comment = verdict
+    return {
+        'file_name': os.path.basename(file_path),
+        'file_type': file_type,
+        'file_path': file_path,
+        'result': result,
+        'comment': comment,
+        'note': f"Дубликат файла: {original_path}"
+    }
@@ -0,0 +1,331 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import re
+import struct
+
+from app.core.colors import classify_rgb
+
+# Потоки двоичного документа Word 97-2003
+WORD_DOCUMENT_STREAM = 'WordDocument'
+TABLE_STREAMS = ('0Table', '1Table')
+
+# Сигнатура и наименьшая поддерживаемая версия FIB (Word 97)
+FIB_IDENT = 0xA5EC
+FIB_MIN_VERSION = 0x00C1
+
+# Флаги FibBase
+FIB_ENCRYPTED = 0x0100
+FIB_WHICH_TABLE_STREAM = 0x0200
+
+# Индексы в FibRgLw97: длины текста частей документа (в символах, CP)
+LW_CCP_TEXT = 3
+LW_CCP_FTN = 4
+LW_CCP_HDD = 5
+LW_CCP_ATN = 7
+LW_CCP_EDN = 8
+LW_CCP_TXBX = 9
+LW_CCP_HDR_TXBX = 10
+
+# Индексы пар (fc, lcb) в FibRgFcLcb97
+FC_PLCF_AND_REF = 4
+FC_PLCF_BTE_CHPX = 12
+FC_CLX = 33
+
+# Размер записи ATRDPre10 в PlcfandRef (после массива CP)
+ATRD_SIZE = 30
+
+# Размер страницы FKP
+FKP_PAGE_SIZE = 512
+
+# Свойства символов, задающие выделение и заливку
+SPRM_C_HIGHLIGHT = 0x2A0C
+SPRM_C_SHD80 = 0x4866
+SPRM_C_SHD = 0xCA71
+
+# Размер операнда по полю spra идентификатора sprm (6 - переменный размер)
+SPRM_OPERAND_SIZES = {0: 1, 1: 1, 2: 2, 3: 4, 4: 2, 5: 2, 7: 3}
+
+# Цвета выделения (Ico) с теми же названиями, что и w:highlight в DOCX
+ICO_NAMES = {
+    1: 'black', 2: 'blue', 3: 'cyan', 4: 'green', 5: 'magenta', 6: 'red', 7: 'yellow', 8: 'white',
+    9: 'darkBlue', 10: 'darkCyan', 11: 'darkGreen', 12: 'darkMagenta', 13: 'darkRed',
+    14: 'darkYellow', 15: 'darkGray', 16: 'lightGray'
+}
+
+# Цвета Ico в RGB (для заливки в формате Shd80)
+ICO_RGB = {
+    1: (0, 0, 0), 2: (0, 0, 255), 3: (0, 255, 255), 4: (0, 255, 0), 5: (255, 0, 255),
+    6: (255, 0, 0), 7: (255, 255, 0), 8: (255, 255, 255), 9: (0, 0, 128), 10: (0, 128, 128),
+    11: (0, 128, 0), 12: (128, 0, 128), 13: (128, 0, 0), 14: (128, 128, 0),
+    15: (128, 128, 128), 16: (192, 192, 192)
+}
+
+# Узор заливки "сплошной" (ipat): цвет заливки задает цвет переднего плана
+SHD_SOLID = 1
+
+# Специальные символы текста: границы абзацев и полей, объекты и мягкие переносы
+PARAGRAPH_MARKS = '\r\x07\x0c'
+FIELD_BEGIN = '\x13'
+FIELD_SEPARATOR = '\x14'
+FIELD_END = '\x15'
+LINE_BREAK = '\x0b'
+NON_BREAKING_HYPHEN = '\x1e'
+SPECIAL_CHARS = re.compile('[\x01-\x08\x0b-\x0d\x13-\x15\x1e\x1f]')
+
+def iter_sprms(grpprl):
+    """
+    Перебирает свойства (sprm) в группе свойств.
+
+    Args:
+        grpprl (bytes): Последовательность Prl
+
+    Yields:
+        tuple: (идентификатор sprm, операнд в виде bytes)
+    """
+    pos = 0
+    length = len(grpprl)
+    while pos + 2 <= length:
+        sprm = struct.unpack_from('<H', grpprl, pos)[0]
+        pos += 2
+        size = SPRM_OPERAND_SIZES.get(sprm >> 13)
+        if size is None:
+            # Переменный размер: первый байт операнда - его длина
+            if pos >= length:
+                break
+            size = grpprl[pos] + 1
+        yield sprm, grpprl[pos:pos + size]
+        pos += size
+
+def _colorref_rgb(data, offset):
+    """Переводит COLORREF (r, g, b, fAuto) в кортеж (r, g, b); автоматический цвет дает None"""
+    r, g, b, auto = data[offset:offset + 4]
+    if auto == 0xFF:
+        return None
+    return (r, g, b)
+
+def sprm_color(sprm, operand):
+    """
+    Определяет отслеживаемый цвет, заданный свойством символа.
+
+    Args:
+        sprm (int): Идентификатор свойства
+        operand (bytes): Операнд свойства
+
+    Returns:
+        str: Название выделения ('yellow', ...) или класс цвета заливки; None, если цвета нет
+    """
+    if sprm == SPRM_C_HIGHLIGHT and operand:
+        return ICO_NAMES.get(operand[0])
+
+    if sprm == SPRM_C_SHD80 and len(operand) >= 2:
+        value = struct.unpack_from('<H', operand)[0]
+        ico_fore, ico_back, pattern = value & 0x1F, (value >> 5) & 0x1F, value >> 10
+        ico = ico_fore if pattern == SHD_SOLID else ico_back
+        return classify_rgb(ICO_RGB.get(ico))
+
+    if sprm == SPRM_C_SHD and len(operand) >= 11:
+        # Операнд: длина (1 байт), cvFore, cvBack, ipat
+        pattern = struct.unpack_from('<H', operand, 9)[0]
+        return classify_rgb(_colorref_rgb(operand, 1 if pattern == SHD_SOLID else 5))
+
+    return None
+
+class WordBinaryDocument:
+    """
+    Разбор двоичного документа Word 97-2003 (.doc) из составного файла.
+
+    Читает FIB, таблицу фрагментов текста (Clx), таблицу примечаний (PlcfandRef)
+    и страницы свойств символов (CHPX FKP) напрямую, без запуска Word.
+    """
+    def __init__(self, compound_file):
+        self._word = compound_file.read_stream(WORD_DOCUMENT_STREAM)
+        self._read_fib()
+        self._table = compound_file.read_stream(TABLE_STREAMS[1 if self._flags & FIB_WHICH_TABLE_STREAM else 0])
+
+        # Количество примечаний - по числу записей в PlcfandRef
+        fc, lcb = self._fc_lcb(FC_PLCF_AND_REF)
+        self.comment_count = max(0, (lcb - 4) // (4 + ATRD_SIZE)) if lcb else 0
+        if not self.comment_count and self._ccp[LW_CCP_ATN]:
+            self.comment_count = 1
+
+    def _read_fib(self):
+        """Разбирает FIB (File Information Block)"""
+        word = self._word
+        if len(word) < 34:
+            raise ValueError("Поврежденный документ Word")
+
+        ident, version = struct.unpack_from('<HH', word, 0)
+        if ident != FIB_IDENT:
+            raise ValueError("Поток WordDocument не содержит FIB")
+        if version < FIB_MIN_VERSION:
+            raise ValueError("Документы Word 6.0/95 не поддерживаются")
+
+        self._flags = struct.unpack_from('<H', word, 0x0A)[0]
+        if self._flags & FIB_ENCRYPTED:
+            raise ValueError("Документ зашифрован")
+
+        # За FibBase (32 байта) следуют массивы переменной длины: rgW, rgLw, rgFcLcb
+        pos = 32
+        csw = struct.unpack_from('<H', word, pos)[0]
+        pos += 2 + csw * 2
+        cslw = struct.unpack_from('<H', word, pos)[0]
+        self._ccp = struct.unpack_from('<%dI' % cslw, word, pos + 2)
+        pos += 2 + cslw * 4
+        self._fc_lcb_count = struct.unpack_from('<H', word, pos)[0]
+        self._fc_lcb_offset = pos + 2
+
+    def _fc_lcb(self, index):
+        """Возвращает пару (смещение, длина) структуры в потоке таблиц"""
+        if index >= self._fc_lcb_count:
+            return 0, 0
+        return struct.unpack_from('<II', self._word, self._fc_lcb_offset + index * 8)
+
+    def _pieces(self):
+        """
+        Разбирает таблицу фрагментов текста (PlcPcd из Clx).
+
+        Returns:
+            list: Кортежи (cp начала, cp конца, смещение в WordDocument, сжатый ли текст)
+        """
+        fc, lcb = self._fc_lcb(FC_CLX)
+        clx = self._table[fc:fc + lcb]
+
+        # Пропускаем Prc (группы свойств фрагментов), затем следует Pcdt
+        pos = 0
+        while pos < len(clx) and clx[pos] == 0x01:
+            pos += 3 + struct.unpack_from('<H', clx, pos + 1)[0]
+        if pos + 5 > len(clx) or clx[pos] != 0x02:
+            raise ValueError("Таблица фрагментов текста не найдена")
+
+        plc_size = struct.unpack_from('<I', clx, pos + 1)[0]
+        plc = clx[pos + 5:pos + 5 + plc_size]
+        count = (len(plc) - 4) // 12
+        cps = struct.unpack_from('<%dI' % (count + 1), plc)
+
+        pieces = []
+        for index in range(count):
+            fc_value = struct.unpack_from('<I', plc, 4 * (count + 1) + index * 8 + 2)[0]
+            compressed = bool(fc_value & 0x40000000)
+            fc_value &= 0x3FFFFFFF
+            offset = fc_value // 2 if compressed else fc_value
+            pieces.append((cps[index], cps[index + 1], offset, compressed))
+        return pieces
+
+    def _story_ranges(self):
+        """
+        Диапазоны CP частей документа, в которых ищется текст.
+        Основной текст, сноски, колонтитулы, концевые сноски и надписи;
+        текст примечаний не включается, как и для DOCX.
+        """
+        ranges = []
+        start = 0
+        for index in (LW_CCP_TEXT, LW_CCP_FTN, LW_CCP_HDD, LW_CCP_ATN, LW_CCP_EDN, LW_CCP_TXBX, LW_CCP_HDR_TXBX):
+            length = self._ccp[index] if index < len(self._ccp) else 0
+            if length and index != LW_CCP_ATN:
+                ranges.append((start, start + length))
+            start += length
+        return ranges
+
+    def _iter_text(self):
+        """Перебирает текст документа по фрагментам в пределах частей документа"""
+        word = self._word
+        stories = self._story_ranges()
+        for cp_start, cp_end, offset, compressed in self._pieces():
+            for story_start, story_end in stories:
+                start = max(cp_start, story_start)
+                end = min(cp_end, story_end)
+                if start >= end:
+                    continue
+                skip = start - cp_start
+                count = end - start
+                if compressed:
+                    yield word[offset + skip:offset + skip + count].decode('cp1252', errors='replace')
+                else:
+                    position = offset + skip * 2
+                    yield word[position:position + count * 2].decode('utf-16-le', errors='replace')
+
+    def iter_paragraphs(self):
+        """
+        Перебирает логические абзацы текста документа.
+
+        Коды полей (между началом поля и разделителем) исключаются, как и
+        служебные символы объектов; в поиск попадает только видимый текст.
+
+        Yields:
+            str: Текст абзаца
+        """
+        parts = []
+        # Для каждого открытого поля - находимся ли мы еще в его коде
+        fields = []
+
+        for text in self._iter_text():
+            pos = 0
+            for special in SPECIAL_CHARS.finditer(text):
+                if not any(fields):
+                    parts.append(text[pos:special.start()])
+                pos = special.end()
+
+                char = special.group()
+                if char in PARAGRAPH_MARKS:
+                    if not any(fields):
+                        yield ''.join(parts)
+                        parts = []
+                elif char == FIELD_BEGIN:
+                    fields.append(True)
+                elif char == FIELD_SEPARATOR:
+                    if fields:
+                        fields[-1] = False
+                elif char == FIELD_END:
+                    if fields:
+                        fields.pop()
+                elif not any(fields):
+                    if char == LINE_BREAK:
+                        parts.append('\n')
+                    elif char == NON_BREAKING_HYPHEN:
+                        parts.append('-')
+
+            if not any(fields) and pos < len(text):
+                parts.append(text[pos:])
+
+        if parts:
+            yield ''.join(parts)
+
+    def highlight_colors(self):
+        """
+        Определяет цвета выделения и заливки символов по страницам CHPX.
+
+        Returns:
+            set: Названия выделений ('yellow', ...) и классы цветов заливки
+        """
+        colors = set()
+        fc, lcb = self._fc_lcb(FC_PLCF_BTE_CHPX)
+        if lcb < 4:
+            return colors
+
+        plc = self._table[fc:fc + lcb]
+        count = (len(plc) - 4) // 8
+        page_numbers = struct.unpack_from('<%dI' % count, plc, 4 * (count + 1))
+
+        word = self._word
+        seen_offsets = set()
+        for page_number in page_numbers:
+            page_start = (page_number & 0x3FFFFF) * FKP_PAGE_SIZE
+            page = word[page_start:page_start + FKP_PAGE_SIZE]
+            if len(page) < FKP_PAGE_SIZE:
+                continue
+
+            runs = page[FKP_PAGE_SIZE - 1]
+            offsets_start = 4 * (runs + 1)
+            for run in range(runs):
+                # Смещение Chpx задано в словах; 0 - свойства по умолчанию
+                offset = page[offsets_start + run] * 2
+                if not offset or (page_start + offset) in seen_offsets:
+                    continue
+                seen_offsets.add(page_start + offset)
+
+                size = page[offset]
+                for sprm, operand in iter_sprms(page[offset + 1:offset + 1 + size]):
+                    color = sprm_color(sprm, operand)
+                    if color:
+                        colors.add(color)
+        return colors
@@ -0,0 +1,184 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import re
+import xml.etree.ElementTree as ET
+
+from app.core.colors import classify_hex
+from app.utils.threading_utils import check_cancelled
+
+# Пространство имен WordprocessingML
+W_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+
+# Теги, которые обрабатываются при потоковом разборе
+W_HIGHLIGHT = W_NS + 'highlight'
+W_VAL = W_NS + 'val'
+W_PARAGRAPH = W_NS + 'p'
+W_RUN = W_NS + 'r'
+W_RUN_PROPS = W_NS + 'rPr'
+W_TEXT = W_NS + 't'
+W_TAB = W_NS + 'tab'
+W_BREAKS = (W_NS + 'br', W_NS + 'cr')
+W_FIELD_CHAR = W_NS + 'fldChar'
+W_FIELD_CHAR_TYPE = W_NS + 'fldCharType'
+W_COMMENT_TAGS = (W_NS + 'commentRangeStart', W_NS + 'commentReference')
+W_SHADING = W_NS + 'shd'
+W_STYLE_REFS = (W_NS + 'pStyle', W_NS + 'rStyle', W_NS + 'tblStyle')
+
+# Части документа Word с текстом: основной текст, колонтитулы и сноски
+WORD_TEXT_PART_PATTERN = re.compile(r'^word/(document|header\d*|footer\d*|footnotes|endnotes)\.xml$')
+
+def shading_color(shd):
+    """
+    Определяет цвет заливки элемента w:shd в терминах цветов выделения Word.
+    Применяется только к заливке текста (w:rPr/w:shd): заливка абзацев, ячеек и
+    таблиц - оформление документа, а не выделение.
+
+    Args:
+        shd (Element): Элемент w:shd
+
+    Returns:
+        str: Название цвета ('yellow', 'red', ...) или None, если цвет не отслеживается
+    """
+    # При сплошном узоре видимый цвет - цвет узора, иначе - цвет фона
+    if shd.get(W_NS + 'val') == 'solid':
+        color = shd.get(W_NS + 'color')
+    else:
+        color = shd.get(W_NS + 'fill')
+    if not color or color == 'auto':
+        return None
+    return classify_hex(color)
+
+class WordScanState:
+    """
+    Результаты потокового сканирования частей документа Word.
+    Один объект можно передавать в несколько вызовов iter_word_part,
+    чтобы накопить результаты по всем частям документа.
+    """
+    def __init__(self, style_colors=None):
+        # Цвета выделений и заливок текста (значения атрибута w:val тега w:highlight,
+        # цвета w:shd в свойствах прогонов и цвета, заданные через стили)
+        self.highlights = set()
+
+        # Таблица стилей с цветами (см. word_styles.parse_word_styles)
+        self.style_colors = style_colors or {}
+
+        # Найдены ли привязки комментариев в тексте
+        self.has_comments = False
+
+def iter_word_part(stream, state, cancel_token=None):
+    """
+    Потоково разбирает XML-часть документа Word (например, word/document.xml).
+
+    Разбор идет инкрементально: каждый элемент удаляется из дерева сразу после
+    обработки, поэтому потребление памяти не зависит от размера документа.
+    Цвета выделений и привязки комментариев записываются в state по ходу разбора.
+    Учитываются прямое выделение (w:highlight), заливка текста прогонов (w:rPr/w:shd),
+    а также стили абзацев, символов и таблиц из state.style_colors. Заливка абзацев,
+    ячеек и таблиц (например, оформление шапки таблицы) выделением не считается.
+
+    Текст абзаца собирается из всех его прогонов, поэтому фразы, разбитые Word
+    на несколько прогонов, остаются целыми. Коды полей (w:instrText и все, что
+    находится между началом поля и его разделителем) и удаленный текст
+    (w:delText) в текст не попадают.
+
+    Args:
+        stream: Файловый объект с XML (например, результат ZipFile.open)
+        state (WordScanState): Объект для накопления результатов
+        cancel_token (CancellationToken, optional): Признак отмены, опрашивается после каждого абзаца
+
+    Yields:
+        str: Логический текст очередного абзаца
+    """
+    # Стек открытых элементов - нужен, чтобы удалять обработанные элементы из родителя
+    open_elements = []
+
+    # Стек текстов открытых абзацев (абзацы надписей вложены в абзацы основного текста)
+    paragraphs = []
+
+    # Стек открытых сложных полей: True - идет результат поля, False - код поля
+    fields = []
+
+    for event, elem in ET.iterparse(stream, events=('start', 'end')):
+        tag = elem.tag
+
+        if event == 'start':
+            open_elements.append(elem)
+
+            if tag == W_PARAGRAPH:
+                paragraphs.append([])
+            elif tag in W_COMMENT_TAGS:
+                state.has_comments = True
+            continue
+
+        open_elements.pop()
+
+        if tag == W_TEXT:
+            # Текст учитывается только вне кодов полей
+            if elem.text and paragraphs and all(fields):
+                paragraphs[-1].append(elem.text)
+        elif tag == W_TAB or tag in W_BREAKS:
+            # Табуляции и разрывы внутри прогона (w:tab в w:tabs - это позиции табуляции абзаца)
+            if paragraphs and all(fields) and open_elements and open_elements[-1].tag == W_RUN:
+                paragraphs[-1].append('\t' if tag == W_TAB else '\n')
+        elif tag == W_FIELD_CHAR:
+            field_char_type = elem.get(W_FIELD_CHAR_TYPE)
+            if field_char_type == 'begin':
+                fields.append(False)
+            elif field_char_type == 'separate' and fields:
+                fields[-1] = True
+            elif field_char_type == 'end' and fields:
+                fields.pop()
+        elif tag == W_HIGHLIGHT:
+            color = elem.get(W_VAL)
+            if color and color != 'none':
+                state.highlights.add(color)
+        elif tag == W_SHADING:
+            # Только заливка текста прогона; w:rPr в свойствах абзаца относится к знаку абзаца
+            if len(open_elements) >= 2 and open_elements[-1].tag == W_RUN_PROPS and open_elements[-2].tag == W_RUN:
+                color = shading_color(elem)
+                if color:
+                    state.highlights.add(color)
+        elif tag in W_STYLE_REFS:
+            color = state.style_colors.get(elem.get(W_VAL))
+            if color:
+                state.highlights.add(color)
+        elif tag == W_PARAGRAPH:
+            check_cancelled(cancel_token)
+            text = ''.join(paragraphs.pop())
+            if text:
+                yield text
+
+        # Элемент полностью обработан - освобождаем память
+        if open_elements:
+            open_elements[-1].remove(elem)
+
+def word_text_parts(names):
+    """
+    Возвращает части документа Word с текстом в порядке сканирования.
+
+    Args:
+        names (iterable): Имена частей пакета
+
+    Returns:
+        list: Сначала word/document.xml, затем колонтитулы, сноски и концевые сноски
+    """
+    parts = sorted(name for name in names if WORD_TEXT_PART_PATTERN.match(name))
+    parts.sort(key=lambda name: name != 'word/document.xml')
+    return parts
+
+def iter_word_package(zip_file, part_names, state, cancel_token=None):
+    """
+    Потоково сканирует несколько частей документа Word с общим состоянием.
+
+    Args:
+        zip_file (ZipFile): Открытый пакет
+        part_names (list): Имена частей (см. word_text_parts)
+        state (WordScanState): Объект для накопления результатов
+        cancel_token (CancellationToken, optional): Признак отмены
+
+    Yields:
+        str: Логический текст очередного абзаца
+    """
+    for part_name in part_names:
+        with zip_file.open(part_name) as stream:
+            yield from iter_word_part(stream, state, cancel_token)
@@ -1,12 +1,75 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
-import os
-import openpyxl
 from zipfile import ZipFile
-import win32com.client
-import pythoncom
 
-def check_excel_file(file_path, file_name, enable_value_search=False, search_values=None):
+from app.core.cfb_reader import CompoundFile
+from app.core.colors import RED, YELLOW, classify_com_color, com_colors_of_class
+from app.core.com_pool import EXCEL_APPLICATION, ComFallbackDeferred, ensure_com_fallback_allowed, get_office_pool
+from app.core.package_triage import triage_package
+from app.core.value_matcher import compile_search_values
+from app.core.xls_reader import format_number, scan_xls_workbook
+from app.core.xlsx_comments import find_sheet_comments
+from app.core.xlsx_search import search_workbook_values
+from app.core.xlsx_stream import find_colored_tabs, read_sheet_parts, sheet_has_flagged_cells
+from app.core.xlsx_styles import load_flagged_styles, load_workbook_colors
+from app.utils.threading_utils import check_cancelled, report_phase
+
+# Цвета вкладок, которые считаются проблемой
+TAB_COLOR_CLASSES = (YELLOW, RED)
+
+# Константа Excel для поиска по формулам/значениям (xlFormulas)
+XL_FORMULAS = -4123
+
+# Число строк диапазона, читаемых через win32com одним обращением
+COM_READ_BLOCK_ROWS = 5000
+
+def find_filled_cell(app, search_range, colors):
+    """
+    Ищет в диапазоне ячейку с заливкой одного из цветов поиском по формату.
+    Вместо обращения к каждой ячейке выполняется один вызов Find на цвет.
+    
+    Args:
+        app: Объект приложения Excel
+        search_range: Диапазон поиска (например, UsedRange листа)
+        colors (tuple): Цвета заливки в формате COM (BGR)
+        
+    Returns:
+        bool: True, если найдена ячейка с одной из заливок
+    """
+    find_format = app.FindFormat
+    try:
+        for color in colors:
+            find_format.Clear()
+            find_format.Interior.Color = color
+            if search_range.Find(What="", LookIn=XL_FORMULAS, SearchFormat=True) is not None:
+                return True
+        return False
+    finally:
+        # Формат поиска сохраняется в приложении - сбрасываем его для следующих книг
+        find_format.Clear()
+
+def iter_range_values(values):
+    """
+    Перебирает непустые значения из Range.Value.
+    
+    Args:
+        values: Значение одной ячейки или кортеж строк значений диапазона
+        
+    Yields:
+        str: Текстовое представление значения ячейки
+    """
+    rows = values if isinstance(values, tuple) else ((values,),)
+    for row in rows:
+        for value in row:
+            if value is None or value == "":
+                continue
+            if isinstance(value, float):
+                yield format_number(value)
+            else:
+                yield str(value)
+
+def check_excel_file(file_path, file_name, enable_value_search=False, search_values=None, first_issue_only=False,
+                     cancel_token=None):
     """
     Проверка Excel файла с оптимизацией для крупных файлов
     
@@ -15,342 +78,100 @@ def check_excel_file(file_path, file_name, enable_value_search=False, search_val
         file_name (str): Имя файла
         enable_value_search (bool): Флаг включения поиска заданных значений
         search_values (list): Список значений для поиска
+        first_issue_only (bool): Достаточно найти первую проблему
+        cancel_token (CancellationToken, optional): Признак отмены; при отмене возникает
+                                                    CheckCancelled, частичный результат не возвращается
     """
     try:
         issues = []
         
+        # Поиск значений ведется одним автоматом сразу по всем значениям
+        value_search = None
+        if enable_value_search and search_values and isinstance(search_values, list):
+            value_search = compile_search_values(search_values).new_search()
+        
         if file_path.lower().endswith(('.xlsx', '.xlsm')):
             # Быстрая предварительная проверка для .xlsx и .xlsm без полной загрузки
+            decided = False
+            report_phase("разбор пакета книги")
             try:
-                from zipfile import ZipFile
                 with ZipFile(file_path) as xlsx_zip:
-                    # Проверка на комментарии - смотрим наличие файлов комментариев
-                    comment_files = [f for f in xlsx_zip.namelist() if 'comments' in f.lower()]
-                    if comment_files:
-                        issues.append("комментарии")
-                    
-                    # Проверка цвета вкладок - загружаем workbook.xml
-                    if 'xl/workbook.xml' in xlsx_zip.namelist():
-                        workbook_content = xlsx_zip.read('xl/workbook.xml').decode('utf-8', errors='ignore')
-                        if 'tabColor' in workbook_content:
-                            # Более тщательная проверка на цвета листов
-                            if any(color in workbook_content for color in ['FFFF', 'FF0000', 'FFFF00', 'FFF000']):
-                                issues.append("цветной лист")
+                    # Предварительная проверка по метаданным пакета (без распаковки содержимого)
+                    triage = triage_package(xlsx_zip)
+                    issues.extend(triage.issues)
+                    need_content = bool(enable_value_search and search_values)
+                    decided = triage.is_decided(first_issue_only, need_content)
             except Exception as e:
                 # В случае ошибки быстрой проверки, продолжаем обычным способом
                 pass
-                
-            # Если проблем с цветами листов не найдено быстрым способом, выполняем более тщательную проверку
-            if not "цветной лист" in issues:
-                # Используем openpyxl с оптимизированной загрузкой
-                options = {
-                    'read_only': False,  # Нужно отключить read_only для доступа к цветам
-                    'data_only': True    # Без формул
-                }
-                
-                wb = None
-                try:
-                    wb = openpyxl.load_workbook(file_path, **options)
+            
+            if not decided and not (first_issue_only and issues):
+                with ZipFile(file_path) as xlsx_zip:
+                    # Палитра книги общая для вкладок и заливок: styles.xml разбирается один раз
+                    workbook_colors = load_workbook_colors(xlsx_zip)
+                    flagged_xfs = load_flagged_styles(xlsx_zip, workbook_colors)
+                    sheets = read_sheet_parts(xlsx_zip)
                     
-                    # Проверка на желтые или красные листы
-                    for sheet_name in wb.sheetnames:
-                        try:
-                            sheet = wb[sheet_name]
-                            if sheet.sheet_properties and sheet.sheet_properties.tabColor:
-                                tab_color = sheet.sheet_properties.tabColor.rgb
-                                # Более широкая проверка на различные оттенки желтого и красного
-                                if tab_color:
-                                    # Различные варианты цветов
-                                    yellow_codes = ['FFFF00', 'FFFFF00', 'FFFFFF00', 'FFF0F000', 'FFFFCC']
-                                    red_codes = ['FF0000', 'FFFF0000', 'FFF00000', 'FFCC0000']
-                                    
-                                    # Проверка на желтый/красный цвет
-                                    is_yellow = any(code in tab_color.upper() for code in yellow_codes)
-                                    is_red = any(code in tab_color.upper() for code in red_codes)
-                                    
-                                    if is_yellow or is_red:
-                                        issues.append(f"цветной лист ({sheet_name})")
-                                        break
-                        except Exception as e:
-                            # Логируем ошибку и продолжаем
-                            continue
+                    # Примечания и комментарии по листам - по связям листов, без обхода ячеек
+                    sheet_comments = find_sheet_comments(xlsx_zip, sheets)
+                    if sheet_comments:
+                        comments_issue = f"комментарии ({', '.join(item.describe() for item in sheet_comments)})"
+                        if "комментарии" in issues:
+                            issues[issues.index("комментарии")] = comments_issue
+                        else:
+                            issues.append(comments_issue)
                     
-                    # Если всё еще не найдены цветные листы, проверяем альтернативным способом
-                    if not "цветной лист" in issues:
-                        for sheet_name in wb.sheetnames:
-                            try:
-                                sheet = wb[sheet_name]
-                                # Дополнительная проверка через свойства листа
-                                if hasattr(sheet, '_WorkbookChild__props') and 'tabColor' in sheet._WorkbookChild__props:
-                                    issues.append(f"цветной лист ({sheet_name})")
-                                    break
-                            except:
-                                pass
-                
-                    # Проверка на желтые ячейки - проверяем сектор 500 столбцов на 1500 строк
-                    if not "желтые ячейки" in issues:
-                        for sheet_name in wb.sheetnames:
-                            try:
-                                sheet = wb[sheet_name]
-                                max_rows = min(1500, sheet.max_row)  # Максимум 1500 строк
-                                max_cols = min(500, sheet.max_column)  # Максимум 500 столбцов
-                                
-                                for row_idx in range(1, max_rows + 1):
-                                    for col_idx in range(1, max_cols + 1):
-                                        try:
-                                            cell = sheet.cell(row=row_idx, column=col_idx)
-                                            if cell.fill and hasattr(cell.fill, 'start_color') and hasattr(cell.fill.start_color, 'index'):
-                                                fill_color = cell.fill.start_color.index
-                                                if isinstance(fill_color, str) and ('FFFF' in fill_color or 'FFFF00' in fill_color or 'FFF0' in fill_color):
-                                                    issues.append("желтые ячейки")
-                                                    break
-                                        except Exception as cell_ex:
-                                            # Пропускаем проблемные ячейки
-                                            continue
-                                    
-                                    if "желтые ячейки" in issues:
-                                        break
-                                        
-                                if "желтые ячейки" in issues:
-                                    break
-                            except Exception:
-                                # Если возникла ошибка при проверке листа, продолжаем с следующим
-                                continue
+                    # Проверка цвета вкладок - распаковывается только заголовок каждого листа до sheetData
+                    colored_tabs = find_colored_tabs(xlsx_zip, workbook_colors, TAB_COLOR_CLASSES, sheets,
+                                                     first_only=first_issue_only, cancel_token=cancel_token)
+                    if colored_tabs:
+                        sheet_names = ", ".join(sheet_name for sheet_name, _ in colored_tabs)
+                        issues.append(f"цветной лист ({sheet_names})")
                     
-                    # Проверка на комментарии - только если еще не найдены
-                    if not "комментарии" in issues:
-                        for sheet_name in wb.sheetnames:
-                            try:
-                                sheet = wb[sheet_name]
-                                # Проверяем больший диапазон ячеек
-                                max_rows = min(1000, sheet.max_row)  # Проверяем до 1000 строк
-                                max_cols = min(100, sheet.max_column)  # и до 100 столбцов для комментариев
-                                
-                                for row_idx in range(1, max_rows + 1):
-                                    for col_idx in range(1, max_cols + 1):
-                                        try:
-                                            cell = sheet.cell(row=row_idx, column=col_idx)
-                                            if cell.comment is not None:
-                                                issues.append("комментарии")
-                                                break
-                                        except Exception:
-                                            continue
-                                            
-                                    if "комментарии" in issues:
-                                        break
-                                        
-                                if "комментарии" in issues:
+                    # Проверка на желтые ячейки: стили с желтой заливкой определяются один раз по styles.xml,
+                    # затем листы сканируются потоково только по атрибуту s ячеек, строк и столбцов
+                    if flagged_xfs and not (first_issue_only and issues):
+                        for sheet_name, sheet_part in sheets:
+                            report_phase(f"поиск желтых ячеек на листе {sheet_name}")
+                            with xlsx_zip.open(sheet_part) as sheet_stream:
+                                if sheet_has_flagged_cells(sheet_stream, flagged_xfs, cancel_token):
+                                    issues.append("желтые ячейки")
                                     break
-                            except Exception:
-                                continue
-                finally:
-                    # Закрываем только если wb было инициализировано
-                    if wb is not None:
-                        wb.close()
+                
         else:
-            # Используем win32com для .xls с ограничениями
-            pythoncom.CoInitialize()
-            excel_app = None
+            # Для .xls разбираем записи BIFF8 напрямую за один проход, Excel запускается только если разбор не удался
+            report_phase("разбор книги XLS")
             try:
-                excel_app = win32com.client.Dispatch("Excel.Application")
-                excel_app.Visible = False
-                excel_app.DisplayAlerts = False
-                excel_app.ScreenUpdating = False  # Выключаем обновление экрана для ускорения
-                
-                wb = None
-                try:
-                    wb = excel_app.Workbooks.Open(file_path, ReadOnly=True, UpdateLinks=False)
-                    
-                    # Проверка только первых нескольких листов
-                    max_sheets = min(3, wb.Sheets.Count)
-                    
-                    for i in range(1, max_sheets + 1):
-                        sheet = wb.Sheets(i)
-                        
-                        # Проверка на цвет листа
-                        try:
-                            if sheet.Tab.ColorIndex in [6, 3, 36, 44, 46]:  # Расширенный список: 6-желтый, 3-красный и другие оттенки
-                                issues.append(f"цветной лист ({sheet.Name})")
-                                break
-                        except:
-                            pass
-                        
-                        # Если цвет не определился по ColorIndex, пробуем альтернативный метод через RGB
-                        if not "цветной лист" in issues:
-                            try:
-                                tab_color = sheet.Tab.Color
-                                if tab_color:
-                                    # Преобразуем в RGB для проверки
-                                    r = tab_color % 256
-                                    g = (tab_color // 256) % 256
-                                    b = (tab_color // 65536) % 256
-                                    
-                                    # Проверка на желтый (высокие значения R и G, низкое B)
-                                    if (r > 200 and g > 200 and b < 100) or (r > 200 and g < 100 and b < 100):
-                                        issues.append(f"цветной лист ({sheet.Name})")
-                                        break
-                            except:
-                                pass
-                        
-                        # Проверка на желтые ячейки - расширяем область проверки
-                        if not "желтые ячейки" in issues:
-                            try:
-                                used_range = sheet.UsedRange
-                                if used_range:
-                                    # Определяем размеры используемого диапазона с увеличенными пределами
-                                    rows_count = min(1500, used_range.Rows.Count)  # Проверяем максимум 1500 строк
-                                    cols_count = min(500, used_range.Columns.Count)  # Проверяем максимум 500 столбцов
-                                    
-                                    # Оптимизация: проверяем сначала небольшой сектор, а затем расширяем
-                                    for check_level in range(1, 4):  # 3 уровня проверки с увеличением области
-                                        check_rows = min(rows_count, check_level * 500)  # Постепенно увеличиваем до макс. 1500 строк
-                                        check_cols = min(cols_count, check_level * 150)  # Постепенно увеличиваем до макс. 500 столбцов
-                                        
-                                        for row in range(1, check_rows + 1):
-                                            for col in range(1, check_cols + 1):
-                                                try:
-                                                    cell = sheet.Cells(row, col)
-                                                    if cell and cell.Interior:
-                                                        # Проверка на желтый цвет через ColorIndex (6 - желтый в Excel)
-                                                        if cell.Interior.ColorIndex == 6:
-                                                            issues.append("желтые ячейки")
-                                                            break
-                                                        
-                                                        # Дополнительная проверка через RGB (для нестандартных цветов)
-                                                        try:
-                                                            cell_color = cell.Interior.Color
-                                                            if cell_color:
-                                                                # Извлекаем RGB компоненты
-                                                                r = cell_color % 256
-                                                                g = (cell_color // 256) % 256
-                                                                b = (cell_color // 65536) % 256
-                                                                
-                                                                # Проверяем похожесть на желтый (высокие R и G, низкий B)
-                                                                if r > 200 and g > 200 and b < 100:
-                                                                    issues.append("желтые ячейки")
-                                                                    break
-                                                        except:
-                                                            pass
-                                                except:
-                                                    pass
-                                                    
-                                            if "желтые ячейки" in issues:
-                                                break
-                                                
-                                        if "желтые ячейки" in issues:
-                                            break
-                            except:
-                                pass
-                        
-                        # Проверка на комментарии
-                        if not "комментарии" in issues:
-                            try:
-                                if sheet.Comments and sheet.Comments.Count > 0:
-                                    issues.append("комментарии")
-                            except:
-                                pass
-                        
-                        # Если все проблемы уже найдены, прекращаем проверку
-                        if "комментарии" in issues and "желтые ячейки" in issues and "цветной лист" in issues:
-                            break
-                finally:
-                    # Закрываем только если wb было инициализировано
-                    if wb is not None:
-                        wb.Close(False)
-            finally:
-                # Выходим из Excel только если приложение было запущено
-                if excel_app is not None:
-                    excel_app.Quit()
+                with CompoundFile(file_path) as compound_file:
+                    xls_scan = scan_xls_workbook(compound_file, value_search, cancel_token)
+            except Exception:
+                # Зашифрованные книги и книги старых версий проверяем через win32com
+                return check_excel_file_with_win32com(file_path, file_name, enable_value_search, search_values, cancel_token)
+            
+            if xls_scan.sheet_comments:
+                issues.append(f"комментарии ({', '.join(item.describe() for item in xls_scan.sheet_comments)})")
+            
+            colored_tabs = xls_scan.colored_tabs(TAB_COLOR_CLASSES)
+            if colored_tabs:
+                issues.append(f"цветной лист ({', '.join(sheet_name for sheet_name, _ in colored_tabs)})")
+            
+            if xls_scan.has_flagged_cells:
+                issues.append("желтые ячейки")
         
-        # Поиск заданных пользователем значений
-        found_values = []
-        if enable_value_search and search_values and isinstance(search_values, list) and len(search_values) > 0:
+        # Поиск заданных пользователем значений (для .xls значения ищутся при разборе книги)
+        if value_search is not None:
             try:
                 # Для XLSX и XLSM
                 if file_path.lower().endswith(('.xlsx', '.xlsm')):
-                    # Если мы еще не загрузили workbook ранее, загружаем его сейчас
-                    if wb is None:
-                        try:
-                            wb = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
-                        except Exception as e:
-                            print(f"Не удалось загрузить файл для поиска значений: {str(e)}")
-                    
-                    if wb is not None:
-                        # Проверяем каждый лист
-                        for sheet_name in wb.sheetnames:
-                            if len(found_values) == len(search_values):
-                                break  # Найдены все значения, прекращаем поиск
-                                
-                            sheet = wb[sheet_name]
-                            max_rows = min(2000, sheet.max_row)  # Ограничиваем область поиска
-                            max_cols = min(500, sheet.max_column)
-                            
-                            for row_idx in range(1, max_rows + 1):
-                                for col_idx in range(1, max_cols + 1):
-                                    try:
-                                        cell = sheet.cell(row=row_idx, column=col_idx)
-                                        if cell.value:
-                                            cell_str_value = str(cell.value)
-                                            # Проверяем каждое искомое значение
-                                            for value in search_values:
-                                                if value in cell_str_value and value not in found_values:
-                                                    found_values.append(value)
-                                    except Exception:
-                                        continue
-                                        
-                                if len(found_values) == len(search_values):
-                                    break  # Найдены все значения, прекращаем поиск
-                
-                # Для XLS файлов используем win32com
-                elif file_path.lower().endswith('.xls') and not found_values:
-                    # Если не все значения найдены и мы имеем дело с XLS
-                    pythoncom.CoInitialize()
-                    excel_app = None
-                    try:
-                        excel_app = win32com.client.Dispatch("Excel.Application")
-                        excel_app.Visible = False
-                        excel_app.DisplayAlerts = False
-                        excel_app.ScreenUpdating = False
-                        
-                        wb_search = None
-                        try:
-                            wb_search = excel_app.Workbooks.Open(file_path, ReadOnly=True, UpdateLinks=False)
-                            
-                            for i in range(1, wb_search.Sheets.Count + 1):
-                                if len(found_values) == len(search_values):
-                                    break  # Найдены все значения, прекращаем поиск
-                                    
-                                sheet = wb_search.Sheets(i)
-                                used_range = sheet.UsedRange
-                                
-                                if used_range:
-                                    rows_count = min(2000, used_range.Rows.Count)
-                                    cols_count = min(500, used_range.Columns.Count)
-                                    
-                                    for row in range(1, rows_count + 1):
-                                        for col in range(1, cols_count + 1):
-                                            try:
-                                                cell = sheet.Cells(row, col)
-                                                if cell.Value:
-                                                    cell_str_value = str(cell.Value)
-                                                    for value in search_values:
-                                                        if value in cell_str_value and value not in found_values:
-                                                            found_values.append(value)
-                                            except:
-                                                pass
-                                                
-                                        if len(found_values) == len(search_values):
-                                            break  # Найдены все значения
-                        finally:
-                            if wb_search:
-                                wb_search.Close(False)
-                    finally:
-                        if excel_app:
-                            excel_app.Quit()
+                    # Таблица общих строк проверяется один раз, затем листы сканируются потоково целиком
+                    report_phase("поиск заданных значений")
+                    with ZipFile(file_path) as xlsx_zip:
+                        search_workbook_values(xlsx_zip, read_sheet_parts(xlsx_zip), value_search, cancel_token)
             except Exception as e:
                 print(f"Ошибка при поиске значений: {str(e)}")
                 
             # Если найдены значения, добавляем их в список проблем
+            found_values = value_search.found_values()
             if found_values:
                 issues.append(f"найдены заданные значения: {', '.join(found_values)}")
                 
@@ -370,6 +191,8 @@ def check_excel_file(file_path, file_name, enable_value_search=False, search_val
             'comment': comment
         }
         
+    except ComFallbackDeferred:
+        raise
     except Exception as e:
         return {
             'file_name': file_name,
@@ -377,4 +200,132 @@ def check_excel_file(file_path, file_name, enable_value_search=False, search_val
             'file_path': file_path,
             'result': "Ошибка",
             'comment': f"Ошибка проверки: {str(e)}"
-        }
\ No newline at end of file
+        }
+
+
+def check_excel_file_with_win32com(file_path, file_name, enable_value_search=False, search_values=None, cancel_token=None):
+    """
+    Проверка Excel файла с использованием win32com (для книг .xls, которые не удалось разобрать напрямую).
+    Книга открывается один раз в одном из долгоживущих экземпляров Excel из пула.
+    
+    Args:
+        file_path (str): Путь к файлу
+        file_name (str): Имя файла
+        enable_value_search (bool): Флаг включения поиска заданных значений
+        search_values (list): Список значений для поиска
+        cancel_token (CancellationToken, optional): Признак отмены
+    """
+    # В процессах-исполнителях Office не запускается - файл проверяется в основном процессе
+    ensure_com_fallback_allowed(file_path)
+    report_phase("проверка через Excel")
+    
+    try:
+        issues = []
+        value_search = None
+        if enable_value_search and search_values and isinstance(search_values, list) and len(search_values) > 0:
+            # Один автомат ищет сразу все значения за один проход по тексту ячейки
+            value_search = compile_search_values(search_values).new_search()
+        
+        def inspect_workbook(wb):
+            """Проверка открытой книги (выполняется в потоке экземпляра Excel)"""
+            # Проверка только первых нескольких листов
+            max_sheets = min(3, wb.Sheets.Count)
+            
+            for i in range(1, max_sheets + 1):
+                check_cancelled(cancel_token)
+                sheet = wb.Sheets(i)
+                
+                # Проверка на цвет листа по общей таблице классификации цветов
+                try:
+                    if classify_com_color(sheet.Tab.Color, sheet.Tab.ColorIndex) in TAB_COLOR_CLASSES:
+                        issues.append(f"цветной лист ({sheet.Name})")
+                        break
+                except:
+                    pass
+                
+                # Проверка на желтые ячейки: поиск по формату во всем используемом диапазоне
+                if not "желтые ячейки" in issues:
+                    try:
+                        if find_filled_cell(wb.Application, sheet.UsedRange, com_colors_of_class(YELLOW)):
+                            issues.append("желтые ячейки")
+                    except:
+                        pass
+                
+                # Проверка на комментарии
+                if not "комментарии" in issues:
+                    try:
+                        if sheet.Comments and sheet.Comments.Count > 0:
+                            issues.append("комментарии")
+                    except:
+                        pass
+                
+                # Если все проблемы уже найдены, прекращаем проверку
+                if "комментарии" in issues and "желтые ячейки" in issues and "цветной лист" in issues:
+                    break
+            
+            # Поиск заданных пользователем значений
+            if value_search is not None:
+                try:
+                    for i in range(1, wb.Sheets.Count + 1):
+                        if value_search.complete:
+                            break  # Найдены все значения, прекращаем поиск
+                            
+                        sheet = wb.Sheets(i)
+                        used_range = sheet.UsedRange
+                        rows_count = used_range.Rows.Count
+                        cols_count = used_range.Columns.Count
+                        
+                        # Значения читаются блоками строк: один вызов на блок вместо вызова на ячейку
+                        for first_row in range(1, rows_count + 1, COM_READ_BLOCK_ROWS):
+                            check_cancelled(cancel_token)
+                            last_row = min(rows_count, first_row + COM_READ_BLOCK_ROWS - 1)
+                            block = sheet.Range(used_range.Cells(first_row, 1), used_range.Cells(last_row, cols_count))
+                            for text in iter_range_values(block.Value):
+                                if value_search.feed(text):
+                                    break  # Найдены все значения
+                                    
+                            if value_search.complete:
+                                break  # Найдены все значения
+                except Exception as e:
+                    print(f"Ошибка при поиске значений: {str(e)}")
+        
+        get_office_pool(EXCEL_APPLICATION).process(file_path, inspect_workbook, cancel_token)
+        
+        # Если найдены значения, добавляем их в список проблем
+        found_values = value_search.found_values() if value_search else []
+        if found_values:
+            issues.append(f"найдены заданные значения: {', '.join(found_values)}")
+                
+        # Формирование результата
+        if issues:
+            result = "Не пройден"
+            comment = "Найдено: " + ", ".join(set(issues))
+        else:
+            result = "Пройден"
+            comment = "Проблем не обнаружено"
+        
+        return {
+            'file_name': file_name,
+            'file_type': "Excel",
+            'file_path': file_path,
+            'result': result,
+            'comment': comment
+        }
+        
+    except TimeoutError as e:
+        # Excel не справился с книгой за отведенное время и был завершен
+        return {
+            'file_name': file_name,
+            'file_type': "Excel",
+            'file_path': file_path,
+            'result': "Тайм-аут",
+            'comment': f"{str(e)}, этап: проверка через Excel"
+        }
+    except Exception as e:
+        return {
+            'file_name': file_name,
+            'file_type': "Excel",
+            'file_path': file_path,
+            'result': "Ошибка",
+            'comment': f"Ошибка проверки: {str(e)}"
+        }
@@ -1,13 +1,213 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
+import concurrent.futures
 import os
 import platform
+import stat
 import subprocess
 
+# Папки, которые не обходятся при поиске файлов
+DEFAULT_EXCLUDED_DIRS = ('$RECYCLE.BIN', 'System Volume Information')
+
+# Наибольшее число папок, читаемых одновременно
+DEFAULT_MAX_LISTINGS = 16
+
 def normalize_path(path):
     """Заменяет прямые слеши на обратные"""
     return path.replace('/', '\\')
 
+class FoundFile:
+    """
+    Найденный файл и его размер и время изменения из записи каталога.
+    
+    При обходе папки сведения берутся из DirEntry (в Windows - без отдельного
+    обращения к файлу), поэтому последующие проверки размера и даты не
+    обращаются к файловой системе повторно.
+    """
+    def __init__(self, path, size=None, mtime=None):
+        self.path = path
+        self.size = size
+        self.mtime = mtime
+    
+    @classmethod
+    def from_stat(cls, path, stat_result):
+        """Создает описание файла по результату stat (None, если stat недоступен)"""
+        if stat_result is None:
+            return cls(path)
+        return cls(path, stat_result.st_size, stat_result.st_mtime)
+
+def _safe_stat(entry_or_path):
+    """Возвращает stat для DirEntry или пути; None, если файл недоступен"""
+    try:
+        if isinstance(entry_or_path, os.DirEntry):
+            return entry_or_path.stat()
+        return os.stat(entry_or_path)
+    except OSError:
+        return None
+
+def _is_excluded_dir(entry, excluded_dirs):
+    """Проверяет, исключена ли папка из обхода (по имени или полному пути)"""
+    return (os.path.normcase(entry.name) in excluded_dirs
+            or os.path.normcase(os.path.abspath(entry.path)) in excluded_dirs)
+
+def _directory_id(path, device, inode):
+    """
+    Идентификатор папки для обнаружения циклов через ссылки и точки соединения.
+    
+    На сетевых папках (SMB, DFS), томах FAT/exFAT и некоторых NAS номер файла
+    всегда равен 0 - тогда папка определяется по реальному пути.
+    
+    Args:
+        path (str): Путь к папке
+        device (int): Номер устройства
+        inode (int): Номер файла (0, если файловая система его не сообщает)
+    
+    Returns:
+        tuple или str: (устройство, номер файла) или реальный путь в normcase
+    """
+    if inode:
+        return (device, inode)
+    return os.path.normcase(os.path.realpath(path))
+
+def _is_link(entry):
+    """Проверяет, является ли запись ссылкой или точкой соединения (junction)"""
+    if entry.is_symlink():
+        return True
+    # Точки соединения и точки подключения томов Windows - тоже точки повторной обработки
+    attributes = getattr(entry.stat(follow_symlinks=False), 'st_file_attributes', 0)
+    return bool(attributes & stat.FILE_ATTRIBUTE_REPARSE_POINT)
+
+def _subdirectory(entry, device):
+    """
+    Описание вложенной папки по записи каталога родительской папки.
+    
+    Для обычной папки идентификатор берется из записи каталога: в Windows
+    номер устройства не меняется без точки подключения, поэтому наследуется
+    от родительской папки. Только ссылка требует отдельного запроса - ее
+    идентификатор берется у папки, на которую она указывает.
+    
+    Args:
+        entry (os.DirEntry): Запись вложенной папки
+        device (int): Номер устройства родительской папки
+    
+    Returns:
+        tuple: (путь, номер устройства, идентификатор папки)
+    """
+    if _is_link(entry):
+        target_stat = os.stat(entry.path)
+        device, inode = target_stat.st_dev, target_stat.st_ino
+    elif os.name == 'nt':
+        inode = entry.inode()
+    else:
+        entry_stat = entry.stat(follow_symlinks=False)
+        device, inode = entry_stat.st_dev, entry_stat.st_ino
+    return entry.path, device, _directory_id(entry.path, device, inode)
+
+def _list_directory(directory, device, extensions, excluded_dirs, follow_links):
+    """
+    Читает одну папку (выполняется в потоке обхода).
+    
+    Args:
+        directory (str): Путь к папке
+        device (int): Номер устройства папки
+        extensions (set): Расширения файлов для проверки
+        excluded_dirs (set): Исключенные имена и пути папок (в normcase)
+        follow_links (bool): Обходить ли ссылки на папки
+    
+    Returns:
+        tuple: (найденные файлы, вложенные папки (путь, устройство, идентификатор))
+    """
+    files = []
+    subdirs = []
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir():
+                        if entry.is_symlink() and not follow_links:
+                            continue
+                        # Исключенные папки отбрасываются до чтения их содержимого
+                        if not _is_excluded_dir(entry, excluded_dirs):
+                            subdirs.append(_subdirectory(entry, device))
+                        continue
+                except OSError:
+                    continue
+                
+                if entry.name.startswith("~$"):
+                    continue
+                if os.path.splitext(entry.name)[1].lower() in extensions:
+                    files.append(FoundFile.from_stat(normalize_path(entry.path), _safe_stat(entry)))
+    except OSError:
+        # Недоступные папки пропускаем, как и os.walk
+        pass
+    return files, subdirs
+
+def iter_files_to_check(path, extensions, excluded_dirs=DEFAULT_EXCLUDED_DIRS, follow_links=True,
+                        max_listings=DEFAULT_MAX_LISTINGS):
+    """
+    Находит файлы для проверки по мере обхода, не дожидаясь окончания поиска.
+    
+    Папки читаются параллельно (не больше max_listings одновременно): на сетевых
+    папках каждое чтение каталога - отдельный запрос к серверу, и время обхода
+    определяется задержкой, а не объемом данных.
+    
+    Args:
+        path (str): Файл, папка или список файлов, разделенных '|||'
+        extensions (list): Расширения файлов для проверки ('.docx', ...)
+        excluded_dirs (iterable): Имена или полные пути папок, которые не обходятся
+        follow_links (bool): Обходить ли символические ссылки на папки
+        max_listings (int): Наибольшее число одновременно читаемых папок
+    
+    Yields:
+        FoundFile: Найденный файл (временные файлы '~$...' пропускаются)
+    """
+    extensions = set(extensions)
+    
+    # Список файлов (с разделителем |||) или отдельный файл
+    if "|||" in path or os.path.isfile(path):
+        for file_path in path.split("|||"):
+            file_name = os.path.basename(file_path)
+            if os.path.splitext(file_name)[1].lower() in extensions and not file_name.startswith("~$"):
+                yield FoundFile.from_stat(normalize_path(file_path), _safe_stat(file_path))
+        return
+    
+    # Исключения задаются именами папок или полными путями
+    excluded_dirs = {os.path.normcase(os.path.abspath(item) if os.path.dirname(item) else item)
+                     for item in (excluded_dirs or ())}
+    
+    try:
+        root_stat = os.stat(path)
+    except OSError:
+        return
+    
+    # Папки, уже поставленные в очередь (по идентификатору), - защита от циклов через ссылки
+    root_id = _directory_id(path, root_stat.st_dev, root_stat.st_ino)
+    visited_dirs = {root_id}
+    pending_dirs = [(path, root_stat.st_dev)]
+    in_flight = set()
+    
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=max(1, max_listings))
+    try:
+        while pending_dirs or in_flight:
+            # Ставим в очередь новые папки, не превышая число одновременных чтений
+            while pending_dirs and len(in_flight) < max_listings:
+                directory, device = pending_dirs.pop()
+                in_flight.add(executor.submit(_list_directory, directory, device, extensions,
+                                              excluded_dirs, follow_links))
+            
+            done, in_flight = concurrent.futures.wait(in_flight, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                files, subdirs = future.result()
+                for subdir, device, directory_id in reversed(subdirs):
+                    if directory_id not in visited_dirs:
+                        visited_dirs.add(directory_id)
+                        pending_dirs.append((subdir, device))
+                for found_file in files:
+                    yield found_file
+    finally:
+        # Если обход прерван, незапущенные чтения папок отменяются
+        executor.shutdown(wait=False, cancel_futures=True)
+
 def get_file_type(file_path):
     """Определяет тип файла по расширению"""
     extension = os.path.splitext(file_path)[1].lower()
@@ -19,7 +219,7 @@ def get_file_type(file_path):
     else:
         return "Неизвестный"
 
-def detect_file_size_category(file_path):
+def detect_file_size_category(file_path, file_size=None):
     """
     Определяет категорию размера файла для выбора оптимальной стратегии проверки.
     
@@ -30,7 +230,9 @@ def detect_file_size_category(file_path):
     - "very_large": Очень большой файл (более 100 МБ)
     """
     try:
-        file_size = os.path.getsize(file_path)
+        # Размер, уже известный из записи каталога, повторно не запрашивается
+        if file_size is None:
+            file_size = os.path.getsize(file_path)
         # Категории размера (в байтах)
         if file_size < 5 * 1024 * 1024:  # до 5 МБ
             return "small"
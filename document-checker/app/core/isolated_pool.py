@@ -0,0 +1,306 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import collections
+import concurrent.futures
+import multiprocessing
+import threading
+import time
+from multiprocessing.connection import wait
+
+from app.core.check_runner import check_files_chunk, init_process_worker, make_interrupted_result
+from app.utils.threading_utils import get_process_memory, set_phase_reporter
+
+# Как часто сторож проверяет сроки процессов-исполнителей (в секундах)
+WATCHDOG_INTERVAL = 0.05
+
+# Как часто запрашивается память процессов-исполнителей (в секундах)
+MEMORY_CHECK_INTERVAL = 0.5
+
+# Сколько ждать штатного завершения процесса-исполнителя (в секундах)
+WORKER_STOP_TIMEOUT = 2
+
+# Сколько процесс-исполнитель может запускаться (импорт модулей при spawn),
+# прежде чем время начнет засчитываться первому файлу порции (в секундах)
+WORKER_START_TIMEOUT = 60
+
+# Этап проверки, пока процесс-исполнитель не сообщил другой
+PHASE_STARTED = "начало проверки"
+
+def isolated_worker_main(connection):
+    """
+    Главная функция процесса-исполнителя: получает порции файлов и отправляет
+    результаты и этапы проверки по мере продвижения.
+
+    Args:
+        connection: Канал связи с основным процессом
+    """
+    init_process_worker()
+    set_phase_reporter(lambda phase: connection.send(('phase', phase)))
+    while True:
+        try:
+            task = connection.recv()
+        except EOFError:
+            break
+        if task is None:
+            break
+        chunk, plan = task
+        # Процесс готов: с этого сообщения отсчитывается время первого файла
+        connection.send(('phase', PHASE_STARTED))
+        check_files_chunk(chunk, plan, lambda file_index, file_path, result: connection.send(('result', result)))
+
+class ChunkTask:
+    """Порция файлов, переданная в пул; файлы удаляются из нее по мере проверки"""
+    def __init__(self, chunk, plan):
+        self.files = collections.deque(chunk)
+        self.plan = plan
+        self.results = []
+        self.future = concurrent.futures.Future()
+
+    def complete_file(self, result):
+        """Записывает результат текущего (первого непроверенного) файла"""
+        file_index, file_path, _ = self.files.popleft()
+        self.results.append((file_index, file_path, result))
+
+class IsolatedWorker:
+    """Процесс-исполнитель с собственным каналом; может быть завершен отдельно от остальных"""
+    def __init__(self, context):
+        self.connection, child_connection = context.Pipe()
+        self.process = context.Process(target=isolated_worker_main, args=(child_connection,), daemon=True)
+        self.process.start()
+        child_connection.close()
+        self.task = None
+        self.assigned = None
+        self.file_started = None
+        self.phase = None
+        self.memory_checked = 0
+
+    def assign(self, task):
+        """Передает процессу оставшиеся файлы порции"""
+        self.task = task
+        # Время файла отсчитывается с первого сообщения процесса, а не с передачи порции:
+        # запуск нового процесса не засчитывается первому файлу
+        self.assigned = time.monotonic()
+        self.file_started = None
+        self.phase = PHASE_STARTED
+        self.connection.send((list(task.files), task.plan))
+
+    def kill(self):
+        """Принудительно завершает процесс"""
+        self.process.kill()
+        self.process.join(WORKER_STOP_TIMEOUT)
+
+    def stop(self):
+        """Завершает процесс штатно, а если он не отвечает - принудительно"""
+        try:
+            self.connection.send(None)
+        except OSError:
+            pass
+        self.process.join(WORKER_STOP_TIMEOUT)
+        if self.process.is_alive():
+            self.kill()
+        self.connection.close()
+
+class IsolatedWorkerPool:
+    """
+    Процессы-исполнители для разбора файлов под надзором сторожа.
+
+    В отличие от ProcessPoolExecutor, каждый процесс можно завершить отдельно:
+    если файл превышает лимит времени или памяти из CheckPlan, сторож завершает
+    процесс, записывает результат с этапом, на котором проверка остановилась,
+    и передает остаток порции новому процессу. Аварийное завершение процесса
+    обрабатывается так же - пул остается пригодным.
+    """
+    def __init__(self, max_workers):
+        self.max_workers = max(1, max_workers)
+        self._context = multiprocessing.get_context()
+        self._workers = []
+        self._queue = collections.deque()
+        self._lock = threading.Lock()
+        self._closed = False
+        self._watchdog = threading.Thread(target=self._watch, daemon=True)
+        self._watchdog.start()
+
+    def submit_chunk(self, chunk, plan):
+        """
+        Ставит порцию файлов в очередь на проверку.
+
+        Args:
+            chunk (list): Тройки (индекс файла, путь к файлу, размер файла или None)
+            plan (CheckPlan): Настройки проверки
+
+        Returns:
+            concurrent.futures.Future: Результат как у check_files_chunk
+        """
+        task = ChunkTask(chunk, plan)
+        with self._lock:
+            self._queue.append(task)
+            self._dispatch()
+        return task.future
+
+    def shutdown(self):
+        """Завершает все процессы-исполнители"""
+        with self._lock:
+            self._closed = True
+            workers, self._workers = self._workers, []
+            tasks = [worker.task for worker in workers if worker.task is not None] + list(self._queue)
+            self._queue.clear()
+        for task in tasks:
+            task.future.cancel()
+        for worker in workers:
+            worker.stop()
+
+    def _dispatch(self):
+        """Передает порции из очереди свободным процессам (вызывается под блокировкой)"""
+        while self._queue and not self._closed:
+            task = self._queue[0]
+            # Отмененные порции (остановка проверки) не отправляются
+            if task.future.cancelled():
+                self._queue.popleft()
+                continue
+            worker = next((worker for worker in self._workers if worker.task is None), None)
+            if worker is None:
+                if len(self._workers) >= self.max_workers:
+                    return
+                worker = IsolatedWorker(self._context)
+                self._workers.append(worker)
+            self._queue.popleft()
+            try:
+                worker.assign(task)
+            except OSError:
+                # Процесс завершился, не успев получить порцию - порция ждет другого процесса
+                worker.task = None
+                worker.kill()
+                self._workers.remove(worker)
+                self._queue.appendleft(task)
+
+    def _watch(self):
+        """Поток-сторож: принимает результаты и следит за сроками и памятью процессов"""
+        while True:
+            with self._lock:
+                if self._closed:
+                    return
+                busy = [worker for worker in self._workers if worker.task is not None]
+            if not busy:
+                time.sleep(WATCHDOG_INTERVAL)
+                continue
+
+            try:
+                ready = wait([worker.connection for worker in busy], timeout=WATCHDOG_INTERVAL)
+            except OSError:
+                continue  # Канал закрыт при остановке пула
+            with self._lock:
+                if self._closed:
+                    return
+                now = time.monotonic()
+                for worker in busy:
+                    if worker.connection in ready:
+                        self._receive(worker)
+                    if worker.task is not None:
+                        self._enforce_limits(worker, now)
+                self._dispatch()
+
+    def _receive(self, worker):
+        """Принимает сообщения процесса (вызывается под блокировкой)"""
+        try:
+            while worker.task is not None and worker.connection.poll():
+                kind, value = worker.connection.recv()
+                if kind == 'phase':
+                    worker.phase = value
+                    if worker.file_started is None:
+                        worker.file_started = time.monotonic()
+                    continue
+                worker.task.complete_file(value)
+                worker.file_started = time.monotonic()
+                worker.phase = PHASE_STARTED
+                if not worker.task.files:
+                    self._finish(worker.task)
+                    worker.task = None
+        except (EOFError, OSError):
+            # Процесс завершился сам (сбой библиотеки разбора, нехватка памяти)
+            self._interrupt(worker, "Ошибка", "Процесс проверки аварийно завершился")
+
+    def _enforce_limits(self, worker, now):
+        """Прерывает проверку файла, превысившего лимит (вызывается под блокировкой)"""
+        plan = worker.task.plan
+        # Порция отменена (остановка проверки) - процесс завершается, не дожидаясь конца файла
+        if worker.task.future.cancelled():
+            self._interrupt(worker)
+            return
+
+        # Пока процесс не сообщил о готовности, к лимиту добавляется время на запуск
+        file_started = worker.file_started or worker.assigned + WORKER_START_TIMEOUT
+        if plan.file_timeout and now - file_started > plan.file_timeout:
+            self._interrupt(worker, "Тайм-аут", f"Превышено время проверки ({plan.file_timeout} с)")
+            return
+
+        if plan.max_memory_mb and now - worker.memory_checked >= MEMORY_CHECK_INTERVAL:
+            worker.memory_checked = now
+            memory = get_process_memory(worker.process.pid)
+            if memory is not None and memory > plan.max_memory_mb * 1024 * 1024:
+                self._interrupt(worker, "Ошибка", f"Превышен лимит памяти ({plan.max_memory_mb} МБ)")
+
+    def _interrupt(self, worker, result=None, reason=None):
+        """
+        Завершает процесс и записывает результат файла, на котором он остановился;
+        остаток порции возвращается в начало очереди (вызывается под блокировкой).
+        """
+        task = worker.task
+        file_index = task.files[0][0]
+        worker.kill()
+
+        # Результаты, отправленные процессом до завершения, не теряются
+        try:
+            while worker.task is not None and worker.connection.poll():
+                kind, value = worker.connection.recv()
+                if kind == 'phase':
+                    worker.phase = value
+                elif task.files:
+                    task.complete_file(value)
+        except (EOFError, OSError):
+            pass
+        worker.connection.close()
+        worker.task = None
+        self._workers.remove(worker)
+
+        # Файл мог успеть завершиться - тогда прерванным его не считаем
+        if result is not None and task.files and task.files[0][0] == file_index:
+            file_path = task.files[0][1]
+            task.complete_file(make_interrupted_result(file_path, result, f"{reason}, этап: {worker.phase}"))
+
+        if task.future.cancelled():
+            return
+        if task.files:
+            self._queue.appendleft(task)
+        else:
+            self._finish(task)
+
+    def _finish(self, task):
+        try:
+            task.future.set_result(task.results)
+        except concurrent.futures.InvalidStateError:
+            pass  # Порция отменена, пока проверялся последний файл
+
+# Пул сохраняется между запусками проверки: процессы-исполнители
+# загружают модули проверки один раз
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_isolated_pool(max_workers):
+    """
+    Возвращает долгоживущий пул процессов-исполнителей.
+    Пул пересоздается только при изменении числа процессов.
+
+    Args:
+        max_workers (int): Количество процессов
+
+    Returns:
+        IsolatedWorkerPool: Пул процессов
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is not None and _pool.max_workers != max(1, max_workers):
+            _pool.shutdown()
+            _pool = None
+        if _pool is None:
+            _pool = IsolatedWorkerPool(max_workers)
+        return _pool
@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import datetime
+import re
+
+# Встроенные форматы дат и времени Excel (numFmtId / ifmt), не описываемые в книге
+BUILTIN_DATE_FORMATS = {
+    14: 'mm-dd-yy',
+    15: 'd-mmm-yy',
+    16: 'd-mmm',
+    17: 'mmm-yy',
+    18: 'h:mm AM/PM',
+    19: 'h:mm:ss AM/PM',
+    20: 'h:mm',
+    21: 'h:mm:ss',
+    22: 'm/d/yy h:mm',
+    45: 'mm:ss',
+    46: '[h]:mm:ss',
+    47: 'mmss.0'
+}
+
+# Начала отсчета дат: система 1900 (с учетом несуществующего 29.02.1900) и система 1904
+WINDOWS_EPOCH = datetime.datetime(1899, 12, 30)
+MAC_EPOCH = datetime.datetime(1904, 1, 1)
+
+# Строки в кавычках, экранированные символы и секции в квадратных скобках
+# (цвет, условие, локаль), кроме секций прошедшего времени [h], [mm], [ss]
+FORMAT_LITERALS_RE = re.compile(r'"[^"]*"|\\.|\[(?!(?:h+|m+|s+)\])[^\]]*\]', re.IGNORECASE)
+
+# Элементы даты и времени в коде формата
+DATE_PARTS_RE = re.compile(r'[dmyhs]', re.IGNORECASE)
+
+# Секции прошедшего времени: значение выводится как длительность
+ELAPSED_TIME_RE = re.compile(r'\[(?:h+|m+|s+)\]', re.IGNORECASE)
+
+SECONDS_PER_DAY = 24 * 60 * 60
+
+def is_date_format(format_code):
+    """
+    Определяет, выводит ли код числового формата дату или время.
+
+    Args:
+        format_code (str): Код формата ('dd.mm.yyyy', '0.00', ...)
+
+    Returns:
+        bool: True для форматов даты и времени
+    """
+    if not format_code or format_code.lower() == 'general':
+        return False
+    # Дату определяет первая секция формата (для положительных чисел)
+    code = FORMAT_LITERALS_RE.sub('', format_code).split(';')[0]
+    return DATE_PARTS_RE.search(code) is not None
+
+def date_format_codes(custom_formats, style_formats):
+    """
+    Определяет стили ячеек с форматами даты и времени.
+
+    Args:
+        custom_formats (dict): Коды форматов, описанных в книге: идентификатор -> код
+        style_formats (list): Идентификатор формата каждого стиля ячеек по порядку
+
+    Returns:
+        dict: Индекс стиля -> код формата даты
+    """
+    date_styles = {}
+    for style_id, format_id in enumerate(style_formats):
+        format_code = custom_formats.get(format_id, BUILTIN_DATE_FORMATS.get(format_id))
+        if is_date_format(format_code):
+            date_styles[style_id] = format_code
+    return date_styles
+
+def format_date_value(serial, format_code, date1904=False):
+    """
+    Текстовое представление даты, хранящейся как число, - так же, как ее
+    выводит openpyxl: '2023-05-01 00:00:00', '12:30:00' или '1 day, 2:00:00'.
+
+    Args:
+        serial (float): Значение ячейки (дней от начала отсчета)
+        format_code (str): Код формата даты
+        date1904 (bool): Книга использует систему дат 1904
+
+    Returns:
+        str: Текст даты или None, если число не является допустимой датой
+    """
+    day, fraction = divmod(serial, 1)
+    try:
+        diff = datetime.timedelta(milliseconds=round(fraction * SECONDS_PER_DAY * 1000))
+        if ELAPSED_TIME_RE.search(format_code):
+            return str(datetime.timedelta(days=day) + diff)
+        if 0 <= serial < 1 and diff.days == 0:
+            return str((datetime.datetime.min + diff).time())
+        if date1904:
+            return str(MAC_EPOCH + datetime.timedelta(days=day) + diff)
+        # В системе 1900 Excel считает 1900 год високосным: до 01.03.1900 день смещен
+        if 0 < serial < 60:
+            day += 1
+        return str(WINDOWS_EPOCH + datetime.timedelta(days=day) + diff)
+    except (OverflowError, ValueError):
+        return None
@@ -0,0 +1,187 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import posixpath
+import xml.etree.ElementTree as ET
+
+# Пространства имен пакета OOXML
+CT_NS = '{http://schemas.openxmlformats.org/package/2006/content-types}'
+REL_NS = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+
+# Типы содержимого частей с комментариями и примечаниями
+COMMENT_CONTENT_TYPES = {
+    'application/vnd.openxmlformats-officedocument.wordprocessingml.comments+xml',
+    'application/vnd.openxmlformats-officedocument.spreadsheetml.comments+xml',
+    'application/vnd.ms-excel.threadedcomments+xml'
+}
+
+# Окончания типов связей, ведущих к комментариям
+COMMENT_REL_SUFFIXES = ('/comments', '/threadedComment')
+
+# Основные части документов Word и Excel
+WORD_MAIN_PART = 'word/document.xml'
+EXCEL_MAIN_PART = 'xl/workbook.xml'
+
+class PackageTriage:
+    """
+    Результат предварительной проверки OOXML-пакета по метаданным.
+    Использует только центральный каталог ZIP, [Content_Types].xml и файлы связей,
+    ни одна крупная часть документа при этом не распаковывается.
+    """
+    def __init__(self):
+        # Имена всех частей пакета (из центрального каталога)
+        self.names = set()
+
+        # Части с комментариями, на которые ссылаются связи документа
+        self.comment_parts = []
+
+        # Найденные по метаданным проблемы
+        self.issues = []
+
+    @property
+    def has_comments(self):
+        """Содержит ли пакет комментарии или примечания"""
+        return bool(self.comment_parts)
+
+    def is_decided(self, first_issue_only=False, need_content=False):
+        """
+        Определяет, достаточно ли метаданных для итогового вердикта.
+
+        Args:
+            first_issue_only (bool): Достаточно ли первой найденной проблемы
+            need_content (bool): Нужен ли разбор содержимого (например, для поиска значений)
+
+        Returns:
+            bool: True, если распаковка содержимого не требуется
+        """
+        return bool(self.issues) and first_issue_only and not need_content
+
+def resolve_rel_target(source_part, target):
+    """
+    Переводит цель связи в имя части пакета.
+
+    Args:
+        source_part (str): Часть, которой принадлежит файл связей (например, 'word/document.xml')
+        target (str): Значение атрибута Target
+
+    Returns:
+        str: Имя части внутри ZIP-архива
+    """
+    if target.startswith('/'):
+        return target.lstrip('/')
+    return posixpath.normpath(posixpath.join(posixpath.dirname(source_part), target))
+
+def rels_path_for(part_name):
+    """Возвращает имя файла связей для указанной части пакета"""
+    directory, base = posixpath.split(part_name)
+    return posixpath.join(directory, '_rels', base + '.rels')
+
+def read_part_rels(zip_file, part_name):
+    """
+    Читает связи указанной части пакета.
+
+    Args:
+        zip_file (ZipFile): Открытый пакет
+        part_name (str): Имя части (например, 'word/document.xml')
+
+    Returns:
+        list: Пары (тип связи, имя целевой части); пустой список, если связей нет
+    """
+    rels_name = rels_path_for(part_name)
+    try:
+        rels_content = zip_file.read(rels_name)
+    except KeyError:
+        return []
+
+    rels = []
+    for rel in ET.fromstring(rels_content).iter(REL_NS + 'Relationship'):
+        if rel.get('TargetMode') == 'External':
+            continue
+        rels.append((rel.get('Type', ''), resolve_rel_target(part_name, rel.get('Target', ''))))
+    return rels
+
+def read_part_rel_targets(zip_file, part_name):
+    """
+    Читает связи указанной части пакета с их идентификаторами.
+
+    Args:
+        zip_file (ZipFile): Открытый пакет
+        part_name (str): Имя части (например, 'xl/workbook.xml')
+
+    Returns:
+        dict: Идентификатор связи (r:id) -> имя целевой части
+    """
+    try:
+        rels_content = zip_file.read(rels_path_for(part_name))
+    except KeyError:
+        return {}
+
+    targets = {}
+    for rel in ET.fromstring(rels_content).iter(REL_NS + 'Relationship'):
+        if rel.get('TargetMode') == 'External':
+            continue
+        targets[rel.get('Id')] = resolve_rel_target(part_name, rel.get('Target', ''))
+    return targets
+
+def read_content_types(zip_file):
+    """
+    Читает переопределения типов содержимого из [Content_Types].xml.
+
+    Returns:
+        dict: Имя части -> тип содержимого
+    """
+    try:
+        content = zip_file.read('[Content_Types].xml')
+    except KeyError:
+        return {}
+
+    overrides = {}
+    for override in ET.fromstring(content).iter(CT_NS + 'Override'):
+        part_name = override.get('PartName', '').lstrip('/')
+        overrides[part_name] = override.get('ContentType', '')
+    return overrides
+
+def triage_package(zip_file):
+    """
+    Предварительная проверка OOXML-пакета (Word или Excel) по метаданным.
+
+    Args:
+        zip_file (ZipFile): Открытый пакет
+
+    Returns:
+        PackageTriage: Результат предварительной проверки
+    """
+    triage = PackageTriage()
+    triage.names = set(zip_file.namelist())
+
+    # Кандидаты в части с комментариями - по типам содержимого
+    content_types = read_content_types(zip_file)
+    candidates = {part for part, content_type in content_types.items()
+                  if content_type in COMMENT_CONTENT_TYPES and part in triage.names}
+
+    # Источники связей: основная часть документа Word или листы Excel
+    if WORD_MAIN_PART in triage.names:
+        sources = [WORD_MAIN_PART]
+    else:
+        sources = [name for name in triage.names
+                   if name.startswith('xl/worksheets/') and name.endswith('.xml')]
+
+    # Подтверждаем кандидатов связями - "осиротевшие" части комментариев не учитываются
+    has_rels = False
+    referenced = set()
+    for source in sources:
+        if rels_path_for(source) in triage.names:
+            has_rels = True
+        for rel_type, target in read_part_rels(zip_file, source):
+            if rel_type.endswith(COMMENT_REL_SUFFIXES) and target in triage.names:
+                referenced.add(target)
+
+    if has_rels:
+        comment_parts = referenced
+    else:
+        comment_parts = candidates
+
+    triage.comment_parts = sorted(comment_parts)
+    if triage.comment_parts:
+        triage.issues.append("комментарии")
+
+    return triage
@@ -151,7 +151,8 @@ class ReportManager:
                 'Тип файла': result['file_type'],
                 'Путь к файлу': file_path,
                 'Результат проверки': result['result'],
-                'Комментарий по результатам проверки': result['comment']
+                'Комментарий по результатам проверки': result['comment'],
+                'Примечание': result.get('note', '')
             })
         
         # Объединение существующих и новых данных
@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import datetime
+import os
+import sqlite3
+import threading
+
+# Имя файла кэша результатов (рядом с файлом настроек)
+CACHE_FILE_NAME = "document_checker_cache.sqlite"
+
+# Результаты, которые сохраняются в кэше; ошибки, пропуски (например, файл
+# заблокирован) и предупреждения после сбоя Office могут быть временными
+# и при следующем запуске проверяются заново
+CACHEABLE_RESULTS = ("Пройден", "Не пройден")
+
+class ResultCache:
+    """
+    Кэш результатов проверки между запусками (SQLite).
+
+    Результат файла используется повторно, если не изменились путь, размер,
+    время изменения файла и настройки проверки (хэш CheckPlan). Новые
+    результаты накапливаются и записываются пакетами в flush.
+    """
+    def __init__(self, db_path):
+        self._lock = threading.Lock()
+        self._pending = []
+        self._connection = sqlite3.connect(db_path, check_same_thread=False)
+        try:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+        except sqlite3.DatabaseError:
+            pass  # Например, на сетевом диске - остаемся в режиме журнала по умолчанию
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "path TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime REAL NOT NULL, settings_hash TEXT NOT NULL, "
+            "file_type TEXT, result TEXT, comment TEXT, checked_at TEXT)"
+        )
+        # Результаты, которые больше не кэшируются (сохраненные прежними версиями), удаляются
+        self._connection.execute(
+            f"DELETE FROM results WHERE result NOT IN ({', '.join('?' * len(CACHEABLE_RESULTS))})",
+            CACHEABLE_RESULTS
+        )
+        self._connection.commit()
+
+    @staticmethod
+    def _key(file_path):
+        """
+        Ключ файла: полный нормализованный путь (без '..' и относительных частей),
+        без учета регистра там, где файловая система его не учитывает
+        """
+        return os.path.normcase(os.path.abspath(os.path.normpath(file_path)))
+
+    def lookup(self, file_path, size, mtime, settings_hash):
+        """
+        Возвращает сохраненный результат, если файл и настройки не изменились.
+
+        Args:
+            file_path (str): Путь к файлу
+            size (int): Размер файла
+            mtime (float): Время изменения файла
+            settings_hash (str): Хэш настроек проверки
+
+        Returns:
+            dict: Результат проверки с примечанием о кэше или None
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT file_type, result, comment, checked_at FROM results "
+                "WHERE path = ? AND size = ? AND mtime = ? AND settings_hash = ?",
+                (self._key(file_path), size, mtime, settings_hash)
+            ).fetchone()
+        if row is None:
+            return None
+
+        file_type, result, comment, checked_at = row
+        return {
+            'file_name': os.path.basename(file_path),
+            'file_type': file_type,
+            'file_path': file_path,
+            'result': result,
+            'comment': comment,
+            'note': f"Из кэша (проверен {checked_at})"
+        }
+
+    def store(self, file_path, size, mtime, settings_hash, result):
+        """
+        Добавляет результат в очередь записи (записывается при flush).
+
+        Args:
+            file_path (str): Путь к файлу
+            size (int): Размер файла
+            mtime (float): Время изменения файла
+            settings_hash (str): Хэш настроек проверки
+            result (dict): Результат проверки
+        """
+        if result.get('result') not in CACHEABLE_RESULTS:
+            return
+        checked_at = datetime.datetime.now().strftime("%d.%m.%Y %H:%M:%S")
+        with self._lock:
+            self._pending.append((self._key(file_path), size, mtime, settings_hash,
+                                  result['file_type'], result['result'], result['comment'], checked_at))
+
+    def flush(self):
+        """Записывает накопленные результаты одной транзакцией"""
+        with self._lock:
+            pending, self._pending = self._pending, []
+            if pending:
+                self._connection.executemany(
+                    "INSERT OR REPLACE INTO results "
+                    "(path, size, mtime, settings_hash, file_type, result, comment, checked_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    pending
+                )
+                self._connection.commit()
+
+    def close(self):
+        """Записывает накопленные результаты и закрывает базу"""
+        try:
+            self.flush()
+        finally:
+            self._connection.close()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import heapq
+import os
+
+from app.core.check_runner import MAX_CHUNK_SIZE
+from app.core.file_utils import detect_file_size_category
+
+# Мелкие файлы объединяются в одну задачу для потока, пока их суммарная
+# трудоемкость не достигнет этой величины (но не больше MAX_TASK_FILES файлов)
+TASK_TARGET_COST = 1024 * 1024
+MAX_TASK_FILES = 16
+
+# Объем работы одной порции для процесса-исполнителя (не больше MAX_CHUNK_SIZE файлов)
+CHUNK_TARGET_COST = 32 * 1024 * 1024
+
+# Трудоемкость файла, размер которого неизвестен
+UNKNOWN_SIZE_COST = 256 * 1024
+
+# Множитель трудоемкости по расширению: DOCX и XLSX (и их варианты с макросами) сжаты,
+# и объем разбираемого XML в несколько раз больше размера файла; DOC и XLS читаются
+# почти без распаковки
+COST_WEIGHTS = {
+    '.docx': 4,
+    '.docm': 4,
+    '.xlsx': 4,
+    '.xlsm': 4
+}
+
+def estimate_cost(file_path, file_size, skip_large_files=True):
+    """
+    Оценивает трудоемкость проверки файла.
+
+    Args:
+        file_path (str): Путь к файлу
+        file_size (int): Размер файла или None, если неизвестен
+        skip_large_files (bool): Пропускаются ли очень большие файлы
+
+    Returns:
+        int: Условная трудоемкость (примерно в байтах разбираемых данных)
+    """
+    if file_size is None:
+        return UNKNOWN_SIZE_COST
+    # Очень большой файл при включенном пропуске не разбирается вовсе
+    if skip_large_files and detect_file_size_category(file_path, file_size) == "very_large":
+        return 0
+    return file_size * COST_WEIGHTS.get(os.path.splitext(file_path)[1].lower(), 1)
+
+class CheckScheduler:
+    """
+    Очередь найденных файлов, ожидающих отправки на проверку.
+
+    Файлы выдаются в порядке убывания трудоемкости: большой файл, найденный
+    последним, не задерживает окончание проверки. Мелкие файлы выдаются
+    пакетами, чтобы на каждый из них не тратилась отдельная задача.
+    """
+    def __init__(self, skip_large_files=True):
+        self.skip_large_files = skip_large_files
+        self._heap = []
+
+    def __len__(self):
+        return len(self._heap)
+
+    def add(self, file_index, file_path, file_size=None):
+        """
+        Добавляет файл в очередь.
+
+        Args:
+            file_index (int): Индекс файла
+            file_path (str): Путь к файлу
+            file_size (int, optional): Размер файла
+        """
+        cost = estimate_cost(file_path, file_size, self.skip_large_files)
+        heapq.heappush(self._heap, (-cost, file_index, file_path, file_size))
+
+    def take_task(self):
+        """
+        Выдает задачу для потока: самый трудоемкий файл или пакет мелких файлов.
+
+        Returns:
+            list: Тройки (индекс файла, путь к файлу, размер файла)
+        """
+        return self._take(MAX_TASK_FILES, TASK_TARGET_COST)
+
+    def take_chunk(self):
+        """
+        Выдает порцию для процесса-исполнителя: самые трудоемкие файлы,
+        пока порция не наберет целевой объем работы.
+
+        Returns:
+            list: Тройки (индекс файла, путь к файлу, размер файла)
+        """
+        return self._take(MAX_CHUNK_SIZE, CHUNK_TARGET_COST)
+
+    def _take(self, max_files, target_cost):
+        files = []
+        total_cost = 0
+        while self._heap and len(files) < max_files and total_cost < target_cost:
+            negative_cost, file_index, file_path, file_size = self._heap[0]
+            # Файл, не помещающийся в набранную порцию, остается для следующей
+            if files and total_cost - negative_cost > target_cost:
+                break
+            heapq.heappop(self._heap)
+            files.append((file_index, file_path, file_size))
+            total_cost -= negative_cost
+        return files
@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from collections import deque
+from functools import lru_cache
+
+class ValueMatcher:
+    """
+    Автомат Ахо-Корасик для одновременного поиска всех заданных значений.
+
+    Строится один раз для набора значений и работает с байтами UTF-8,
+    поэтому текст документов не нужно декодировать. За один проход по тексту
+    определяет все встретившиеся значения, независимо от их количества.
+    """
+    def __init__(self, values):
+        # Уникальные непустые значения в исходном порядке
+        self.values = []
+        for value in values:
+            if value and value not in self.values:
+                self.values.append(value)
+
+        # Таблица переходов: для каждого состояния - словарь байт -> состояние
+        self._delta = [{}]
+        # Индексы значений, которые заканчиваются в каждом состоянии
+        self._output = [frozenset()]
+
+        self._build()
+
+    def _build(self):
+        """Строит бор значений, суффиксные ссылки и полную таблицу переходов"""
+        goto = [{}]
+        output = [set()]
+
+        # Бор по байтам UTF-8
+        for index, value in enumerate(self.values):
+            state = 0
+            for byte in value.encode('utf-8'):
+                next_state = goto[state].get(byte)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto[state][byte] = next_state
+                    goto.append({})
+                    output.append(set())
+                state = next_state
+            output[state].add(index)
+
+        # Суффиксные ссылки обходом в ширину; переходы по отсутствующим в боре
+        # байтам сразу заменяются итоговыми, чтобы при поиске не ходить по ссылкам
+        alphabet = set()
+        for transitions in goto:
+            alphabet.update(transitions)
+
+        fail = [0] * len(goto)
+        delta = [dict() for _ in goto]
+        delta[0] = {byte: goto[0].get(byte, 0) for byte in alphabet}
+
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            output[state] |= output[fail[state]]
+            delta[state] = dict(delta[fail[state]])
+            for byte, next_state in goto[state].items():
+                fail[next_state] = delta[fail[state]].get(byte, 0)
+                delta[state][byte] = next_state
+                queue.append(next_state)
+
+        # Переходы в корень не храним - отсутствие ключа означает состояние 0
+        self._delta = [{byte: target for byte, target in transitions.items() if target}
+                       for transitions in delta]
+        self._output = [frozenset(indices) for indices in output]
+
+    def match(self, data):
+        """
+        Определяет значения, встречающиеся в одном фрагменте текста.
+
+        Args:
+            data (bytes или str): Фрагмент текста; строки кодируются в UTF-8
+
+        Returns:
+            frozenset: Индексы найденных значений (в списке values)
+        """
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+
+        delta = self._delta
+        output = self._output
+        matched = set()
+        state = 0
+
+        for byte in data:
+            state = delta[state].get(byte, 0)
+            if output[state]:
+                matched |= output[state]
+
+        return frozenset(matched)
+
+    def new_search(self):
+        """Создает состояние поиска для одного документа"""
+        return ValueSearch(self)
+
+class ValueSearch:
+    """
+    Состояние поиска значений в одном документе.
+    Накапливает найденные значения по всем переданным фрагментам текста.
+    """
+    def __init__(self, matcher):
+        self.matcher = matcher
+        self.found = set()
+        self._state = 0
+
+    @property
+    def complete(self):
+        """Найдены ли все значения"""
+        return len(self.found) == len(self.matcher.values)
+
+    def feed(self, data, continuous=False):
+        """
+        Ищет значения во фрагменте текста.
+
+        Args:
+            data (bytes или str): Фрагмент текста; строки кодируются в UTF-8
+            continuous (bool): Фрагмент продолжает предыдущий, поэтому совпадения
+                               на их границе тоже учитываются
+
+        Returns:
+            bool: True, если найдены все значения и поиск можно прекращать
+        """
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+
+        delta = self.matcher._delta
+        output = self.matcher._output
+        found = self.found
+        state = self._state if continuous else 0
+
+        for byte in data:
+            state = delta[state].get(byte, 0)
+            if output[state]:
+                found |= output[state]
+                if len(found) == len(self.matcher.values):
+                    break
+
+        self._state = state
+        return self.complete
+
+    def add_found(self, indices):
+        """
+        Отмечает значения, найденные заранее (например, по таблице общих строк).
+
+        Args:
+            indices (iterable): Индексы значений (см. ValueMatcher.match)
+
+        Returns:
+            bool: True, если найдены все значения и поиск можно прекращать
+        """
+        self.found |= set(indices)
+        return self.complete
+
+    def found_values(self):
+        """Возвращает найденные значения в порядке их задания пользователем"""
+        return [value for index, value in enumerate(self.matcher.values) if index in self.found]
+
+@lru_cache(maxsize=8)
+def _compile_values(values):
+    return ValueMatcher(values)
+
+def compile_search_values(search_values):
+    """
+    Возвращает автомат для списка значений.
+    Автомат строится один раз на набор значений и переиспользуется для всех файлов.
+
+    Args:
+        search_values (list): Список значений для поиска
+
+    Returns:
+        ValueMatcher: Скомпилированный автомат
+    """
+    return _compile_values(tuple(search_values))
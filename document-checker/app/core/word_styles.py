@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import xml.etree.ElementTree as ET
+
+from app.core.docx_stream import W_NS, W_VAL, shading_color
+
+# Имя части со стилями документа Word
+WORD_STYLES_PART = 'word/styles.xml'
+
+def _own_style_color(style):
+    """
+    Возвращает отслеживаемый цвет, заданный непосредственно в стиле.
+    Учитываются только свойства текста (w:rPr): заливка абзацев и ячеек
+    в стилях абзацев и таблиц выделением не считается.
+    """
+    props = style.find(W_NS + 'rPr')
+    if props is None:
+        return None
+
+    highlight = props.find(W_NS + 'highlight')
+    if highlight is not None:
+        color = highlight.get(W_VAL)
+        if color and color != 'none':
+            return color
+
+    shd = props.find(W_NS + 'shd')
+    if shd is not None:
+        return shading_color(shd)
+    return None
+
+def parse_word_styles(stream):
+    """
+    Разбирает styles.xml в таблицу стилей, дающих выделение или заливку.
+
+    Наследование стилей (w:basedOn) разрешается заранее, поэтому при
+    сканировании документа цвет стиля определяется одним обращением к словарю.
+
+    Args:
+        stream: Файловый объект с содержимым styles.xml
+
+    Returns:
+        dict: Идентификатор стиля -> цвет ('yellow', 'red', ...); стили без цвета не включаются
+    """
+    own_colors = {}
+    based_on = {}
+
+    for _, elem in ET.iterparse(stream, events=('end',)):
+        if elem.tag != W_NS + 'style':
+            continue
+
+        style_id = elem.get(W_NS + 'styleId')
+        if style_id:
+            own_colors[style_id] = _own_style_color(elem)
+            parent = elem.find(W_NS + 'basedOn')
+            if parent is not None and parent.get(W_VAL):
+                based_on[style_id] = parent.get(W_VAL)
+        elem.clear()
+
+    style_colors = {}
+    for style_id in own_colors:
+        # Поднимаемся по цепочке базовых стилей до первого стиля с цветом
+        current = style_id
+        visited = set()
+        color = None
+        while current is not None and current not in visited:
+            visited.add(current)
+            color = own_colors.get(current)
+            if color:
+                break
+            current = based_on.get(current)
+        if color:
+            style_colors[style_id] = color
+
+    return style_colors
+
+def load_word_styles(zip_file):
+    """
+    Загружает таблицу стилей с цветами из пакета Word.
+
+    Args:
+        zip_file (ZipFile): Открытый пакет
+
+    Returns:
+        dict: Идентификатор стиля -> цвет; пустой словарь, если стилей нет
+    """
+    try:
+        with zip_file.open(WORD_STYLES_PART) as stream:
+            return parse_word_styles(stream)
+    except KeyError:
+        return {}
@@ -0,0 +1,448 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import struct
+
+from app.core.colors import DEFAULT_INDEXED_COLORS, YELLOW, WorkbookColors, classify_rgb
+from app.core.number_formats import date_format_codes, format_date_value
+from app.core.xlsx_comments import SheetComments
+from app.utils.threading_utils import check_cancelled
+
+# Поток книги Excel 97-2003 (BIFF8) в составном файле
+WORKBOOK_STREAM = 'Workbook'
+
+# Версия BIFF8 и типы подпотоков в записи BOF
+BIFF8_VERSION = 0x0600
+SUBSTREAM_WORKSHEET = 0x0010
+
+# Идентификаторы записей
+RECORD_BOF = 0x0809
+RECORD_EOF = 0x000A
+RECORD_FILEPASS = 0x002F
+RECORD_BOUNDSHEET = 0x0085
+RECORD_PALETTE = 0x0092
+RECORD_FORMAT = 0x041E
+RECORD_DATEMODE = 0x0022
+RECORD_XF = 0x00E0
+RECORD_SST = 0x00FC
+RECORD_CONTINUE = 0x003C
+RECORD_SHEETEXT = 0x0862
+RECORD_NOTE = 0x001C
+RECORD_ROW = 0x0208
+RECORD_COLINFO = 0x007D
+RECORD_LABELSST = 0x00FD
+RECORD_LABEL = 0x0204
+RECORD_NUMBER = 0x0203
+RECORD_RK = 0x027E
+RECORD_MULRK = 0x00BD
+RECORD_BLANK = 0x0201
+RECORD_MULBLANK = 0x00BE
+RECORD_FORMULA = 0x0006
+RECORD_BOOLERR = 0x0205
+RECORD_STRING = 0x0207
+
+# Записи ячеек со стилем (ixfe) по смещению 4
+SINGLE_CELL_RECORDS = (RECORD_LABELSST, RECORD_LABEL, RECORD_NUMBER, RECORD_RK,
+                       RECORD_BLANK, RECORD_FORMULA, RECORD_BOOLERR)
+
+# Флаг записи ROW: у строки задан собственный стиль
+ROW_GHOST_DIRTY = 0x0080
+
+# Цвет вкладки по умолчанию в SHEETEXT (icvPlain)
+ICV_DEFAULT_TAB = 0x7F
+
+# Типы цвета CFColor в расширенной части SHEETEXT
+XCLR_INDEXED = 1
+XCLR_RGB = 2
+
+# Размер SHEETEXT с расширенной частью (SheetExtOptional)
+SHEETEXT_OPTIONAL_SIZE = 0x28
+
+# Признак отмены опрашивается после каждой порции потока Workbook такого размера
+CANCEL_CHECK_BYTES = 256 * 1024
+
+class XlsWorkbookScan:
+    """
+    Результат однопроходного разбора книги Excel 97-2003.
+    """
+    def __init__(self):
+        # Имена листов в порядке книги
+        self.sheet_names = []
+
+        # Цвет вкладки каждого листа: имя листа -> (r, g, b)
+        self.tab_colors = {}
+
+        # Примечания по листам (только листы с примечаниями)
+        self.sheet_comments = []
+
+        # Есть ли ячейки, строки или столбцы с желтой заливкой
+        self.has_flagged_cells = False
+
+    def colored_tabs(self, color_classes):
+        """
+        Возвращает листы, цвет вкладки которых относится к указанным классам.
+
+        Args:
+            color_classes (tuple): Классы цветов (YELLOW, RED, ...)
+
+        Returns:
+            list: Пары (имя листа, класс цвета) в порядке листов книги
+        """
+        colored = []
+        for sheet_name in self.sheet_names:
+            color_class = classify_rgb(self.tab_colors.get(sheet_name))
+            if color_class in color_classes:
+                colored.append((sheet_name, color_class))
+        return colored
+
+class ContinuedRecord:
+    """
+    Чтение данных записи, продолженной записями CONTINUE (например, SST).
+
+    Символы строки могут быть разделены между записями; в начале каждой
+    продолжающей записи тогда повторяется байт флагов с разрядностью символов.
+    """
+    def __init__(self, fragments):
+        self.fragments = fragments
+        self.index = 0
+        self.pos = 0
+
+    def _current(self):
+        """Возвращает текущий фрагмент, переходя к следующему по исчерпании"""
+        while self.index < len(self.fragments) and self.pos >= len(self.fragments[self.index]):
+            self.index += 1
+            self.pos = 0
+        if self.index >= len(self.fragments):
+            raise ValueError("Неожиданный конец записи")
+        return self.fragments[self.index]
+
+    def read(self, size):
+        """Читает size байт служебных данных (могут пересекать границы записей)"""
+        parts = []
+        while size > 0:
+            fragment = self._current()
+            chunk = fragment[self.pos:self.pos + size]
+            parts.append(chunk)
+            self.pos += len(chunk)
+            size -= len(chunk)
+        return b''.join(parts)
+
+    def skip(self, size):
+        """Пропускает size байт"""
+        while size > 0:
+            fragment = self._current()
+            step = min(size, len(fragment) - self.pos)
+            self.pos += step
+            size -= step
+
+    def read_chars(self, count, high_byte):
+        """
+        Читает count символов строки.
+
+        Args:
+            count (int): Количество символов
+            high_byte (bool): Символы в UTF-16 (иначе - однобайтовые)
+
+        Returns:
+            str: Текст
+        """
+        parts = []
+        while count > 0:
+            fragment = self.fragments[self.index] if self.index < len(self.fragments) else b''
+            if self.pos >= len(fragment):
+                # Строка продолжается в следующей записи с новым байтом флагов
+                self.index += 1
+                self.pos = 0
+                fragment = self._current()
+                high_byte = bool(fragment[0] & 0x01)
+                self.pos = 1
+
+            char_size = 2 if high_byte else 1
+            taken = min(count, (len(fragment) - self.pos) // char_size)
+            if not taken:
+                self.pos = len(fragment)
+                continue
+            data = fragment[self.pos:self.pos + taken * char_size]
+            parts.append(data.decode('utf-16-le' if high_byte else 'latin-1', errors='replace'))
+            self.pos += taken * char_size
+            count -= taken
+        return ''.join(parts)
+
+    def read_unicode_string(self):
+        """Читает строку XLUnicodeRichExtendedString (элемент SST)"""
+        count, flags = struct.unpack('<HB', self.read(3))
+        runs = struct.unpack('<H', self.read(2))[0] if flags & 0x08 else 0
+        ext_size = struct.unpack('<i', self.read(4))[0] if flags & 0x04 else 0
+        text = self.read_chars(count, bool(flags & 0x01))
+        self.skip(runs * 4 + max(0, ext_size))
+        return text
+
+def read_short_string(data, pos):
+    """Читает ShortXLUnicodeString (длина в 1 байт) - например, имя листа в BOUNDSHEET"""
+    count, flags = data[pos], data[pos + 1]
+    if flags & 0x01:
+        return data[pos + 2:pos + 2 + count * 2].decode('utf-16-le', errors='replace')
+    return data[pos + 2:pos + 2 + count].decode('latin-1')
+
+def read_unicode_string(data, pos):
+    """Читает XLUnicodeString (длина в 2 байта) - например, текст в LABEL и STRING"""
+    count = struct.unpack_from('<H', data, pos)[0]
+    flags = data[pos + 2]
+    if flags & 0x01:
+        return data[pos + 3:pos + 3 + count * 2].decode('utf-16-le', errors='replace')
+    return data[pos + 3:pos + 3 + count].decode('latin-1')
+
+def decode_rk(value):
+    """Переводит число в формате RK в float"""
+    if value & 0x02:
+        number = float(value >> 2 if not value & 0x80000000 else (value >> 2) - (1 << 30))
+    else:
+        number = struct.unpack('<d', struct.pack('<Q', (value & 0xFFFFFFFC) << 32))[0]
+    if value & 0x01:
+        number /= 100
+    return number
+
+def format_number(value, format_code=None, date1904=False):
+    """
+    Текстовое представление числа ячейки для поиска значений: '15', '1.5' или,
+    для ячеек в формате даты, текст даты ('2023-05-01 00:00:00').
+
+    Args:
+        value (float): Значение ячейки
+        format_code (str, optional): Код формата даты стиля ячейки
+        date1904 (bool): Книга использует систему дат 1904
+
+    Returns:
+        str: Текст значения
+    """
+    if format_code is not None:
+        text = format_date_value(value, format_code, date1904)
+        if text is not None:
+            return text
+    if value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+def search_shared_strings(fragments, matcher):
+    """
+    Проверяет таблицу общих строк (SST) автоматом значений поиска.
+
+    Args:
+        fragments (list): Данные записи SST и следующих за ней CONTINUE
+        matcher (ValueMatcher): Автомат значений поиска
+
+    Returns:
+        dict: Индекс строки -> индексы найденных значений
+    """
+    reader = ContinuedRecord(fragments)
+    unique_count = struct.unpack('<II', reader.read(8))[1]
+    hits = {}
+    for index in range(unique_count):
+        try:
+            text = reader.read_unicode_string()
+        except ValueError:
+            break  # Таблица короче заявленной
+        matched = matcher.match(text)
+        if matched:
+            hits[index] = matched
+    return hits
+
+def sheetext_color(body, colors):
+    """
+    Определяет цвет вкладки листа по записи SHEETEXT.
+
+    Returns:
+        tuple: (r, g, b) или None, если цвет вкладки не задан
+    """
+    if len(body) < 20:
+        return None
+    size = struct.unpack_from('<I', body, 12)[0]
+
+    if size >= SHEETEXT_OPTIONAL_SIZE and len(body) >= 40:
+        color_type = struct.unpack_from('<I', body, 24)[0]
+        tint = struct.unpack_from('<d', body, 32)[0]
+        if color_type == XCLR_RGB:
+            return colors.resolve_attrs(rgb=body[28:31].hex().upper(), tint=tint)
+        if color_type == XCLR_INDEXED:
+            return colors.resolve_attrs(indexed=struct.unpack_from('<I', body, 28)[0], tint=tint)
+
+    icv = struct.unpack_from('<I', body, 16)[0] & 0x7F
+    if icv == ICV_DEFAULT_TAB:
+        return None
+    return colors.resolve_attrs(indexed=icv)
+
+def scan_xls_workbook(compound_file, value_search=None, cancel_token=None):
+    """
+    Однопроходный разбор потока Workbook книги Excel 97-2003 (BIFF8).
+
+    За один проход по записям определяются цвета вкладок (SHEETEXT),
+    примечания (NOTE), ячейки, строки и столбцы с желтой заливкой (по XF и
+    PALETTE) и, если передано состояние поиска, значения в ячейках: общие
+    строки (SST) проверяются один раз, ячейки LABELSST - только по индексу,
+    числа в форматах даты (XF и FORMAT) - в виде текста даты.
+
+    Args:
+        compound_file (CompoundFile): Открытый составной файл
+        value_search (ValueSearch, optional): Состояние поиска значений
+        cancel_token (CancellationToken, optional): Признак отмены
+
+    Returns:
+        XlsWorkbookScan: Результат разбора
+
+    Raises:
+        KeyError: Если в файле нет потока Workbook (например, книга BIFF5)
+        ValueError: Если книга зашифрована или повреждена
+    """
+    data = compound_file.read_stream(WORKBOOK_STREAM)
+    scan = XlsWorkbookScan()
+    colors = WorkbookColors()
+
+    sheet_offsets = {}
+    xf_fill_colors = []
+    flagged_xfs = frozenset()
+    custom_formats = {}
+    xf_formats = []
+    date_styles = {}
+    date1904 = False
+    string_hits = {}
+    search = value_search is not None and not value_search.complete
+
+    globals_done = False
+    sheet_name = None
+    sheet_comments = None
+    depth = 0
+    pos = 0
+    length = len(data)
+    next_cancel_check = CANCEL_CHECK_BYTES
+
+    while pos + 4 <= length:
+        if pos >= next_cancel_check:
+            check_cancelled(cancel_token)
+            next_cancel_check = pos + CANCEL_CHECK_BYTES
+        record_id, size = struct.unpack_from('<HH', data, pos)
+        body_start = pos + 4
+        body_end = body_start + size
+
+        if record_id == RECORD_BOF:
+            if pos == 0 and struct.unpack_from('<H', data, body_start)[0] != BIFF8_VERSION:
+                raise ValueError("Поддерживаются только книги формата BIFF8")
+            depth += 1
+            if depth == 1 and pos in sheet_offsets:
+                substream = struct.unpack_from('<H', data, body_start + 2)[0]
+                if substream == SUBSTREAM_WORKSHEET:
+                    sheet_name = sheet_offsets[pos]
+                    sheet_comments = SheetComments(sheet_name)
+
+        elif record_id == RECORD_EOF:
+            depth -= 1
+            if depth == 0:
+                if not globals_done:
+                    # Конец общих данных книги: стили с желтой заливкой известны
+                    flagged_xfs = frozenset(
+                        xf_id for xf_id, icv in enumerate(xf_fill_colors)
+                        if icv is not None and classify_rgb(colors.resolve_attrs(indexed=icv)) == YELLOW
+                    )
+                    # Стили с форматами даты: числа в них ищутся как текст даты
+                    date_styles = date_format_codes(custom_formats, xf_formats)
+                    globals_done = True
+                elif sheet_comments is not None and sheet_comments.total:
+                    scan.sheet_comments.append(sheet_comments)
+                sheet_name = None
+                sheet_comments = None
+
+        elif not globals_done:
+            # Общие данные книги
+            if record_id == RECORD_FILEPASS:
+                raise ValueError("Книга зашифрована")
+            elif record_id == RECORD_BOUNDSHEET:
+                name = read_short_string(data, body_start + 6)
+                sheet_offsets[struct.unpack_from('<I', data, body_start)[0]] = name
+                scan.sheet_names.append(name)
+            elif record_id == RECORD_PALETTE:
+                count = struct.unpack_from('<H', data, body_start)[0]
+                palette = [data[body_start + 2 + i * 4:body_start + 5 + i * 4].hex().upper() for i in range(count)]
+                colors.set_indexed_colors(DEFAULT_INDEXED_COLORS[:8] + palette)
+            elif record_id == RECORD_FORMAT:
+                custom_formats[struct.unpack_from('<H', data, body_start)[0]] = read_unicode_string(data, body_start + 2)
+            elif record_id == RECORD_DATEMODE:
+                date1904 = bool(struct.unpack_from('<H', data, body_start)[0])
+            elif record_id == RECORD_XF:
+                xf_formats.append(struct.unpack_from('<H', data, body_start + 2)[0])
+                fill_pattern = struct.unpack_from('<I', data, body_start + 14)[0] >> 26
+                fill_colors = struct.unpack_from('<H', data, body_start + 18)[0]
+                xf_fill_colors.append(fill_colors & 0x7F if fill_pattern else None)
+            elif record_id == RECORD_SST and search:
+                fragments = [data[body_start:body_end]]
+                while body_end + 4 <= length and struct.unpack_from('<H', data, body_end)[0] == RECORD_CONTINUE:
+                    continue_size = struct.unpack_from('<H', data, body_end + 2)[0]
+                    fragments.append(data[body_end + 4:body_end + 4 + continue_size])
+                    body_end += 4 + continue_size
+                string_hits = search_shared_strings(fragments, value_search.matcher)
+
+        elif depth == 1 and sheet_name is not None:
+            # Записи листа (вложенные подпотоки диаграмм пропускаются)
+            check_fill = flagged_xfs and not scan.has_flagged_cells
+
+            if record_id in SINGLE_CELL_RECORDS:
+                if check_fill and struct.unpack_from('<H', data, body_start + 4)[0] in flagged_xfs:
+                    scan.has_flagged_cells = True
+
+                if search and not value_search.complete:
+                    format_code = date_styles.get(struct.unpack_from('<H', data, body_start + 4)[0])
+                    if record_id == RECORD_LABELSST:
+                        matched = string_hits.get(struct.unpack_from('<I', data, body_start + 6)[0])
+                        if matched:
+                            value_search.add_found(matched)
+                    elif record_id == RECORD_LABEL:
+                        value_search.feed(read_unicode_string(data, body_start + 6))
+                    elif record_id == RECORD_NUMBER:
+                        value_search.feed(format_number(struct.unpack_from('<d', data, body_start + 6)[0],
+                                                        format_code, date1904))
+                    elif record_id == RECORD_RK:
+                        value_search.feed(format_number(decode_rk(struct.unpack_from('<I', data, body_start + 6)[0]),
+                                                        format_code, date1904))
+                    elif record_id == RECORD_FORMULA:
+                        # Числовой результат формулы; строковый хранится в следующей записи STRING
+                        if struct.unpack_from('<H', data, body_start + 12)[0] != 0xFFFF:
+                            value_search.feed(format_number(struct.unpack_from('<d', data, body_start + 6)[0],
+                                                            format_code, date1904))
+
+            elif record_id == RECORD_MULRK:
+                count = (size - 6) // 6
+                for index in range(count):
+                    item = body_start + 4 + index * 6
+                    if check_fill and struct.unpack_from('<H', data, item)[0] in flagged_xfs:
+                        scan.has_flagged_cells = True
+                    if search and not value_search.complete:
+                        value_search.feed(format_number(decode_rk(struct.unpack_from('<I', data, item + 2)[0]),
+                                                        date_styles.get(struct.unpack_from('<H', data, item)[0]),
+                                                        date1904))
+
+            elif record_id == RECORD_MULBLANK:
+                if check_fill:
+                    count = (size - 6) // 2
+                    styles = struct.unpack_from('<%dH' % count, data, body_start + 4)
+                    if not flagged_xfs.isdisjoint(styles):
+                        scan.has_flagged_cells = True
+
+            elif record_id == RECORD_ROW:
+                if check_fill and struct.unpack_from('<H', data, body_start + 12)[0] & ROW_GHOST_DIRTY:
+                    if (struct.unpack_from('<H', data, body_start + 14)[0] & 0x0FFF) in flagged_xfs:
+                        scan.has_flagged_cells = True
+
+            elif record_id == RECORD_COLINFO:
+                if check_fill and struct.unpack_from('<H', data, body_start + 6)[0] in flagged_xfs:
+                    scan.has_flagged_cells = True
+
+            elif record_id == RECORD_STRING:
+                if search and not value_search.complete:
+                    value_search.feed(read_unicode_string(data, body_start))
+
+            elif record_id == RECORD_NOTE:
+                sheet_comments.notes += 1
+
+            elif record_id == RECORD_SHEETEXT:
+                scan.tab_colors[sheet_name] = sheetext_color(data[body_start:body_end], colors)
+
+        pos = body_end
+
+    return scan
@@ -0,0 +1,162 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import re
+import xml.etree.ElementTree as ET
+
+from app.core.package_triage import read_part_rels
+from app.core.xlsx_styles import S_NS
+
+# Пространство имен цепочек комментариев (threaded comments, Excel 365)
+TC_NS = '{http://schemas.microsoft.com/office/spreadsheetml/2018/threadedcomments}'
+
+# Окончания типов связей листа с частями примечаний
+NOTES_REL_SUFFIX = '/comments'
+THREADED_COMMENTS_REL_SUFFIX = '/threadedComment'
+VML_DRAWING_REL_SUFFIX = '/vmlDrawing'
+
+# Фигура примечания в разметке VML (VML часто не является корректным XML, поэтому ищем по шаблону)
+VML_NOTE_PATTERN = re.compile(rb'ObjectType\s*=\s*["\']Note["\']')
+
+class SheetComments:
+    """
+    Примечания и комментарии одного листа книги Excel.
+    """
+    def __init__(self, sheet_name):
+        self.sheet_name = sheet_name
+
+        # Обычные примечания (notes), без заглушек цепочек комментариев
+        self.notes = 0
+
+        # Комментарии в цепочках (threaded comments), включая ответы
+        self.threaded_comments = 0
+
+    @property
+    def total(self):
+        """Общее количество примечаний и комментариев листа"""
+        return self.notes + self.threaded_comments
+
+    def describe(self):
+        """Краткое описание для отчета, например 'Лист1: 3'"""
+        return f"{self.sheet_name}: {self.total}"
+
+def count_elements(stream, tag, root_attr=None):
+    """
+    Потоково считает элементы с указанным тегом.
+
+    Разобранные элементы удаляются из дерева, поэтому память не растет с размером части.
+
+    Args:
+        stream: Файловый объект с XML
+        tag (str): Полное имя тега (с пространством имен)
+        root_attr (str, optional): Атрибут, отсутствие которого отличает корневые
+                                   элементы (например, parentId у ответов в цепочке)
+
+    Returns:
+        tuple: (количество элементов, количество элементов без root_attr)
+    """
+    count = 0
+    roots = 0
+    open_elements = []
+
+    for event, elem in ET.iterparse(stream, events=('start', 'end')):
+        if event == 'start':
+            open_elements.append(elem)
+            if elem.tag == tag:
+                count += 1
+                if root_attr is None or elem.get(root_attr) is None:
+                    roots += 1
+            continue
+
+        open_elements.pop()
+        if open_elements:
+            open_elements[-1].remove(elem)
+
+    return count, roots
+
+def _count_part_elements(zip_file, part_name, tag, root_attr=None):
+    """Считает элементы в части пакета (см. count_elements); отсутствующая часть дает (0, 0)"""
+    try:
+        with zip_file.open(part_name) as stream:
+            return count_elements(stream, tag, root_attr)
+    except KeyError:
+        return 0, 0
+
+def count_vml_notes(zip_file, part_name):
+    """
+    Считает фигуры примечаний в части VML.
+
+    Args:
+        zip_file (ZipFile): Открытый пакет
+        part_name (str): Имя части VML (например, 'xl/drawings/vmlDrawing1.vml')
+
+    Returns:
+        int: Количество фигур с ObjectType="Note"
+    """
+    try:
+        return len(VML_NOTE_PATTERN.findall(zip_file.read(part_name)))
+    except KeyError:
+        return 0
+
+def read_sheet_comments(zip_file, sheet_name, sheet_part):
+    """
+    Определяет примечания и комментарии листа по его связям.
+
+    Читаются только небольшие части, на которые ссылается файл связей листа:
+    comments*.xml, threadedComments*.xml и, если части примечаний нет, VML.
+    Сама часть листа не распаковывается.
+
+    Args:
+        zip_file (ZipFile): Открытый пакет
+        sheet_name (str): Имя листа
+        sheet_part (str): Имя части листа
+
+    Returns:
+        SheetComments: Количество примечаний и комментариев листа
+    """
+    result = SheetComments(sheet_name)
+    notes_parts = []
+    threaded_parts = []
+    vml_parts = []
+
+    for rel_type, target in read_part_rels(zip_file, sheet_part):
+        if rel_type.endswith(NOTES_REL_SUFFIX):
+            notes_parts.append(target)
+        elif rel_type.endswith(THREADED_COMMENTS_REL_SUFFIX):
+            threaded_parts.append(target)
+        elif rel_type.endswith(VML_DRAWING_REL_SUFFIX):
+            vml_parts.append(target)
+
+    threads = 0
+    for part_name in threaded_parts:
+        comments, roots = _count_part_elements(zip_file, part_name, TC_NS + 'threadedComment', 'parentId')
+        result.threaded_comments += comments
+        threads += roots
+
+    if notes_parts:
+        notes = sum(_count_part_elements(zip_file, part_name, S_NS + 'comment')[0] for part_name in notes_parts)
+    else:
+        notes = sum(count_vml_notes(zip_file, part_name) for part_name in vml_parts)
+
+    # Для каждой цепочки Excel сохраняет в comments*.xml примечание-заглушку,
+    # поэтому цепочки не учитываются повторно
+    result.notes = max(0, notes - threads)
+
+    return result
+
+def find_sheet_comments(zip_file, sheets):
+    """
+    Определяет листы книги с примечаниями или комментариями.
+
+    Args:
+        zip_file (ZipFile): Открытый пакет
+        sheets (list): Пары (имя листа, имя части), см. read_sheet_parts
+
+    Returns:
+        list: Объекты SheetComments для листов, где найдены примечания или комментарии
+    """
+    found = []
+    for sheet_name, sheet_part in sheets:
+        sheet_comments = read_sheet_comments(zip_file, sheet_name, sheet_part)
+        if sheet_comments.total:
+            found.append(sheet_comments)
+    return found
@@ -0,0 +1,198 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import xml.etree.ElementTree as ET
+
+from app.core.number_formats import format_date_value
+from app.core.package_triage import EXCEL_MAIN_PART, read_part_rels
+from app.core.xlsx_stream import S_CELL, S_ROW, uses_1904_dates
+from app.core.xlsx_styles import S_NS, load_date_styles
+from app.utils.threading_utils import check_cancelled
+
+# Таблица общих строк книги: имя части по умолчанию (если у книги нет файла связей)
+# и окончание типа связи, по которой она находится
+XLSX_SHARED_STRINGS_PART = 'xl/sharedStrings.xml'
+SHARED_STRINGS_REL_SUFFIX = '/sharedStrings'
+
+# Элементы строк и значений ячеек
+S_STRING_ITEM = S_NS + 'si'
+S_TEXT = S_NS + 't'
+S_RUN_TEXT = S_NS + 'r/' + S_NS + 't'
+S_VALUE = S_NS + 'v'
+S_INLINE_STRING = S_NS + 'is'
+
+# Типы ячеек (атрибут t), значение которых не является текстом или числом
+SKIPPED_CELL_TYPES = ('b', 'e')
+
+# Типы ячеек с числовым значением (тип по умолчанию - число)
+NUMBER_CELL_TYPES = (None, 'n')
+
+# Как часто (через сколько общих строк) опрашивается признак отмены
+CANCEL_CHECK_STRINGS = 1024
+
+def rich_text(item):
+    """
+    Собирает текст строки (si или is): простой текст или текст всех фрагментов форматирования.
+    Фонетические подсказки (rPh) не учитываются.
+
+    Args:
+        item (Element): Элемент si или is
+
+    Returns:
+        str: Текст строки
+    """
+    text = item.find(S_TEXT)
+    if text is not None:
+        return text.text or ''
+    return ''.join(run.text or '' for run in item.findall(S_RUN_TEXT))
+
+def find_shared_strings_part(zip_file):
+    """
+    Определяет часть с таблицей общих строк по связям книги: программы,
+    отличные от Excel, могут называть ее иначе, чем xl/sharedStrings.xml.
+
+    Args:
+        zip_file (ZipFile): Открытый пакет
+
+    Returns:
+        str: Имя части или None, если таблицы общих строк в книге нет
+    """
+    rels = read_part_rels(zip_file, EXCEL_MAIN_PART)
+    if not rels:
+        return XLSX_SHARED_STRINGS_PART
+    return next((target for rel_type, target in rels if rel_type.endswith(SHARED_STRINGS_REL_SUFFIX)), None)
+
+def search_shared_strings(stream, matcher, cancel_token=None):
+    """
+    Потоково проверяет таблицу общих строк и определяет строки со значениями поиска.
+
+    Каждая строка проверяется один раз, сколько бы ячеек на нее ни ссылалось.
+    Разобранные строки удаляются из дерева, поэтому память не растет с размером таблицы.
+
+    Args:
+        stream: Файловый объект с sharedStrings.xml
+        matcher (ValueMatcher): Автомат значений поиска
+        cancel_token (CancellationToken, optional): Признак отмены
+
+    Returns:
+        dict: Индекс строки (в виде строки, как в атрибуте ячейки) -> индексы найденных значений
+    """
+    hits = {}
+    index = 0
+    open_elements = []
+
+    for event, elem in ET.iterparse(stream, events=('start', 'end')):
+        if event == 'start':
+            open_elements.append(elem)
+            continue
+
+        open_elements.pop()
+        if elem.tag == S_STRING_ITEM:
+            matched = matcher.match(rich_text(elem))
+            if matched:
+                hits[str(index)] = matched
+            index += 1
+            if index % CANCEL_CHECK_STRINGS == 0:
+                check_cancelled(cancel_token)
+            # Строка удаляется целиком, вместе с дочерними элементами
+            if open_elements:
+                open_elements[-1].remove(elem)
+
+    return hits
+
+def search_sheet_values(stream, value_search, string_hits, cancel_token=None, date_styles=None, date1904=False):
+    """
+    Потоково ищет значения в ячейках листа.
+
+    Для ячеек с общими строками (t="s") проверяется только вхождение индекса
+    в string_hits, текст заново не разбирается. Встроенные строки, формульные
+    строки и числа проверяются автоматом напрямую; числа в формате даты -
+    в виде текста даты ('2023-05-01 00:00:00'), как их выводит openpyxl.
+
+    Args:
+        stream: Файловый объект с XML листа
+        value_search (ValueSearch): Состояние поиска в книге
+        string_hits (dict): Результат search_shared_strings
+        cancel_token (CancellationToken, optional): Признак отмены, опрашивается после каждой строки листа
+        date_styles (dict, optional): Стили с форматами даты, см. load_date_styles
+        date1904 (bool): Книга использует систему дат 1904
+
+    Returns:
+        bool: True, если найдены все значения и поиск можно прекращать
+    """
+    open_elements = []
+
+    for event, elem in ET.iterparse(stream, events=('start', 'end')):
+        if event == 'start':
+            open_elements.append(elem)
+            continue
+
+        open_elements.pop()
+        if elem.tag == S_ROW:
+            check_cancelled(cancel_token)
+            if open_elements:
+                open_elements[-1].remove(elem)
+        elif elem.tag == S_CELL:
+            cell_type = elem.get('t')
+            if cell_type == 's':
+                value = elem.find(S_VALUE)
+                if value is not None and value.text in string_hits:
+                    if value_search.add_found(string_hits[value.text]):
+                        return True
+            elif cell_type == 'inlineStr':
+                inline = elem.find(S_INLINE_STRING)
+                if inline is not None and value_search.feed(rich_text(inline)):
+                    return True
+            elif cell_type not in SKIPPED_CELL_TYPES:
+                value = elem.find(S_VALUE)
+                if value is not None and value.text:
+                    text = value.text
+                    if date_styles and cell_type in NUMBER_CELL_TYPES:
+                        format_code = date_styles.get(int(elem.get('s', 0)))
+                        if format_code is not None:
+                            try:
+                                text = format_date_value(float(text), format_code, date1904) or text
+                            except ValueError:
+                                pass  # Нечисловое значение проверяется как есть
+                    if value_search.feed(text):
+                        return True
+
+            # Ячейка удаляется целиком после проверки, вместе со значением
+            if open_elements:
+                open_elements[-1].remove(elem)
+
+    return value_search.complete
+
+def search_workbook_values(zip_file, sheets, value_search, cancel_token=None):
+    """
+    Ищет значения во всех ячейках книги Excel.
+
+    Таблица общих строк проверяется автоматом один раз, после чего листы
+    сканируются потоково целиком, без ограничения области поиска. Стили с
+    форматами даты определяются по styles.xml, чтобы даты искались как текст.
+
+    Args:
+        zip_file (ZipFile): Открытый пакет
+        sheets (list): Пары (имя листа, имя части), см. read_sheet_parts
+        value_search (ValueSearch): Состояние поиска; найденные значения записываются в него
+        cancel_token (CancellationToken, optional): Признак отмены
+
+    Returns:
+        bool: True, если найдены все значения
+    """
+    string_hits = {}
+    date_styles = load_date_styles(zip_file)
+    date1904 = uses_1904_dates(zip_file) if date_styles else False
+    shared_strings_part = find_shared_strings_part(zip_file)
+    if shared_strings_part is not None:
+        try:
+            with zip_file.open(shared_strings_part) as stream:
+                string_hits = search_shared_strings(stream, value_search.matcher, cancel_token)
+        except KeyError:
+            pass  # Связь указывает на отсутствующую часть
+
+    for sheet_name, sheet_part in sheets:
+        with zip_file.open(sheet_part) as stream:
+            if search_sheet_values(stream, value_search, string_hits, cancel_token, date_styles, date1904):
+                return True
+
+    return value_search.complete
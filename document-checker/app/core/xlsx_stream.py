@@ -0,0 +1,178 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import xml.etree.ElementTree as ET
+
+from app.core.package_triage import EXCEL_MAIN_PART, read_part_rel_targets
+from app.core.xlsx_styles import S_NS
+from app.core.zip_stream import iter_member_chunks
+from app.utils.threading_utils import check_cancelled
+
+# Пространство имен связей в атрибуте r:id
+R_NS = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+
+# Теги листа со стилем: у ячеек и строк - атрибут s, у столбцов - атрибут style
+S_CELL = S_NS + 'c'
+S_ROW = S_NS + 'row'
+S_COL = S_NS + 'col'
+
+# Свойства книги с системой дат
+S_WORKBOOK_PR = S_NS + 'workbookPr'
+
+# Элементы заголовка листа с цветом вкладки
+S_SHEET_PR = S_NS + 'sheetPr'
+S_TAB_COLOR = S_NS + 'tabColor'
+
+# Порция и предел распаковки при чтении заголовка листа: sheetPr - первый
+# дочерний элемент worksheet, поэтому обычно хватает первой порции
+TAB_PROBE_CHUNK_SIZE = 4 * 1024
+TAB_PROBE_MAX_BYTES = 256 * 1024
+
+def read_sheet_parts(zip_file):
+    """
+    Определяет листы книги и соответствующие им части пакета.
+
+    Args:
+        zip_file (ZipFile): Открытый пакет
+
+    Returns:
+        list: Пары (имя листа, имя части) в порядке листов книги
+    """
+    targets = read_part_rel_targets(zip_file, EXCEL_MAIN_PART)
+
+    sheets = []
+    root = ET.fromstring(zip_file.read(EXCEL_MAIN_PART))
+    for sheet in root.iter(S_NS + 'sheet'):
+        target = targets.get(sheet.get(R_NS + 'id'))
+        if target and target.startswith('xl/worksheets/'):
+            sheets.append((sheet.get('name', ''), target))
+    return sheets
+
+def uses_1904_dates(zip_file):
+    """
+    Определяет, использует ли книга систему дат 1904 (атрибут date1904 в workbookPr).
+
+    Args:
+        zip_file (ZipFile): Открытый пакет
+
+    Returns:
+        bool: True для системы дат 1904
+    """
+    properties = ET.fromstring(zip_file.read(EXCEL_MAIN_PART)).find(S_WORKBOOK_PR)
+    return properties is not None and properties.get('date1904', '0').lower() in ('1', 'true')
+
+def sheet_has_flagged_cells(stream, flagged_xfs, cancel_token=None):
+    """
+    Потоково проверяет, есть ли на листе ячейки, строки или столбцы с отмеченным стилем.
+
+    Проверяется только стиль элементов c, row (при customFormat) и col,
+    элементы удаляются из дерева сразу после разбора, поэтому память не растет
+    с размером листа, а область проверки не ограничена.
+
+    Args:
+        stream: Файловый объект с XML листа
+        flagged_xfs (set): Индексы отмеченных стилей cellXfs
+        cancel_token (CancellationToken, optional): Признак отмены, опрашивается после каждой строки
+
+    Returns:
+        bool: True, если найден хотя бы один элемент с отмеченным стилем
+    """
+    if not flagged_xfs:
+        return False
+
+    # Стили храним строками, чтобы не переводить атрибут в число для каждой ячейки
+    flagged = {str(xf_id) for xf_id in flagged_xfs}
+    open_elements = []
+
+    for event, elem in ET.iterparse(stream, events=('start', 'end')):
+        if event == 'start':
+            open_elements.append(elem)
+            tag = elem.tag
+            if tag == S_CELL:
+                if elem.get('s') in flagged:
+                    return True
+            elif tag == S_COL:
+                if elem.get('style') in flagged:
+                    return True
+            elif tag == S_ROW:
+                if elem.get('customFormat') in ('1', 'true') and elem.get('s') in flagged:
+                    return True
+            continue
+
+        open_elements.pop()
+        if elem.tag == S_ROW:
+            check_cancelled(cancel_token)
+        if open_elements:
+            open_elements[-1].remove(elem)
+
+    return False
+
+def read_sheet_tab_color(zip_file, sheet_part, max_bytes=TAB_PROBE_MAX_BYTES):
+    """
+    Читает цвет вкладки листа из заголовка его части (sheetPr/tabColor).
+
+    Распаковывается только начало части: разбор прекращается на конце sheetPr
+    или на первом следующем за ним элементе (sheetData, cols и т.п.), поэтому
+    размер данных листа на время проверки не влияет.
+
+    Args:
+        zip_file (ZipFile): Открытый пакет
+        sheet_part (str): Имя части листа (например, 'xl/worksheets/sheet1.xml')
+        max_bytes (int): Предел распакованных данных в байтах
+
+    Returns:
+        Element: Элемент tabColor или None, если цвет вкладки не задан
+    """
+    parser = ET.XMLPullParser(events=('start', 'end'))
+    chunks = iter_member_chunks(zip_file, sheet_part, chunk_size=TAB_PROBE_CHUNK_SIZE, max_bytes=max_bytes)
+    depth = 0
+    try:
+        for chunk in chunks:
+            parser.feed(chunk)
+            for event, elem in parser.read_events():
+                if event == 'end':
+                    depth -= 1
+                    if elem.tag == S_SHEET_PR:
+                        return None
+                    continue
+
+                depth += 1
+                if elem.tag == S_TAB_COLOR:
+                    return elem
+                # Элемент верхнего уровня, отличный от sheetPr, - заголовок закончился
+                if depth == 2 and elem.tag != S_SHEET_PR:
+                    return None
+    finally:
+        chunks.close()
+    return None
+
+def find_colored_tabs(zip_file, colors, color_classes, sheets=None, first_only=False, cancel_token=None):
+    """
+    Определяет листы книги, цвет вкладки которых относится к указанным классам.
+
+    Args:
+        zip_file (ZipFile): Открытый пакет
+        colors (WorkbookColors): Разрешение цветов книги
+        color_classes (tuple): Классы цветов, считающиеся проблемой (YELLOW, RED, ...)
+        sheets (list, optional): Пары (имя листа, имя части); по умолчанию читаются из книги
+        first_only (bool): Остановиться на первом найденном листе
+        cancel_token (CancellationToken, optional): Признак отмены, опрашивается перед каждым листом
+
+    Returns:
+        list: Пары (имя листа, класс цвета) в порядке листов книги
+    """
+    if sheets is None:
+        sheets = read_sheet_parts(zip_file)
+
+    colored = []
+    for sheet_name, sheet_part in sheets:
+        check_cancelled(cancel_token)
+        try:
+            tab_color = read_sheet_tab_color(zip_file, sheet_part)
+        except (KeyError, ET.ParseError):
+            continue
+        color_class = colors.classify(tab_color)
+        if color_class in color_classes:
+            colored.append((sheet_name, color_class))
+            if first_only:
+                break
+    return colored
@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import xml.etree.ElementTree as ET
+
+from app.core.colors import YELLOW, WorkbookColors
+from app.core.number_formats import date_format_codes
+
+# Пространства имен SpreadsheetML и DrawingML
+S_NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+A_NS = '{http://schemas.openxmlformats.org/drawingml/2006/main}'
+
+# Части пакета со стилями и темой книги
+XLSX_STYLES_PART = 'xl/styles.xml'
+XLSX_THEME_PART = 'xl/theme/theme1.xml'
+
+# Порядок цветов темы в атрибуте theme (первые две пары переставлены относительно clrScheme)
+THEME_COLOR_ORDER = ['lt1', 'dk1', 'lt2', 'dk2', 'accent1', 'accent2', 'accent3',
+                     'accent4', 'accent5', 'accent6', 'hlink', 'folHlink']
+
+def load_theme_colors(zip_file):
+    """
+    Загружает цвета темы книги в порядке индексов атрибута theme.
+
+    Returns:
+        list: Цвета 'RRGGBB'; пустой список, если темы нет
+    """
+    try:
+        content = zip_file.read(XLSX_THEME_PART)
+    except KeyError:
+        return []
+
+    scheme = ET.fromstring(content).find('.//' + A_NS + 'clrScheme')
+    if scheme is None:
+        return []
+
+    colors = {}
+    for entry in scheme:
+        name = entry.tag.replace(A_NS, '')
+        for value in entry:
+            if value.tag == A_NS + 'srgbClr':
+                colors[name] = value.get('val')
+            elif value.tag == A_NS + 'sysClr':
+                colors[name] = value.get('lastClr')
+    return [colors.get(name, '') for name in THEME_COLOR_ORDER]
+
+def parse_styles(stream, colors):
+    """
+    Разбирает styles.xml и определяет стили ячеек (cellXfs) с желтой заливкой.
+
+    Args:
+        stream: Файловый объект с содержимым styles.xml
+        colors (WorkbookColors): Разрешение цветов книги; палитра из styles.xml
+                                 (indexedColors) записывается в него же
+
+    Returns:
+        set: Индексы стилей cellXfs, дающих желтую заливку
+    """
+    root = ET.parse(stream).getroot()
+
+    # Переопределенная палитра книги
+    indexed = root.find(S_NS + 'colors/' + S_NS + 'indexedColors')
+    if indexed is not None:
+        colors.set_indexed_colors([entry.get('rgb', '') for entry in indexed.findall(S_NS + 'rgbColor')])
+
+    # Заливки с желтым цветом
+    flagged_fills = set()
+    fills = root.find(S_NS + 'fills')
+    if fills is not None:
+        for fill_id, fill in enumerate(fills.findall(S_NS + 'fill')):
+            pattern = fill.find(S_NS + 'patternFill')
+            if pattern is None or pattern.get('patternType', 'none') == 'none':
+                continue
+            if colors.classify(pattern.find(S_NS + 'fgColor')) == YELLOW:
+                flagged_fills.add(fill_id)
+
+    # Стили ячеек, ссылающиеся на эти заливки
+    flagged_xfs = set()
+    cell_xfs = root.find(S_NS + 'cellXfs')
+    if cell_xfs is not None and flagged_fills:
+        for xf_id, xf in enumerate(cell_xfs.findall(S_NS + 'xf')):
+            if int(xf.get('fillId', 0)) in flagged_fills:
+                flagged_xfs.add(xf_id)
+
+    return flagged_xfs
+
+def parse_date_styles(stream):
+    """
+    Разбирает styles.xml и определяет стили ячеек (cellXfs) с форматами даты и времени.
+
+    Args:
+        stream: Файловый объект с содержимым styles.xml
+
+    Returns:
+        dict: Индекс стиля cellXfs -> код формата даты
+    """
+    root = ET.parse(stream).getroot()
+
+    custom_formats = {}
+    num_fmts = root.find(S_NS + 'numFmts')
+    if num_fmts is not None:
+        for num_fmt in num_fmts.findall(S_NS + 'numFmt'):
+            custom_formats[int(num_fmt.get('numFmtId', 0))] = num_fmt.get('formatCode', '')
+
+    cell_xfs = root.find(S_NS + 'cellXfs')
+    if cell_xfs is None:
+        return {}
+    style_formats = [int(xf.get('numFmtId', 0)) for xf in cell_xfs.findall(S_NS + 'xf')]
+    return date_format_codes(custom_formats, style_formats)
+
+def load_date_styles(zip_file):
+    """
+    Загружает из пакета Excel стили ячеек с форматами даты и времени.
+
+    Args:
+        zip_file (ZipFile): Открытый пакет
+
+    Returns:
+        dict: Индекс стиля cellXfs -> код формата даты; пустой словарь, если стилей нет
+    """
+    try:
+        with zip_file.open(XLSX_STYLES_PART) as stream:
+            return parse_date_styles(stream)
+    except KeyError:
+        return {}
+
+def load_workbook_colors(zip_file):
+    """
+    Создает разрешение цветов книги с цветами ее темы.
+
+    Args:
+        zip_file (ZipFile): Открытый пакет
+
+    Returns:
+        WorkbookColors: Разрешение цветов; палитра по умолчанию до разбора styles.xml
+    """
+    return WorkbookColors(theme_colors=load_theme_colors(zip_file))
+
+def load_flagged_styles(zip_file, colors=None):
+    """
+    Загружает из пакета Excel множество стилей ячеек с желтой заливкой.
+
+    Args:
+        zip_file (ZipFile): Открытый пакет
+        colors (WorkbookColors, optional): Разрешение цветов книги; если передано,
+                                           в него записывается палитра из styles.xml
+
+    Returns:
+        set: Индексы стилей cellXfs; пустое множество, если стилей нет
+    """
+    if colors is None:
+        colors = load_workbook_colors(zip_file)
+    try:
+        with zip_file.open(XLSX_STYLES_PART) as stream:
+            return parse_styles(stream, colors)
+    except KeyError:
+        return set()
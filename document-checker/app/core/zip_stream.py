@@ -0,0 +1,33 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Размер порции распаковки по умолчанию
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+def iter_member_chunks(zip_file, member_name, chunk_size=DEFAULT_CHUNK_SIZE, max_bytes=None):
+    """
+    Последовательно распаковывает часть ZIP-архива порциями.
+
+    Распаковывается ровно столько данных, сколько запрошено: при достижении
+    max_bytes или при прекращении итерации поток закрывается и распаковщик
+    освобождается, оставшаяся часть члена архива не читается.
+
+    Args:
+        zip_file (ZipFile): Открытый архив
+        member_name (str): Имя части внутри архива
+        chunk_size (int): Размер порции распакованных данных в байтах
+        max_bytes (int, optional): Предел распакованных данных в байтах
+
+    Yields:
+        bytes: Очередная порция распакованных данных
+    """
+    remaining = max_bytes
+    with zip_file.open(member_name) as stream:
+        while remaining is None or remaining > 0:
+            size = chunk_size if remaining is None else min(chunk_size, remaining)
+            chunk = stream.read(size)
+            if not chunk:
+                break
+            if remaining is not None:
+                remaining -= len(chunk)
+            yield chunk
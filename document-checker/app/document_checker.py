@@ -2,23 +2,31 @@
 # -*- coding: utf-8 -*-
 import datetime
 import os
+import re
 import sys
 import time
 import threading
 import tkinter as tk
 from tkinter import filedialog, messagebox
 import concurrent.futures
-from queue import Queue
+from queue import Empty, Full, Queue
 from tkinter import ttk
 
 # Импортируем модули приложения
 from app.ui.widgets import UIBuilder
-from app.core.file_utils import normalize_path, get_file_type, is_locked_file, detect_file_size_category, open_file, open_directory
-from app.core.word_checker import check_word_file
-from app.core.excel_checker import check_excel_file
+from app.core.com_pool import ComFallbackDeferred, configure_office_pools, defer_com_fallback, shutdown_office_pools
+from app.core.file_utils import normalize_path, get_file_type, iter_files_to_check, open_file, open_directory
+from app.core.check_runner import (CheckPlan, DEFAULT_FILE_TIMEOUT, DEFAULT_MAX_MEMORY_MB, EXECUTION_AUTO,
+                                   EXECUTION_PROCESSES, EXECUTION_THREADS, MAX_CHUNK_SIZE, OFFICE_LANE_WORKERS,
+                                   PROCESS_MODE_MIN_FILES, check_file, in_flight_limits, resolve_execution_mode)
 from app.core.report_manager import ReportManager
+from app.core.result_cache import CACHEABLE_RESULTS, ResultCache
+from app.core.dedup import DuplicateDetector, make_duplicate_result, result_verdict
+from app.core.isolated_pool import get_isolated_pool
+from app.core.scheduler import CheckScheduler
+from app.core.value_matcher import compile_search_values
 from app.utils.config import ConfigManager
-from app.utils.threading_utils import init_workers_pool
+from app.utils.threading_utils import CancellationToken, CheckCancelled
 
 class DocumentChecker:
     """
@@ -84,7 +92,7 @@ class DocumentChecker:
         total_files = len(self.results)
         passed_files = sum(1 for result in self.results if result['result'] == "Пройден")
         failed_files = sum(1 for result in self.results if result['result'] == "Не пройден")
-        error_files = sum(1 for result in self.results if result['result'] in ["Ошибка", "Пропущен"])
+        error_files = sum(1 for result in self.results if result['result'] in ["Ошибка", "Пропущен", "Тайм-аут"])
         
         # Отображение статистики
         stats_text = f"Всего файлов: {total_files} | Пройдено: {passed_files} | Не пройдено: {failed_files} | С ошибками: {error_files}"
@@ -95,7 +103,7 @@ class DocumentChecker:
         tree_frame.pack(fill=tk.BOTH, expand=True)
         
         # Создаем таблицу с теми же колонками, что и в основном окне
-        columns = ("№", "Имя файла", "Тип файла", "Путь к файлу", "Результат", "Комментарий")
+        columns = ("№", "Имя файла", "Тип файла", "Путь к файлу", "Результат", "Комментарий", "Примечание")
         results_tree = ttk.Treeview(tree_frame, columns=columns, show='headings')
         
         # Настройка заголовков
@@ -109,6 +117,7 @@ class DocumentChecker:
         results_tree.column("Путь к файлу", width=200)
         results_tree.column("Результат", width=100, anchor=tk.CENTER)
         results_tree.column("Комментарий", width=300)
+        results_tree.column("Примечание", width=200)
         
         # Добавление полосы прокрутки
         scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=results_tree.yview)
@@ -136,7 +145,8 @@ class DocumentChecker:
                     result['file_type'],
                     result['file_path'],
                     result['result'],
-                    result['comment']
+                    result['comment'],
+                    result.get('note', '')
                 ),
                 tags=(tag,)
             )
@@ -175,8 +185,8 @@ class DocumentChecker:
                 # Подгоняем ширину столбцов таблицы под текущий размер окна
                 window_width = event.width
                 
-                # Подгоняем ширину последнего столбца (комментария) под оставшееся пространство
-                fixed_columns_width = 40 + 150 + 80 + 200 + 100  # Сумма фиксированных ширин первых 5 столбцов
+                # Подгоняем ширину столбца комментария под оставшееся пространство
+                fixed_columns_width = 40 + 150 + 80 + 200 + 100 + 200  # Сумма фиксированных ширин остальных столбцов
                 scrollbar_width = 20  # Примерная ширина полосы прокрутки
                 padding = 40  # Дополнительные отступы
                 
@@ -339,9 +349,18 @@ class DocumentChecker:
         self.is_checking = False
         self.stop_requested = False
         
+        # Признак отмены, который опрашивают модули проверки во время разбора файла
+        self.cancel_token = CancellationToken()
+        
         # Опция пропуска больших файлов
         self.skip_large_files = tk.BooleanVar(value=True)
         
+        # Опция завершения проверки файла на первой найденной проблеме
+        self.first_issue_only = tk.BooleanVar(value=False)
+        
+        # Опция проверки всех файлов заново без использования кэша результатов
+        self.force_recheck = tk.BooleanVar(value=False)
+        
         # Счетчики файлов
         self.total_files_var = tk.StringVar(value="0")
         self.remaining_files_var = tk.StringVar(value="0")
@@ -350,9 +369,22 @@ class DocumentChecker:
         default_threads = min(8, max(1, int(os.cpu_count() * 0.75)) if os.cpu_count() else 4)
         self.max_threads = tk.IntVar(value=default_threads)
         
+        # Режим выполнения: потоки, процессы или автоматический выбор
+        self.execution_mode = tk.StringVar(value=EXECUTION_AUTO)
+        
+        # Лимиты на проверку одного файла в процессе-исполнителе: время (с) и память (МБ), 0 - без ограничения
+        self.file_timeout = tk.IntVar(value=DEFAULT_FILE_TIMEOUT)
+        self.max_memory_mb = tk.IntVar(value=DEFAULT_MAX_MEMORY_MB)
+        
         # Результаты проверки
         self.results = []
         
+        # Значения для поиска, разобранные для текущего запуска
+        self.run_search_values = []
+        
+        # Настройки проверки текущего запуска (CheckPlan)
+        self.run_plan = None
+        
         # Переменные для поиска значений в документах
         self.enable_value_search = tk.BooleanVar(value=False)  # По умолчанию отключено
         self.search_values = tk.StringVar(value='"2024", "Предоставлено ", "Утверждено"')  # Примерные значения для поиска
@@ -587,73 +619,18 @@ class DocumentChecker:
         # Обновляем отображение текущего номера запуска
         self.run_id_label.config(text=str(self.report_manager.current_run_id))
         
-        # Предварительно подсчитываем количество файлов для отображения
-        threading.Thread(target=self.count_files_to_process, args=(path,), daemon=True).start()
-    
-    def count_files_to_process(self, path):
-        """Предварительный подсчет файлов для корректного отображения"""
-        try:
-            # Получаем список расширений, которые нужно проверить
-            extensions_to_check = self.get_extensions_to_check()
-            
-            if not extensions_to_check:
-                self.status_text.set("Не выбрано ни одного типа файлов для проверки")
-                self.root.after(0, lambda: self.show_warning("Предупреждение", 
-                                                  "Не выбрано ни одного типа файлов для проверки.\n"
-                                                  "Пожалуйста, выберите хотя бы один тип файла."))
-                return
-            
-            # Для отображения статуса
-            self.status_text.set("Подсчет файлов...")
-            
-            # Проверяем, не список ли это файлов (с разделителем |||)
-            if "|||" in path:
-                files = path.split("|||")
-                # Фильтруем файлы по выбранным расширениям
-                files = [f for f in files if os.path.splitext(f)[1].lower() in extensions_to_check]
-            elif os.path.isfile(path):
-                # Проверяем, соответствует ли расширение файла выбранным типам
-                if os.path.splitext(path)[1].lower() in extensions_to_check:
-                    files = [path]
-                else:
-                    files = []
-            else:  # Папка
-                files = []
-                for root, _, filenames in os.walk(path):
-                    for filename in filenames:
-                        file_ext = os.path.splitext(filename)[1].lower()
-                        if file_ext in extensions_to_check:
-                            # Нормализуем пути
-                            file_path = normalize_path(os.path.join(root, filename))
-                            files.append(file_path)
-            
-            # Пропускаем временные файлы
-            files = [f for f in files if not os.path.basename(f).startswith("~$")]
-            
-            # Обновляем отображение количества файлов
-            total_files = len(files)
-            self.root.after(0, lambda count=total_files: self.update_file_counts(count))
-            
-            # Если нет файлов для проверки, выводим сообщение
-            if not files:
-                self.status_text.set("Нет файлов для проверки")
-                self.root.after(0, lambda: self.show_info("Информация", 
-                                                "В указанном пути не найдено файлов выбранных типов."))
-                return
-            
-            # Запускаем фактическую проверку
-            self.root.after(0, lambda: self.start_actual_check(path))
-            
-        except Exception as e:
-            self.status_text.set("Ошибка при подсчете файлов")
-            error_message = str(e)
-            self.root.after(0, lambda error=error_message: self.show_error("Ошибка", f"Произошла ошибка при подсчете файлов: {error}"))
+        # Счетчики файлов растут по мере поиска файлов во время проверки
+        self.total_files_var.set("0")
+        self.remaining_files_var.set("0")
+        
+        self.start_actual_check(path)
     
     def start_actual_check(self, path):
-        """Запускает фактическую проверку файлов после подсчета их количества"""
+        """Запускает проверку файлов (поиск файлов идет одновременно с проверкой)"""
         # Устанавливаем флаги проверки
         self.is_checking = True
         self.stop_requested = False
+        self.cancel_token = CancellationToken()
         
         # Изменяем текст и команду кнопки
         self.action_button.config(text="Остановить проверку", command=self.stop_check)
@@ -661,27 +638,21 @@ class DocumentChecker:
         # Запуск проверки в отдельном потоке, чтобы не блокировать интерфейс
         threading.Thread(target=self.process_path, args=(path,), daemon=True).start()
     
-    def update_file_counts(self, total_count):
-        """Обновляет счетчики количества файлов"""
-        self.total_files_var.set(str(total_count))
-        self.remaining_files_var.set(str(total_count))
-        
-        # Обновляем статус
-        self.status_text.set(f"Найдено файлов: {total_count}")
-    
     def stop_check(self):
         """Останавливает процесс проверки"""
         if not self.is_checking:
             return
         
-        # Устанавливаем флаг запроса на остановку
+        # Устанавливаем флаг запроса на остановку и прерываем файлы, которые проверяются сейчас
         self.stop_requested = True
+        self.cancel_token.cancel()
         self.status_text.set("Останавливается...")
     
-    def update_results_tree(self, result):
+    def update_results_tree(self, result, row_num=None):
         """Обновляет дерево результатов новым результатом"""
         # Определение номера строки
-        row_num = len(self.results_tree.get_children()) + 1
+        if row_num is None:
+            row_num = len(self.results_tree.get_children()) + 1
         
         # Определение тега для строки (цвета)
         tag = 'passed' if result['result'] == "Пройден" else 'failed'
@@ -702,11 +673,19 @@ class DocumentChecker:
                 result['file_type'],
                 normalized_path,
                 result['result'],
-                result['comment']
+                result['comment'],
+                result.get('note', '')
             ),
             tags=(tag,)
         )
     
+    def add_results_to_tree(self, results):
+        """Добавляет в дерево результатов пакет новых результатов"""
+        # Номер строки определяется один раз на пакет, а не перебором строк для каждого результата
+        first_row = len(self.results_tree.get_children()) + 1
+        for offset, result in enumerate(results):
+            self.update_results_tree(result, first_row + offset)
+    
     def update_progress(self, progress_value, remaining_files):
         """Обновляет прогресс и индикаторы количества файлов"""
         self.progress_value.set(progress_value)
@@ -729,6 +708,7 @@ class DocumentChecker:
         self.status_text.set("Идет проверка...")
         self.progress_value.set(0)
         
+        result_cache = None
         try:
             # Получаем список расширений, которые нужно проверить
             extensions_to_check = self.get_extensions_to_check()
@@ -742,62 +722,133 @@ class DocumentChecker:
                 self.finalize_check(save_results=False)
                 return
             
-            # Проверяем, не список ли это файлов (с разделителем |||)
-            if "|||" in path:
-                files = path.split("|||")
-                # Фильтруем файлы по выбранным расширениям
-                files = [f for f in files if os.path.splitext(f)[1].lower() in extensions_to_check]
-            # Определяем, это файл или папка
-            elif os.path.isfile(path):
-                # Проверяем, соответствует ли расширение файла выбранным типам
-                if os.path.splitext(path)[1].lower() in extensions_to_check:
-                    files = [path]
-                else:
-                    files = []
-            else:  # Папка
-                files = []
-                for root, _, filenames in os.walk(path):
-                    for filename in filenames:
-                        file_ext = os.path.splitext(filename)[1].lower()
-                        if file_ext in extensions_to_check:
-                            # Нормализуем пути
-                            file_path = normalize_path(os.path.join(root, filename))
-                            files.append(file_path)
+            # Разбираем значения для поиска и строим автомат один раз на весь запуск
+            self.run_search_values = []
+            if self.enable_value_search.get():
+                self.run_search_values = self.parse_search_values()
+                if self.run_search_values:
+                    compile_search_values(self.run_search_values)
             
-            # Пропускаем временные файлы
-            files = [f for f in files if not os.path.basename(f).startswith("~$")]
+            # Настройки запуска передаются в проверку (и в процессы-исполнители) одним объектом
+            self.run_plan = CheckPlan(
+                enable_value_search=self.enable_value_search.get(),
+                search_values=self.run_search_values,
+                first_issue_only=self.first_issue_only.get(),
+                skip_large_files=self.skip_large_files.get(),
+                file_timeout=self.file_timeout.get(),
+                max_memory_mb=self.max_memory_mb.get()
+            )
             
-            # Если нет файлов для проверки, выводим сообщение
-            if not files:
-                self.status_text.set("Нет файлов для проверки")
-                self.root.after(0, lambda: self.show_info("Информация", 
-                                                "В указанном пути не найдено файлов выбранных типов."))
-                # Сбрасываем состояние проверки и восстанавливаем кнопку
-                self.finalize_check(save_results=False)
-                return
+            # Кэш результатов прошлых запусков: неизмененные файлы при тех же настройках не проверяются
+            settings_hash = self.run_plan.settings_hash()
+            use_cached_results = not self.force_recheck.get()
+            try:
+                result_cache = ResultCache(self.config_manager.cache_path)
+            except Exception as e:
+                print(f"Кэш результатов недоступен: {str(e)}")
             
-            # Нормализуем все оставшиеся пути
-            files = [normalize_path(f) for f in files]
+            # Найденные файлы, отправленные на проверку (индекс -> FoundFile), для записи в кэш
+            checked_files = {}
             
-            # Обновляем отображение количества файлов
-            total_files = len(files)
-            self.total_files_var.set(str(total_files))
-            self.remaining_files_var.set(str(total_files))
+            # Копии одного и того же содержимого проверяются один раз. Вердикт каждого проверенного
+            # файла (путь -> небольшой кортеж, см. result_verdict) хранится до конца запуска: детектор
+            # связывает копию с первым файлом той же группы полного хэша, поэтому копия, найденная
+            # в другой папке сколь угодно позже, получает готовый вердикт. Копии, найденные до
+            # окончания проверки исходного файла, ждут его результата в waiting_duplicates
+            duplicate_detector = DuplicateDetector()
+            original_verdicts = {}
+            waiting_duplicates = {}
+            # Копии, которые нужно проверить самостоятельно (исходный файл не удалось проверить)
+            redispatch_queue = Queue()
+            # Индексы файлов, переданных из потоков быстрой проверки на проверку через Office
+            office_deferred = set()
             
-            # Многопоточная обработка файлов
-            import concurrent.futures
-            from queue import Queue
+            # Поиск файлов идет в отдельном потоке одновременно с проверкой:
+            # найденные файлы сразу попадают в очередь и отправляются на проверку.
+            # Там же выполняются поиск в кэше и поиск копий, чтобы не занимать основной цикл чтением файлов
+            # Определяем оптимальное количество потоков из настроек пользователя
+            max_workers = self.max_threads.get()
+            
+            # Окно отправки: в работе держим лишь несколько задач на рабочего, а поиск файлов
+            # приостанавливается, когда очередь найденных файлов заполнена. Так расход памяти
+            # не зависит от числа файлов в папке, а остановка срабатывает сразу
+            files_in_flight, chunks_in_flight, pending_limit = in_flight_limits(max_workers)
+            discovered_queue = Queue(maxsize=pending_limit)
+            discovery_done = threading.Event()
+            
+            def discover_files():
+                try:
+                    for found_file in iter_files_to_check(path, extensions_to_check):
+                        if self.stop_requested:
+                            break
+                        
+                        # Файл не изменился с прошлой проверки - берем результат из кэша
+                        cached_result = None
+                        if result_cache is not None and use_cached_results and found_file.mtime is not None:
+                            cached_result = result_cache.lookup(found_file.path, found_file.size, found_file.mtime, settings_hash)
+                        
+                        original_path = None
+                        if cached_result is None:
+                            original_path = duplicate_detector.find_original(found_file)
+                        
+                        # Ждем свободного места в очереди, проверяя запрос остановки
+                        item = (found_file, cached_result, original_path)
+                        while not self.stop_requested:
+                            try:
+                                discovered_queue.put(item, timeout=0.1)
+                                break
+                            except Full:
+                                continue
+                finally:
+                    discovery_done.set()
+            
+            threading.Thread(target=discover_files, daemon=True).start()
             
             # Очередь для результатов обработки
             result_queue = Queue()
-            # Счетчик обработанных файлов для обновления прогресса
+            # Счетчики найденных и обработанных файлов для обновления прогресса
+            discovered_files_counter = [0]
             processed_files_counter = [0]
             
+            # Имя последнего взятого в проверку файла для строки состояния
+            last_file_name = [None]
+            
             # Защищаем доступ к счетчику с помощью мьютекса
             counter_lock = threading.Lock()
             
+            # Учет результата одного файла: счетчик и очередь результатов
+            # (прогресс и таблица обновляются пакетами в основном цикле)
+            def record_result(file_index, result):
+                with counter_lock:
+                    processed_files_counter[0] += 1
+                
+                result_queue.put((file_index, result))
+                
+                # Сохраняем результат в кэш (если размер и время изменения файла известны)
+                found_file = checked_files.pop(file_index, None)
+                if result_cache is not None and found_file is not None and found_file.mtime is not None:
+                    result_cache.store(found_file.path, found_file.size, found_file.mtime, settings_hash, result)
+                
+                # Вердикт проверенного файла сохраняется для копий, найденных позже,
+                # и передается копиям, уже ожидающим его проверки (сами копии исходными не бывают)
+                if found_file is None or 'note' in result:
+                    return
+                verdict = result_verdict(result)
+                with counter_lock:
+                    original_verdicts[found_file.path] = verdict
+                    duplicates = waiting_duplicates.pop(found_file.path, [])
+                for duplicate_index, duplicate_file in duplicates:
+                    share_result(duplicate_index, duplicate_file, verdict, found_file.path)
+            
+            # Результат копии: совпадает с результатом исходного файла, если он зависит только от содержимого
+            def share_result(file_index, found_file, verdict, original_path):
+                if verdict[1] in CACHEABLE_RESULTS:
+                    record_result(file_index, make_duplicate_result(verdict, found_file.path, original_path))
+                else:
+                    redispatch_queue.put((file_index, found_file.path, found_file.size))
+            
             # Функция для обработки одного файла в отдельном потоке
-            def process_single_file(file_index, file_path):
+            def process_single_file(file_index, file_path, file_size=None):
                 # Проверяем запрос на остановку
                 if self.stop_requested:
                     return None
@@ -806,96 +857,217 @@ class DocumentChecker:
                     # Получаем информацию о файле
                     file_name = os.path.basename(file_path)
                     
-                    # Обновляем информацию о текущем файле в UI
-                    self.root.after(0, lambda: self.current_file.set(file_name))
+                    # Текущий файл показывается в UI при очередном обновлении
+                    last_file_name[0] = file_name
                     
                     # Проверяем файл
-                    result = self.check_file(file_path, file_name)
-                    
-                    # Обновляем счетчик и прогресс-бар
+                    result = self.check_file(file_path, file_name, file_size)
+                except ComFallbackDeferred:
+                    # Файл требует проверки через Office - она выполняется отдельными потоками
                     with counter_lock:
-                        processed_files_counter[0] += 1
-                        progress = (processed_files_counter[0] / total_files) * 100
-                        remaining = total_files - processed_files_counter[0]
-                        self.root.after(0, lambda p=progress, r=remaining: self.update_progress(p, r))
-                    
-                    # Добавляем результат в очередь
-                    result_queue.put((file_index, result))
-                    
-                    return result
+                        office_deferred.add(file_index)
+                    office_files.put((file_index, file_path))
+                    return None
+                except CheckCancelled:
+                    # Проверка остановлена посреди файла - неполный результат не записывается
+                    return None
                 except Exception as e:
                     # В случае ошибки создаем запись о ней
-                    error_result = {
+                    result = {
                         'file_name': os.path.basename(file_path),
                         'file_type': get_file_type(file_path),
                         'file_path': file_path,
                         'result': "Ошибка",
                         'comment': f"Ошибка проверки: {str(e)}"
                     }
-                    
-                    # Обновляем счетчик и прогресс-бар
-                    with counter_lock:
-                        processed_files_counter[0] += 1
-                        progress = (processed_files_counter[0] / total_files) * 100
-                        remaining = total_files - processed_files_counter[0]
-                        self.root.after(0, lambda p=progress, r=remaining: self.update_progress(p, r))
-                    
-                    # Добавляем результат ошибки в очередь
-                    result_queue.put((file_index, error_result))
-                    return error_result
+                
+                # Добавляем результат в очередь
+                record_result(file_index, result)
+                return result
             
-            # Определяем оптимальное количество потоков из настроек пользователя
-            max_workers = self.max_threads.get()
+            # Задача потока: один большой файл или пакет мелких
+            def process_files(files):
+                for file_index, file_path, file_size in files:
+                    process_single_file(file_index, file_path, file_size)
+            
+            # Файлы для проверки через Office (индекс, путь): их возвращают процессы-исполнители
+            # и потоки быстрой проверки, а проверяют отдельные потоки, чтобы медленные
+            # документы Office не занимали места быстрого разбора
+            office_files = Queue()
+            office_workers = min(max_workers, OFFICE_LANE_WORKERS)
+            
+            # Не больше одного экземпляра Word и Excel на поток проверки через Office;
+            # зависший документ Office прерывается по тому же лимиту времени на файл
+            configure_office_pools(size=office_workers, job_timeout=self.run_plan.file_timeout)
+            
+            # Завершенные задачи попадают в очередь из обратного вызова, поэтому основной цикл
+            # забирает каждую за O(1), не перебирая все незавершенные задачи при каждом ожидании
+            completion_queue = Queue()
+            
+            def submit(pool, fn, *args):
+                future = pool.submit(fn, *args)
+                future.add_done_callback(completion_queue.put)
+                return future
             
-            # Создаем пул потоков и начинаем обработку
-            with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-                # Запускаем обработку файлов
-                future_to_file = {
-                    executor.submit(process_single_file, i, file_path): (i, file_path) 
-                    for i, file_path in enumerate(files)
-                }
+            # Создаем пулы потоков и начинаем обработку; потоки быстрой проверки
+            # не запускают Office, а возвращают такие файлы в office_files
+            with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers, initializer=defer_com_fallback,
+                                                       initargs=(True, True)) as executor, \
+                    concurrent.futures.ThreadPoolExecutor(max_workers=office_workers) as office_executor:
+                future_to_file = {}
+                future_to_chunk = {}
+                future_to_office = {}
                 
-                # Отслеживаем завершение задач и добавляем результаты
-                completed_results = []
+                # Найденные, но еще не отправленные на проверку файлы: выдаются
+                # от самых трудоемких к мелким, мелкие - пакетами
+                scheduler = CheckScheduler(self.run_plan.skip_large_files)
+                # Режим выполнения определяется, когда найдено достаточно файлов или поиск завершен
+                execution_mode = None
+                process_pool = None
                 
                 # Таймер для обновления UI
                 last_ui_update = time.time()
                 
                 # Периодически проверяем результаты и обновляем UI
-                while future_to_file:
-                    # Проверяем завершенные задачи
-                    done, not_done = concurrent.futures.wait(
-                        future_to_file.keys(),
-                        timeout=0.1,  # Небольшой тайм-аут для проверки остановки
-                        return_when=concurrent.futures.FIRST_COMPLETED
-                    )
+                while True:
+                    # Забираем найденные файлы, пока есть место в окне отправки
+                    while len(scheduler) < pending_limit:
+                        try:
+                            found_file, cached_result, original_path = discovered_queue.get_nowait()
+                        except Empty:
+                            break
+                        with counter_lock:
+                            file_index = discovered_files_counter[0]
+                            discovered_files_counter[0] += 1
+                        
+                        if cached_result is not None:
+                            record_result(file_index, cached_result)
+                            continue
+                        
+                        checked_files[file_index] = found_file
+                        if original_path is None:
+                            scheduler.add(file_index, found_file.path, found_file.size)
+                            continue
+                        
+                        # Копия уже найденного файла: ждем его результата, а не проверяем повторно
+                        with counter_lock:
+                            verdict = original_verdicts.get(original_path)
+                            if verdict is None:
+                                waiting_duplicates.setdefault(original_path, []).append((file_index, found_file))
+                        if verdict is not None:
+                            share_result(file_index, found_file, verdict, original_path)
+                    
+                    # Копии, исходный файл которых не удалось проверить, проверяются самостоятельно
+                    while not redispatch_queue.empty():
+                        scheduler.add(*redispatch_queue.get())
+                    
+                    discovery_finished = discovery_done.is_set() and discovered_queue.empty()
+                    
+                    # Разбор файлов удерживает GIL, поэтому при большом числе файлов он выполняется процессами;
+                    # проверка через Office всегда остается в потоках основного процесса
+                    if execution_mode is None and (discovery_finished or discovered_files_counter[0] >= PROCESS_MODE_MIN_FILES):
+                        execution_mode = resolve_execution_mode(self.execution_mode.get(), discovered_files_counter[0], max_workers)
+                        if execution_mode == EXECUTION_PROCESSES:
+                            process_pool = get_isolated_pool(max_workers)
+                    
+                    # Отправляем найденные файлы на проверку
+                    if execution_mode == EXECUTION_PROCESSES:
+                        # Файлы передаются процессам порциями; неполная порция отправляется,
+                        # если процессы простаивают или поиск завершен
+                        while scheduler and len(future_to_chunk) < chunks_in_flight and (
+                                len(scheduler) >= MAX_CHUNK_SIZE or discovery_finished
+                                or len(future_to_chunk) < max_workers):
+                            chunk = scheduler.take_chunk()
+                            future = process_pool.submit_chunk(chunk, self.run_plan)
+                            future.add_done_callback(completion_queue.put)
+                            future_to_chunk[future] = chunk
+                    elif execution_mode == EXECUTION_THREADS:
+                        while scheduler and len(future_to_file) < files_in_flight:
+                            files = scheduler.take_task()
+                            future_to_file[submit(executor, process_files, files)] = files
+                    
+                    # Файлы для проверки через Office отправляются в отдельные потоки
+                    while not office_files.empty() and len(future_to_office) < office_workers:
+                        file_index, file_path = office_files.get()
+                        with counter_lock:
+                            office_deferred.discard(file_index)
+                        future_to_office[submit(office_executor, process_single_file, file_index, file_path)] = [(file_index, file_path, None)]
+                    
+                    # Все найденные файлы проверены
+                    if (discovery_finished and not scheduler and office_files.empty()
+                            and not future_to_file and not future_to_chunk and not future_to_office):
+                        # Копии, исходный файл которых так и не получил результата, проверяются самостоятельно
+                        with counter_lock:
+                            orphans = [duplicate for duplicates in waiting_duplicates.values() for duplicate in duplicates]
+                            waiting_duplicates.clear()
+                        if not orphans:
+                            break
+                        for file_index, found_file in orphans:
+                            scheduler.add(file_index, found_file.path, found_file.size)
+                        continue
+                    
+                    # Забираем завершенные задачи: ждем первую (с небольшим тайм-аутом
+                    # для проверки остановки), остальные уже готовые - без ожидания
+                    done = []
+                    if future_to_file or future_to_chunk or future_to_office:
+                        try:
+                            done.append(completion_queue.get(timeout=0.1))
+                            while True:
+                                done.append(completion_queue.get_nowait())
+                        except Empty:
+                            pass
+                    else:
+                        # Пока задач нет, ждем новых найденных файлов
+                        discovery_done.wait(0.05)
                     
                     # Если есть завершенные задачи, обрабатываем их
                     for future in done:
+                        # Порция файлов, проверенная процессом-исполнителем
+                        if future in future_to_chunk:
+                            future_to_chunk.pop(future)
+                            if future.cancelled():
+                                continue
+                            
+                            # Файлы, превысившие лимиты, и файлы аварийно завершившегося процесса
+                            # уже получили результат в пуле - остальные файлы порции проверены
+                            for file_index, file_path, result in future.result():
+                                if result is None:
+                                    # Файл требует проверки через Office - передаем его в отдельные потоки
+                                    if not self.stop_requested:
+                                        office_files.put((file_index, file_path))
+                                else:
+                                    record_result(file_index, result)
+                                    last_file_name[0] = result['file_name']
+                            continue
+                        
                         # Удаляем задачу из списка ожидания
-                        file_index, file_path = future_to_file.pop(future)
+                        files = future_to_file.pop(future, None) or future_to_office.pop(future, None)
+                        if files is None or future.cancelled():
+                            continue
                         
                         try:
                             # Получаем результат задачи
-                            result = future.result()
-                            if result:
-                                completed_results.append(result)
+                            future.result()
                         except Exception as e:
-                            # В случае необработанного исключения, создаем запись об ошибке
-                            error_result = {
-                                'file_name': os.path.basename(file_path),
-                                'file_type': get_file_type(file_path),
-                                'file_path': file_path,
-                                'result': "Ошибка",
-                                'comment': f"Непредвиденная ошибка: {str(e)}"
-                            }
-                            completed_results.append(error_result)
-                            self.root.after(0, lambda r=error_result: self.update_results_tree(r))
+                            # В случае необработанного исключения, создаем запись об ошибке для файлов
+                            # задачи, которые еще не получили результата и не переданы в Office
+                            for file_index, file_path, _ in files:
+                                with counter_lock:
+                                    if file_index not in checked_files or file_index in office_deferred:
+                                        continue
+                                error_result = {
+                                    'file_name': os.path.basename(file_path),
+                                    'file_type': get_file_type(file_path),
+                                    'file_path': file_path,
+                                    'result': "Ошибка",
+                                    'comment': f"Непредвиденная ошибка: {str(e)}"
+                                }
+                                record_result(file_index, error_result)
                     
                     # Проверяем, не запрошена ли остановка
                     if self.stop_requested:
                         # Отменяем все незавершенные задачи
-                        for future in list(future_to_file.keys()):
+                        for future in list(future_to_file) + list(future_to_chunk) + list(future_to_office):
                             future.cancel()
                         break
                     
@@ -904,20 +1076,54 @@ class DocumentChecker:
                     if current_time - last_ui_update > 0.2:
                         last_ui_update = current_time
                         
-                        # Получаем все результаты из очереди и обновляем UI
+                        # Общее количество растет по мере поиска файлов
+                        with counter_lock:
+                            total_files = discovered_files_counter[0]
+                            processed = processed_files_counter[0]
+                        progress = (processed / total_files) * 100 if total_files else 0
+                        self.root.after(0, lambda t=total_files: self.total_files_var.set(str(t)))
+                        self.root.after(0, lambda p=progress, r=total_files - processed: self.update_progress(p, r))
+                        if last_file_name[0]:
+                            self.root.after(0, lambda n=last_file_name[0]: self.current_file.set(n))
+                        
+                        # Получаем все результаты из очереди и добавляем их в таблицу одним пакетом
+                        batch = []
                         while not result_queue.empty():
                             _, result = result_queue.get()
-                            self.results.append(result)
-                            self.root.after(0, lambda r=result: self.update_results_tree(r))
+                            batch.append(result)
+                        if batch:
+                            self.results.extend(batch)
+                            self.root.after(0, lambda b=batch: self.add_results_to_tree(b))
+                        
+                        # Записываем новые результаты в кэш
+                        if result_cache is not None:
+                            result_cache.flush()
                         
                         # Обновляем интерфейс
                         self.root.update()
                 
                 # Получаем оставшиеся результаты из очереди
+                batch = []
                 while not result_queue.empty():
                     _, result = result_queue.get()
-                    self.results.append(result)
-                    self.root.after(0, lambda r=result: self.update_results_tree(r))
+                    batch.append(result)
+                if batch:
+                    self.results.extend(batch)
+                    self.root.after(0, lambda b=batch: self.add_results_to_tree(b))
+            
+            # Итоговое количество найденных файлов
+            total_files = discovered_files_counter[0]
+            self.total_files_var.set(str(total_files))
+            
+            # Если нет файлов для проверки, выводим сообщение
+            if total_files == 0:
+                self.status_text.set("Нет файлов для проверки")
+                if not self.stop_requested:
+                    self.root.after(0, lambda: self.show_info("Информация", 
+                                                    "В указанном пути не найдено файлов выбранных типов."))
+                # Сбрасываем состояние проверки и восстанавливаем кнопку
+                self.finalize_check(save_results=False)
+                return
             
             # Обновляем прогресс-бар до конечного состояния
             if self.stop_requested:
@@ -959,83 +1165,57 @@ class DocumentChecker:
             self.root.after(0, lambda error=error_message: self.show_error("Ошибка", f"Произошла ошибка: {error}"))
             # Финализация проверки при ошибке
             self.finalize_check(save_results=len(self.results) > 0)
+        finally:
+            # Закрываем экземпляры Word и Excel, запущенные для проверки через win32com
+            shutdown_office_pools()
+            
+            # Записываем оставшиеся результаты в кэш
+            if result_cache is not None:
+                try:
+                    result_cache.close()
+                except Exception as e:
+                    print(f"Ошибка записи кэша результатов: {str(e)}")
     
-    def check_file(self, file_path, file_name):
+    def parse_search_values(self):
         """
-        Проверяет файл в соответствии с его типом.
+        Разбирает строку значений для поиска из настроек.
+        
+        Returns:
+            list: Список значений для поиска
+        """
+        search_values = []
+        try:
+            # Парсим значения из строки, разделенные запятыми и в кавычках
+            values_str = self.search_values.get().strip()
+            if values_str:
+                # Ищем строки в двойных кавычках
+                pattern = r'"([^"]*)"'
+                matches = re.findall(pattern, values_str)
+                
+                # Добавляем найденные значения в список
+                if matches:
+                    search_values = matches
+                else:
+                    # Если не удалось найти строки в кавычках, используем запятую как разделитель
+                    search_values = [val.strip() for val in values_str.split(',') if val.strip()]
+        except Exception as e:
+            print(f"Ошибка при обработке значений для поиска: {str(e)}")
+        
+        return search_values
+    
+    def check_file(self, file_path, file_name, file_size=None):
+        """
+        Проверяет файл в соответствии с его типом и настройками текущего запуска.
         
         Args:
             file_path (str): Путь к файлу
             file_name (str): Имя файла
+            file_size (int, optional): Размер файла, если уже известен из обхода папки
                 
         Returns:
             dict: Результат проверки
         """
-        file_type = get_file_type(file_path)
-        
-        # Проверка, не заблокирован ли файл
-        if is_locked_file(file_path):
-            return {
-                'file_name': file_name,
-                'file_type': file_type,
-                'file_path': file_path,
-                'result': "Ошибка",
-                'comment': "Файл заблокирован другим процессом"
-            }
-        
-        # Определяем категорию размера файла
-        size_category = detect_file_size_category(file_path)
-        
-        # Добавляем размер в информацию о файле для логирования
-        file_size_mb = os.path.getsize(file_path) / (1024 * 1024)
-        file_size_str = f"{file_size_mb:.2f} МБ"
-        
-        # При очень больших файлах (>100 МБ) и если выбрана опция пропуска больших файлов
-        if size_category == "very_large" and self.skip_large_files.get():
-            return {
-                'file_name': file_name,
-                'file_type': file_type,
-                'file_path': file_path,
-                'result': "Пропущен",
-                'comment': f"Файл слишком большой ({file_size_str}). Пропущен согласно настройкам."
-            }
-        
-        # Обработка параметров поиска значений
-        enable_search = self.enable_value_search.get()
-        search_values = []
-        
-        if enable_search:
-            try:
-                # Парсим значения из строки, разделенные запятыми и в кавычках
-                values_str = self.search_values.get().strip()
-                if values_str:
-                    import re
-                    # Ищем строки в двойных кавычках
-                    pattern = r'"([^"]*)"'
-                    matches = re.findall(pattern, values_str)
-                    
-                    # Добавляем найденные значения в список
-                    if matches:
-                        search_values = matches
-                    else:
-                        # Если не удалось найти строки в кавычках, используем запятую как разделитель
-                        search_values = [val.strip() for val in values_str.split(',') if val.strip()]
-            except Exception as e:
-                print(f"Ошибка при обработке значений для поиска: {str(e)}")
-        
-        # Проверяем файл в соответствии с его типом
-        if file_type == "Word":
-            return check_word_file(file_path, file_name, enable_search, search_values)
-        elif file_type == "Excel":
-            return check_excel_file(file_path, file_name, enable_search, search_values)
-        else:
-            return {
-                'file_name': file_name,
-                'file_type': "Неизвестный",
-                'file_path': file_path,
-                'result': "Ошибка",
-                'comment': "Неподдерживаемый тип файла"
-            }
+        return check_file(file_path, file_name, self.run_plan, file_size, self.cancel_token)
     
     # Вспомогательные методы для отображения сообщений
     def show_error(self, title, message):
@@ -3,6 +3,8 @@
 import tkinter as tk
 from tkinter import ttk
 
+from app.core.check_runner import EXECUTION_AUTO, EXECUTION_PROCESSES, EXECUTION_THREADS, PROCESS_MODE_MIN_FILES
+
 class SettingsPageBuilder:
     """
     Класс для создания элементов на странице настроек
@@ -52,6 +54,12 @@ class SettingsPageBuilder:
         ttk.Checkbutton(add_options_frame, text="Пропускать файлы более 100 МБ", 
                         variable=self.app.skip_large_files).pack(anchor=tk.W)
         
+        ttk.Checkbutton(add_options_frame, text="Останавливаться на первой найденной проблеме", 
+                        variable=self.app.first_issue_only).pack(anchor=tk.W)
+        
+        ttk.Checkbutton(add_options_frame, text="Полная перепроверка (не использовать кэш результатов)", 
+                        variable=self.app.force_recheck).pack(anchor=tk.W)
+        
         threads_frame = ttk.Frame(add_options_frame)
         threads_frame.pack(anchor=tk.W, pady=2)
         
@@ -60,6 +68,33 @@ class SettingsPageBuilder:
         threads_spinbox = ttk.Spinbox(threads_frame, from_=1, to=32, width=5, 
                                     textvariable=self.app.max_threads)
         threads_spinbox.pack(side=tk.LEFT)
+        
+        mode_frame = ttk.Frame(add_options_frame)
+        mode_frame.pack(anchor=tk.W, pady=2)
+        
+        ttk.Label(mode_frame, text="Выполнение: ").pack(side=tk.LEFT)
+        
+        for text, value in (("Авто", EXECUTION_AUTO), ("Потоки", EXECUTION_THREADS), ("Процессы", EXECUTION_PROCESSES)):
+            ttk.Radiobutton(mode_frame, text=text, value=value,
+                            variable=self.app.execution_mode).pack(side=tk.LEFT, padx=(0, 5))
+        
+        limits_frame = ttk.Frame(add_options_frame)
+        limits_frame.pack(anchor=tk.W, pady=2)
+        
+        # Лимиты действуют в режиме процессов; 0 - без ограничения
+        ttk.Label(limits_frame, text="Лимит на файл: ").pack(side=tk.LEFT)
+        ttk.Spinbox(limits_frame, from_=0, to=3600, increment=30, width=5,
+                    textvariable=self.app.file_timeout).pack(side=tk.LEFT)
+        ttk.Label(limits_frame, text=" с, ").pack(side=tk.LEFT)
+        ttk.Spinbox(limits_frame, from_=0, to=65536, increment=256, width=6,
+                    textvariable=self.app.max_memory_mb).pack(side=tk.LEFT)
+        ttk.Label(limits_frame, text=" МБ").pack(side=tk.LEFT)
+        
+        limits_hint = ("Лимиты времени и памяти действуют при выполнении процессами (в режиме \"Авто\" - "
+                       f"от {PROCESS_MODE_MIN_FILES} файлов). При выполнении потоками лимит времени "
+                       "прерывает только проверку через Office, лимит памяти не действует.")
+        ttk.Label(add_options_frame, text=limits_hint,
+                 font=("", 8, "italic"), foreground="#666666").pack(anchor=tk.W, pady=2)
 
     def create_search_values_panel(self, parent_frame=None):
         """
@@ -77,7 +77,7 @@ class StatusPageBuilder:
         results_frame = ttk.Frame(parent_frame, padding="10")
         results_frame.pack(fill=tk.BOTH, expand=True)
         
-        columns = ("№", "Имя файла", "Тип файла", "Путь к файлу", "Результат", "Комментарий")
+        columns = ("№", "Имя файла", "Тип файла", "Путь к файлу", "Результат", "Комментарий", "Примечание")
         self.app.results_tree = ttk.Treeview(results_frame, columns=columns, show='headings')
         
         for col in columns:
@@ -89,6 +89,8 @@ class StatusPageBuilder:
         self.app.results_tree.column("Путь к файлу", width=200)
         self.app.results_tree.column("Результат", width=100, anchor=tk.CENTER)
         self.app.results_tree.column("Комментарий", width=300)
+        # Результат из кэша или от копии файла - примечание об источнике вердикта
+        self.app.results_tree.column("Примечание", width=200)
         
         scrollbar = ttk.Scrollbar(results_frame, orient=tk.VERTICAL, command=self.app.results_tree.yview)
         self.app.results_tree.configure(yscroll=scrollbar.set)
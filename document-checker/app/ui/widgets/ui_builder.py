@@ -73,7 +73,8 @@ class UIBuilder:
         if event.widget == self.app.root:
             if hasattr(self.app, 'results_tree'):
                 window_width = event.width
-                fixed_columns_width = 40 + 150 + 80 + 200 + 100
+                # Все столбцы, кроме комментария, включая примечание
+                fixed_columns_width = 40 + 150 + 80 + 200 + 100 + 200
                 scrollbar_width = 20
                 padding = 40
                 available_width = max(200, window_width - fixed_columns_width - scrollbar_width - padding)
@@ -4,6 +4,8 @@ import os
 import sys
 import json
 
+from app.core.result_cache import CACHE_FILE_NAME
+
 class ConfigManager:
     """
     Класс для управления настройками приложения.
@@ -20,6 +22,9 @@ class ConfigManager:
             self.app_dir = os.path.dirname(os.path.dirname(self.app_dir))
         
         self.settings_path = os.path.join(self.app_dir, "document_checker_settings.json")
+        
+        # Кэш результатов проверки хранится рядом с файлом настроек
+        self.cache_path = os.path.join(self.app_dir, CACHE_FILE_NAME)
     
     def save_settings(self):
         """
@@ -38,7 +43,12 @@ class ConfigManager:
                 "enable_value_search": self.app.enable_value_search.get(),
                 "search_values": self.app.search_values.get(),
                 "max_threads": self.app.max_threads.get(),
-                "skip_large_files": self.app.skip_large_files.get()
+                "execution_mode": self.app.execution_mode.get(),
+                "file_timeout": self.app.file_timeout.get(),
+                "max_memory_mb": self.app.max_memory_mb.get(),
+                "skip_large_files": self.app.skip_large_files.get(),
+                "first_issue_only": self.app.first_issue_only.get(),
+                "force_recheck": self.app.force_recheck.get()
             }
             
             with open(self.settings_path, 'w', encoding='utf-8') as f:
@@ -80,8 +90,18 @@ class ConfigManager:
                 self.app.selected_path.set(settings["last_selected_path"])
             if "max_threads" in settings:
                 self.app.max_threads.set(settings["max_threads"])
+            if "execution_mode" in settings:
+                self.app.execution_mode.set(settings["execution_mode"])
+            if "file_timeout" in settings:
+                self.app.file_timeout.set(settings["file_timeout"])
+            if "max_memory_mb" in settings:
+                self.app.max_memory_mb.set(settings["max_memory_mb"])
             if "skip_large_files" in settings:
                 self.app.skip_large_files.set(settings["skip_large_files"])
+            if "first_issue_only" in settings:
+                self.app.first_issue_only.set(settings["first_issue_only"])
+            if "force_recheck" in settings:
+                self.app.force_recheck.set(settings["force_recheck"])
             
             # Загружаем настройки поиска значений
             if "enable_value_search" in settings:
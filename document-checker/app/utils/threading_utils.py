@@ -3,7 +3,13 @@
 import os
 import concurrent.futures
 import threading
-from queue import Queue
+
+try:
+    import win32api
+    import win32con
+    import win32process
+except ImportError:
+    win32process = None
 
 def init_workers_pool(max_threads=None):
     """
@@ -22,4 +28,96 @@ def init_workers_pool(max_threads=None):
         max_threads = min(8, max(1, int(os.cpu_count() * 0.75)) if os.cpu_count() else 4)
         
     # Создаем и возвращаем пул потоков
-    return concurrent.futures.ThreadPoolExecutor(max_workers=max_threads)
\ No newline at end of file
+    return concurrent.futures.ThreadPoolExecutor(max_workers=max_threads)
+
+class CheckCancelled(BaseException):
+    """
+    Проверка файла отменена пользователем.
+
+    Наследуется от BaseException (как asyncio.CancelledError), чтобы общие
+    обработчики except Exception в модулях проверки не превращали отмену
+    в результат "Ошибка" и не переходили к проверке через Office.
+    """
+
+class CancellationToken:
+    """
+    Признак отмены проверки, общий для всех файлов запуска.
+
+    Модули проверки опрашивают его между порциями данных, строками и абзацами
+    (check_cancelled), поэтому остановка не ждет окончания разбора большого файла.
+    """
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        """Отменяет проверку"""
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        """Запрошена ли отмена"""
+        return self._event.is_set()
+
+def check_cancelled(cancel_token):
+    """
+    Прерывает проверку, если она отменена.
+    
+    Args:
+        cancel_token (CancellationToken): Признак отмены или None
+    
+    Raises:
+        CheckCancelled: Если отмена запрошена
+    """
+    if cancel_token is not None and cancel_token.cancelled:
+        raise CheckCancelled()
+
+# Обработчик сообщений об этапе проверки текущего файла (задается в процессе-исполнителе)
+_phase_reporter = None
+
+def set_phase_reporter(reporter):
+    """
+    Задает обработчик сообщений об этапе проверки.
+    
+    Args:
+        reporter (callable): Функция от названия этапа или None
+    """
+    global _phase_reporter
+    _phase_reporter = reporter
+
+def report_phase(phase):
+    """
+    Сообщает этап проверки текущего файла. Этап записывается в результат,
+    если проверка файла прервана по времени или памяти.
+    
+    Args:
+        phase (str): Название этапа
+    """
+    if _phase_reporter is not None:
+        _phase_reporter(phase)
+
+def get_process_memory(pid):
+    """
+    Возвращает объем памяти, занятой процессом (рабочий набор).
+    
+    Args:
+        pid (int): Идентификатор процесса
+    
+    Returns:
+        int: Объем памяти в байтах или None, если его не удалось определить
+    """
+    if win32process is not None:
+        try:
+            handle = win32api.OpenProcess(win32con.PROCESS_QUERY_INFORMATION | win32con.PROCESS_VM_READ, False, pid)
+            try:
+                return win32process.GetProcessMemoryInfo(handle)['WorkingSetSize']
+            finally:
+                win32api.CloseHandle(handle)
+        except Exception:
+            return None
+    
+    # Вне Windows - по данным /proc (второе поле statm - резидентные страницы)
+    try:
+        with open(f"/proc/{pid}/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
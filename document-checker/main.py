@@ -1,5 +1,6 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
+import multiprocessing
 import os
 import sys
 import tkinter as tk
@@ -69,4 +70,6 @@ def main():
     root.mainloop()
 
 if __name__ == "__main__":
+    # Процессы-исполнители в собранном приложении (PyInstaller) запускаются тем же исполняемым файлом
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
@@ -0,0 +1 @@
+# Тесты модулей проверки документов
\ No newline at end of file
@@ -0,0 +1,352 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Построение небольших документов для тестов: составной файл (CFB), документ
+Word 97-2003, книга Excel 97-2003 (BIFF8) и пакеты документа Word (DOCX) и книги
+Excel (XLSX). Файлы собираются по спецификациям [MS-CFB], [MS-DOC], [MS-XLS] и
+ECMA-376 ровно в том объеме, который читают модули разбора.
+"""
+import io
+import struct
+from zipfile import ZIP_DEFLATED, ZipFile
+
+from app.core.cfb_reader import CFB_SIGNATURE, END_OF_CHAIN, FREE_SECTOR, NO_STREAM
+
+SECTOR_SIZE = 512
+MINI_SECTOR_SIZE = 64
+MINI_STREAM_CUTOFF = 4096
+
+# Отметка сектора FAT в самой таблице FAT
+FAT_SECTOR_MARK = 0xFFFFFFFD
+
+def _pad(data, size):
+    """Дополняет данные нулями до кратного size размера"""
+    return data + b'\x00' * (-len(data) % size)
+
+def _directory_entry(name, entry_type, start_sector=END_OF_CHAIN, size=0, child=NO_STREAM, right=NO_STREAM):
+    encoded = (name + '\x00').encode('utf-16-le')
+    entry = bytearray(128)
+    entry[:len(encoded)] = encoded
+    struct.pack_into('<HBB', entry, 64, len(encoded), entry_type, 1)
+    struct.pack_into('<III', entry, 68, NO_STREAM, right, child)
+    struct.pack_into('<IQ', entry, 116, start_sector, size)
+    return bytes(entry)
+
+def build_compound_file(streams):
+    """
+    Собирает составной файл версии 3 (сектор 512 байт) с потоками в корневом хранилище.
+
+    Потоки меньше 4096 байт размещаются в мини-потоке (MiniFAT), остальные - в обычных
+    секторах (FAT), как это делают приложения Office.
+
+    Args:
+        streams (dict): Имя потока -> содержимое
+
+    Returns:
+        bytes: Содержимое файла
+    """
+    names = list(streams)
+    mini_stream = b''
+    mini_fat = []
+    big_streams = []
+    starts = {}
+    for name in names:
+        data = streams[name]
+        if len(data) < MINI_STREAM_CUTOFF:
+            first = len(mini_stream) // MINI_SECTOR_SIZE
+            count = max(1, -(-len(data) // MINI_SECTOR_SIZE))
+            mini_fat.extend(list(range(first + 1, first + count)) + [END_OF_CHAIN])
+            mini_stream += _pad(data or b'\x00', MINI_SECTOR_SIZE)
+            starts[name] = first
+        else:
+            big_streams.append(name)
+
+    # Элементы каталога: корень, затем потоки - цепочкой правых соседей
+    directory = [None] + [(name, len(streams[name])) for name in names]
+    directory_data = _pad(b'\x00' * 128 * len(directory), SECTOR_SIZE)
+    mini_fat_data = _pad(struct.pack('<%dI' % len(mini_fat), *mini_fat), SECTOR_SIZE) if mini_fat else b''
+    mini_stream_data = _pad(mini_stream, SECTOR_SIZE)
+
+    # Области файла после секторов FAT: каталог, MiniFAT, мини-поток, крупные потоки
+    regions = [('directory', directory_data), ('minifat', mini_fat_data), ('ministream', mini_stream_data)]
+    regions += [(name, _pad(streams[name], SECTOR_SIZE)) for name in big_streams]
+    other_sectors = sum(len(data) // SECTOR_SIZE for _, data in regions)
+
+    fat_sectors = 1
+    while fat_sectors * (SECTOR_SIZE // 4) < fat_sectors + other_sectors:
+        fat_sectors += 1
+
+    fat = [FAT_SECTOR_MARK] * fat_sectors
+    region_starts = {}
+    for region, data in regions:
+        count = len(data) // SECTOR_SIZE
+        region_starts[region] = len(fat) if count else END_OF_CHAIN
+        fat.extend(list(range(len(fat) + 1, len(fat) + count)) + [END_OF_CHAIN] if count else [])
+    fat += [FREE_SECTOR] * (fat_sectors * (SECTOR_SIZE // 4) - len(fat))
+
+    entries = []
+    for index, item in enumerate(directory):
+        if item is None:
+            entries.append(_directory_entry('Root Entry', 5, region_starts['ministream'], len(mini_stream),
+                                            child=1 if names else NO_STREAM))
+            continue
+        name, size = item
+        start = region_starts[name] if name in big_streams else starts[name]
+        right = index + 1 if index + 1 < len(directory) else NO_STREAM
+        entries.append(_directory_entry(name, 2, start, size, right=right))
+    regions[0] = ('directory', _pad(b''.join(entries), SECTOR_SIZE))
+
+    header = bytearray(SECTOR_SIZE)
+    header[:8] = CFB_SIGNATURE
+    struct.pack_into('<HHHHH', header, 0x18, 0x3E, 3, 0xFFFE, 9, 6)
+    struct.pack_into('<II', header, 0x2C, fat_sectors, region_starts['directory'])
+    struct.pack_into('<IIIII', header, 0x38, MINI_STREAM_CUTOFF, region_starts['minifat'],
+                     len(mini_fat_data) // SECTOR_SIZE, END_OF_CHAIN, 0)
+    difat = list(range(fat_sectors)) + [FREE_SECTOR] * (109 - fat_sectors)
+    struct.pack_into('<109I', header, 0x4C, *difat)
+
+    return bytes(header) + struct.pack('<%dI' % len(fat), *fat) + b''.join(data for _, data in regions)
+
+# Документ Word 97-2003
+
+# Размещение частей в потоке WordDocument
+DOC_TEXT_OFFSET = 0x400
+DOC_CHPX_PAGE = 3
+
+def build_word_document(pieces, highlight_ico=None, comment_count=0, encrypted=False):
+    """
+    Собирает документ Word 97 (.doc) с основным текстом из нескольких фрагментов.
+
+    Args:
+        pieces (list): Пары (текст, сжатый ли фрагмент): сжатые хранятся в cp1252,
+                       остальные - в UTF-16
+        highlight_ico (int, optional): Цвет выделения (Ico) всего текста
+        comment_count (int): Количество примечаний (по размеру PlcfandRef)
+        encrypted (bool): Установить признак шифрования в FIB
+
+    Returns:
+        bytes: Содержимое составного файла
+    """
+    # FibBase, затем rgW (14 слов), rgLw (22 двойных слова) и rgFcLcb97 (93 пары)
+    ccp_text = sum(len(text) for text, _ in pieces)
+    flags = 0x0200 | (0x0100 if encrypted else 0)
+    fib = bytearray(32)
+    struct.pack_into('<HH', fib, 0, 0xA5EC, 0x00C1)
+    struct.pack_into('<H', fib, 0x0A, flags)
+    rg_lw = [0] * 22
+    rg_lw[3] = ccp_text
+    fc_lcb = [(0, 0)] * 93
+
+    # Текст фрагментов и таблица фрагментов (Clx) в потоке 1Table
+    text_data = b''
+    cps = [0]
+    pcds = b''
+    for text, compressed in pieces:
+        offset = DOC_TEXT_OFFSET + len(text_data)
+        if compressed:
+            text_data += text.encode('cp1252')
+            fc = (offset * 2) | 0x40000000
+        else:
+            text_data += text.encode('utf-16-le')
+            fc = offset
+        cps.append(cps[-1] + len(text))
+        pcds += struct.pack('<HIH', 0, fc, 0)
+    plc_pcd = struct.pack('<%dI' % len(cps), *cps) + pcds
+    clx = b'\x02' + struct.pack('<I', len(plc_pcd)) + plc_pcd
+    table = clx
+    fc_lcb[33] = (0, len(clx))
+
+    if comment_count:
+        # Содержимое PlcfandRef не читается, количество примечаний определяется по его размеру
+        fc_lcb[4] = (0, 4 * (comment_count + 1) + 30 * comment_count)
+
+    # Страница CHPX (FKP) с одним свойством выделения на весь текст
+    page = bytearray(512)
+    if highlight_ico is not None:
+        text_end = DOC_TEXT_OFFSET + len(text_data)
+        struct.pack_into('<II', page, 0, DOC_TEXT_OFFSET, text_end)
+        page[8] = 0x100 // 2
+        page[0x100:0x104] = bytes([3]) + struct.pack('<H', 0x2A0C) + bytes([highlight_ico])
+        page[511] = 1
+        plc_bte = struct.pack('<III', DOC_TEXT_OFFSET, text_end, DOC_CHPX_PAGE)
+        fc_lcb[12] = (len(table), len(plc_bte))
+        table += plc_bte
+
+    word = bytes(fib) + struct.pack('<H', 14) + b'\x00' * 28
+    word += struct.pack('<H', 22) + struct.pack('<22I', *rg_lw)
+    word += struct.pack('<H', 93) + b''.join(struct.pack('<II', fc, lcb) for fc, lcb in fc_lcb)
+    word = word.ljust(DOC_TEXT_OFFSET, b'\x00') + text_data
+    word = word.ljust(DOC_CHPX_PAGE * 512, b'\x00') + bytes(page)
+
+    return build_compound_file({'WordDocument': word, '1Table': table})
+
+# Книга Excel 97-2003 (BIFF8)
+
+def biff_record(record_id, body=b''):
+    """Запись BIFF: идентификатор, длина и данные"""
+    return struct.pack('<HH', record_id, len(body)) + body
+
+def _bof(substream):
+    return biff_record(0x0809, struct.pack('<HH', 0x0600, substream) + b'\x00' * 12)
+
+def _xf(fill_icv=None, format_id=0):
+    """Запись XF: формат числа и сплошная заливка цветом из палитры или без заливки"""
+    body = bytearray(20)
+    struct.pack_into('<H', body, 2, format_id)
+    if fill_icv is not None:
+        struct.pack_into('<I', body, 14, 1 << 26)
+        struct.pack_into('<H', body, 18, fill_icv)
+    return biff_record(0x00E0, bytes(body))
+
+# Стили книги BIFF8: без заливки, желтая заливка, встроенный формат даты и собственный формат даты
+XLS_XF_PLAIN = 0
+XLS_XF_YELLOW = 1
+XLS_XF_DATE = 2
+XLS_XF_CUSTOM_DATE = 3
+
+# Собственный формат даты книги BIFF8
+XLS_CUSTOM_DATE_FORMAT = (164, 'dd.mm.yyyy hh:mm')
+
+def build_workbook(sheet_name, sst_fragments, unique_count, cells, yellow_xf=False, notes=0, encrypted=False,
+                   numbers=(), date1904=False):
+    """
+    Собирает книгу BIFF8 с одним листом.
+
+    Args:
+        sheet_name (str): Имя листа
+        sst_fragments (list): Данные SST после счетчиков: первый элемент - в самой
+                              записи SST, остальные - в записях CONTINUE
+        unique_count (int): Количество строк в SST
+        cells (list): Индексы общих строк для ячеек LABELSST первой строки листа
+        yellow_xf (bool): Назначить ячейкам стиль с желтой заливкой
+        notes (int): Количество примечаний листа (записи NOTE)
+        encrypted (bool): Добавить запись FILEPASS
+        numbers (list): Пары (число, стиль XLS_XF_*) для ячеек второй строки листа:
+                        целые числа записываются в RK, остальные - в NUMBER
+        date1904 (bool): Система дат 1904 (запись DATEMODE)
+
+    Returns:
+        bytes: Содержимое составного файла
+    """
+    # Стиль 1 - желтая заливка (индекс 13 палитры по умолчанию), стили 2 и 3 - форматы даты
+    format_id, format_code = XLS_CUSTOM_DATE_FORMAT
+    formats = biff_record(0x041E, struct.pack('<HHB', format_id, len(format_code), 0) + format_code.encode('latin-1'))
+    xfs = _xf() + _xf(13) + _xf(format_id=14) + _xf(format_id=format_id)
+    sst = biff_record(0x00FC, struct.pack('<II', unique_count, unique_count) + sst_fragments[0])
+    sst += b''.join(biff_record(0x003C, fragment) for fragment in sst_fragments[1:])
+    name = sheet_name.encode('utf-16-le')
+
+    def globals_stream(sheet_offset):
+        stream = _bof(0x0005)
+        if encrypted:
+            stream += biff_record(0x002F, b'\x01\x00' + b'\x00' * 52)
+        stream += biff_record(0x0022, struct.pack('<H', 1 if date1904 else 0))
+        stream += formats + xfs
+        stream += biff_record(0x0085, struct.pack('<IBBBB', sheet_offset, 0, 0, len(sheet_name), 1) + name)
+        return stream + sst + biff_record(0x000A)
+
+    xf_index = 1 if yellow_xf else 0
+    sheet = _bof(0x0010)
+    for column, string_index in enumerate(cells):
+        sheet += biff_record(0x00FD, struct.pack('<HHHI', 0, column, xf_index, string_index))
+    for column, (number, xf) in enumerate(numbers):
+        if float(number).is_integer():
+            sheet += biff_record(0x027E, struct.pack('<HHHI', 1, column, xf, (int(number) << 2) | 0x02))
+        else:
+            sheet += biff_record(0x0203, struct.pack('<HHHd', 1, column, xf, number))
+    for note in range(notes):
+        sheet += biff_record(0x001C, struct.pack('<HHHH', note, 0, 0, note + 1))
+    sheet += biff_record(0x000A)
+
+    workbook = globals_stream(len(globals_stream(0))) + sheet
+    return build_compound_file({'Workbook': workbook})
+
+def sst_header(count, high_byte):
+    """Заголовок строки SST без форматирования: длина в символах и флаги"""
+    return struct.pack('<HB', count, 1 if high_byte else 0)
+
+def sst_string(text, high_byte):
+    """Строка SST без форматирования целиком в одной записи"""
+    return sst_header(len(text), high_byte) + text.encode('utf-16-le' if high_byte else 'latin-1')
+
+# Книга Excel (XLSX)
+
+SPREADSHEET_NS = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+RELATIONSHIPS_NS = 'http://schemas.openxmlformats.org/package/2006/relationships'
+OFFICE_REL_NS = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+
+def _zip_package(parts):
+    """Упаковывает части в ZIP-архив в памяти"""
+    buffer = io.BytesIO()
+    with ZipFile(buffer, 'w', ZIP_DEFLATED) as package:
+        for name, content in parts.items():
+            package.writestr(name, content)
+    return buffer.getvalue()
+
+def build_xlsx(sheets, shared_strings=None, styles=None, workbook_pr='', extra_parts=None,
+               shared_strings_part='xl/sharedStrings.xml'):
+    """
+    Собирает пакет книги Excel в памяти.
+
+    Args:
+        sheets (list): Пары (имя листа, XML содержимого worksheet без корневого элемента)
+        shared_strings (list, optional): Строки таблицы общих строк
+        styles (str, optional): XML содержимого styleSheet без корневого элемента
+        workbook_pr (str): Атрибуты элемента workbookPr (например, 'date1904="1"')
+        extra_parts (dict, optional): Дополнительные части пакета: имя -> содержимое
+        shared_strings_part (str): Имя части с таблицей общих строк
+
+    Returns:
+        bytes: Содержимое пакета
+    """
+    rels = []
+    sheet_entries = []
+    parts = {}
+    for index, (name, content) in enumerate(sheets, 1):
+        rels.append((f'rId{index}', 'worksheet', f'worksheets/sheet{index}.xml'))
+        sheet_entries.append(f'<sheet name="{name}" sheetId="{index}" r:id="rId{index}"/>')
+        parts[f'xl/worksheets/sheet{index}.xml'] = f'<worksheet xmlns="{SPREADSHEET_NS}">{content}</worksheet>'
+
+    if shared_strings is not None:
+        rels.append(('rIdStrings', 'sharedStrings', shared_strings_part[len('xl/'):]))
+        items = ''.join(f'<si><t>{text}</t></si>' for text in shared_strings)
+        parts[shared_strings_part] = f'<sst xmlns="{SPREADSHEET_NS}">{items}</sst>'
+
+    if styles is not None:
+        rels.append(('rIdStyles', 'styles', 'styles.xml'))
+        parts['xl/styles.xml'] = f'<styleSheet xmlns="{SPREADSHEET_NS}">{styles}</styleSheet>'
+
+    workbook_properties = f'<workbookPr {workbook_pr}/>' if workbook_pr else ''
+    parts['xl/workbook.xml'] = (f'<workbook xmlns="{SPREADSHEET_NS}" xmlns:r="{OFFICE_REL_NS}">'
+                                f'{workbook_properties}<sheets>{"".join(sheet_entries)}</sheets></workbook>')
+    parts['xl/_rels/workbook.xml.rels'] = f'<Relationships xmlns="{RELATIONSHIPS_NS}">' + ''.join(
+        f'<Relationship Id="{rel_id}" Type="{OFFICE_REL_NS}/{rel_type}" Target="{target}"/>'
+        for rel_id, rel_type, target in rels) + '</Relationships>'
+    parts.update(extra_parts or {})
+    return _zip_package(parts)
+
+def open_package(data):
+    """Открывает собранный в памяти пакет как ZipFile"""
+    return ZipFile(io.BytesIO(data))
+
+# Документ Word (DOCX)
+
+WORD_NS = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+
+def build_docx(body, styles=None, extra_parts=None):
+    """
+    Собирает пакет документа Word в памяти.
+
+    Args:
+        body (str): XML содержимого w:body с префиксом w
+        styles (str, optional): XML содержимого w:styles с префиксом w
+        extra_parts (dict, optional): Дополнительные части пакета: имя -> содержимое
+
+    Returns:
+        bytes: Содержимое пакета
+    """
+    parts = {'word/document.xml': f'<w:document xmlns:w="{WORD_NS}"><w:body>{body}</w:body></w:document>'}
+    if styles is not None:
+        parts['word/styles.xml'] = f'<w:styles xmlns:w="{WORD_NS}">{styles}</w:styles>'
+    parts.update(extra_parts or {})
+    return _zip_package(parts)
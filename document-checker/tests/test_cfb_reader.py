@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import os
+import struct
+import tempfile
+import unittest
+
+from app.core.cfb_reader import CompoundFile
+from tests.fixtures import build_compound_file
+
+class CompoundFileTest(unittest.TestCase):
+    """Чтение потоков составного файла"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, data, name='test.bin'):
+        path = os.path.join(self.directory.name, name)
+        with open(path, 'wb') as file:
+            file.write(data)
+        return path
+
+    def test_reads_mini_and_regular_streams(self):
+        # Поток меньше 4096 байт хранится в мини-потоке (несколько мини-секторов), больший - в секторах FAT
+        small = bytes(range(256)) * 3
+        large = b''.join(struct.pack('<I', index) for index in range(3000))
+        path = self.write(build_compound_file({'Small': small, 'Large': large, 'Empty': b''}))
+
+        with CompoundFile(path) as compound_file:
+            self.assertEqual(compound_file.read_stream('Small'), small)
+            self.assertEqual(compound_file.read_stream('Large'), large)
+            self.assertEqual(compound_file.read_stream('Empty'), b'')
+
+    def test_finds_streams_case_insensitively(self):
+        path = self.write(build_compound_file({'WordDocument': b'data'}))
+
+        with CompoundFile(path) as compound_file:
+            self.assertTrue(compound_file.has_stream('worddocument'))
+            self.assertFalse(compound_file.has_stream('1Table'))
+            with self.assertRaises(KeyError):
+                compound_file.read_stream('1Table')
+
+    def test_rejects_non_compound_files(self):
+        for name, data in (('empty.doc', b''), ('zip.doc', b'PK\x03\x04' + b'\x00' * 1020)):
+            with self.subTest(name=name):
+                with self.assertRaises(ValueError):
+                    CompoundFile(self.write(data, name))
+
+    def test_rejects_cyclic_sector_chain(self):
+        data = bytearray(build_compound_file({'Large': b'\x01' * 5000}))
+        # Первая запись FAT после отметки самого сектора FAT - сектор каталога; замыкаем его на себя
+        struct.pack_into('<I', data, 512 + 4, 1)
+        with self.assertRaises(ValueError):
+            CompoundFile(self.write(bytes(data)))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import unittest
+import xml.etree.ElementTree as ET
+
+from app.core.colors import (BLUE, GREEN, RED, YELLOW, WorkbookColors, classify_com_color, classify_hex,
+                             com_colors_of_class, parse_hex_color, rgb_to_com_color)
+
+class ColorClassificationTest(unittest.TestCase):
+    """Классификация цветов по таблице правил HSV"""
+
+    def test_classes(self):
+        cases = {
+            'FFFF00': YELLOW, 'FFC000': YELLOW, 'FFFF99': YELLOW,
+            'FF0000': RED, 'C00000': RED,
+            '00B050': GREEN, '92D050': GREEN,
+            '0070C0': BLUE, '0000FF': BLUE,
+            'FFFFFF': None, '000000': None, '808080': None, 'FFA500': None
+        }
+        for value, expected in cases.items():
+            with self.subTest(value=value):
+                self.assertEqual(classify_hex(value), expected)
+
+    def test_pale_yellow_is_yellow(self):
+        # Светло-желтые вкладки и заливки, как и прежде, считаются желтыми
+        self.assertEqual(classify_hex('FFFFCC'), YELLOW)
+        # Почти белый цвет не отслеживается
+        self.assertIsNone(classify_hex('FFFFF0'))
+
+    def test_hex_parsing(self):
+        self.assertEqual(parse_hex_color('FFFFFF00'), (255, 255, 0))
+        self.assertEqual(parse_hex_color('00ff00'), (0, 255, 0))
+        self.assertIsNone(parse_hex_color('auto'))
+        self.assertIsNone(parse_hex_color(None))
+
+    def test_com_colors(self):
+        # ColorIndex 6 - желтый, 3 - красный; Color - число BGR
+        self.assertEqual(classify_com_color(color_index=6), YELLOW)
+        self.assertEqual(classify_com_color(color_index=3), RED)
+        self.assertEqual(classify_com_color(color=rgb_to_com_color((0, 112, 192))), BLUE)
+        self.assertIn(rgb_to_com_color((255, 255, 0)), com_colors_of_class(YELLOW))
+
+class WorkbookColorsTest(unittest.TestCase):
+    """Разрешение цветов книги Excel"""
+
+    def test_theme_indexed_and_tint(self):
+        colors = WorkbookColors(theme_colors=['FFFFFF', '000000', 'E7E6E6', '44546A', '4472C4', 'ED7D31',
+                                              'A5A5A5', 'FFC000'])
+        self.assertEqual(colors.classify(ET.fromstring('<c theme="7"/>')), YELLOW)
+        self.assertEqual(colors.classify(ET.fromstring('<c theme="4"/>')), BLUE)
+        # Сильно осветленный синий темы перестает быть синим
+        self.assertIsNone(colors.classify(ET.fromstring('<c theme="4" tint="0.8"/>')))
+        self.assertEqual(colors.classify(ET.fromstring('<c indexed="10"/>')), RED)
+        self.assertIsNone(colors.classify(ET.fromstring('<c auto="1"/>')))
+
+    def test_palette_override(self):
+        colors = WorkbookColors()
+        self.assertEqual(colors.classify(ET.fromstring('<c indexed="5"/>')), YELLOW)
+        colors.set_indexed_colors(['000000'] * 5 + ['00B050'])
+        self.assertEqual(colors.classify(ET.fromstring('<c indexed="5"/>')), GREEN)
+
+if __name__ == '__main__':
+    unittest.main()
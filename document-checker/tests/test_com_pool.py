@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import threading
+import time
+import unittest
+
+from app.core.com_pool import (FakeOfficeBackend, OfficeBackend, OfficeInstancePool, Win32ExcelBackend,
+                               Win32OfficeBackend, Win32WordBackend, WORD_APPLICATION)
+from app.utils.threading_utils import CancellationToken, CheckCancelled
+
+class OfficeInstancePoolTest(unittest.TestCase):
+    """Пул экземпляров Office с тестовым бэкендом"""
+
+    def setUp(self):
+        self.pools = []
+        # Обработчики, имитирующие зависший документ, ждут этого события
+        self.release = threading.Event()
+
+    def tearDown(self):
+        self.release.set()
+        for pool in self.pools:
+            pool.shutdown()
+
+    def make_pool(self, open_delays=(), **kwargs):
+        """Пул, экземпляры которого открывают документы с заданными задержками (далее - без задержки)"""
+        delays = list(open_delays)
+        def factory():
+            return FakeOfficeBackend(WORD_APPLICATION, open_delay=delays.pop(0) if delays else 0.0)
+        pool = OfficeInstancePool(WORD_APPLICATION, factory, **kwargs)
+        self.pools.append(pool)
+        return pool
+
+    def hang(self, document):
+        self.release.wait(10)
+        return document
+
+    def test_instance_is_reused_and_recycled(self):
+        pool = self.make_pool(max_documents=2)
+        results = [pool.process(f"doc{index}.doc", lambda document: document.upper()) for index in range(5)]
+
+        self.assertEqual(results, [f"DOC{index}.DOC" for index in range(5)])
+        # Один экземпляр: приложение перезапускается после каждых двух документов
+        self.assertEqual(pool.documents_processed, 5)
+        self.assertEqual(pool.instances_started, 3)
+
+    def test_open_timeout_discards_instance(self):
+        pool = self.make_pool(open_delays=[10], open_timeout=0.2)
+        with self.assertRaises(TimeoutError):
+            pool.process("hung.doc", lambda document: document)
+
+        # Зависший экземпляр исключен, документ открывается новым
+        self.assertEqual(pool.process("next.doc", lambda document: document), "next.doc")
+        self.assertEqual(pool.instances_started, 1)
+        self.assertEqual(pool.documents_processed, 1)
+
+    def test_handler_error_restarts_application(self):
+        pool = self.make_pool()
+        def fail(document):
+            raise ValueError("битый документ")
+        with self.assertRaises(ValueError):
+            pool.process("broken.doc", fail)
+
+        self.assertEqual(pool.process("next.doc", lambda document: document), "next.doc")
+        # Экземпляр тот же, приложение запущено заново
+        self.assertEqual(pool.instances_started, 2)
+
+    def test_job_timeout_discards_instance(self):
+        pool = self.make_pool(job_timeout=0.2)
+        with self.assertRaises(TimeoutError):
+            pool.process("dialog.doc", self.hang)
+
+        self.assertEqual(pool.process("next.doc", lambda document: document), "next.doc")
+        self.assertEqual(pool.instances_started, 1)
+
+    def test_cancel_interrupts_waiting_document(self):
+        pool = self.make_pool()
+        cancel_token = CancellationToken()
+        threading.Timer(0.1, cancel_token.cancel).start()
+
+        started = time.monotonic()
+        with self.assertRaises(CheckCancelled):
+            pool.process("long.doc", self.hang, cancel_token)
+        self.assertLess(time.monotonic() - started, 1)
+
+        # После отмены пул остается рабочим
+        self.assertEqual(pool.process("next.doc", lambda document: document), "next.doc")
+
+    def test_cooperative_cancel_keeps_application(self):
+        pool = self.make_pool()
+        def cancelled(document):
+            raise CheckCancelled()
+        with self.assertRaises(CheckCancelled):
+            pool.process("cancelled.doc", cancelled)
+
+        self.assertEqual(pool.process("next.doc", lambda document: document), "next.doc")
+        # Отмена обработчиком не считается сбоем - приложение не перезапускается
+        self.assertEqual(pool.instances_started, 1)
+
+class OfficeBackendInterfaceTest(unittest.TestCase):
+    """Интерфейс бэкенда приложения Office"""
+
+    def test_incomplete_backend_cannot_be_created(self):
+        class NoTerminateBackend(OfficeBackend):
+            def start(self):
+                pass
+            def open_document(self, file_path):
+                return file_path
+            def close_document(self, document):
+                pass
+            def is_alive(self):
+                return True
+            def quit(self):
+                pass
+
+        with self.assertRaises(TypeError):
+            NoTerminateBackend()
+        # Общая часть win32com не открывает документы сама
+        with self.assertRaises(TypeError):
+            Win32OfficeBackend()
+
+    def test_complete_backends_can_be_created(self):
+        for backend_class in (Win32WordBackend, Win32ExcelBackend):
+            self.assertIsInstance(backend_class(), OfficeBackend)
+        self.assertIsInstance(FakeOfficeBackend(WORD_APPLICATION), OfficeBackend)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from app.core import dedup
+from app.core.dedup import DuplicateDetector, make_duplicate_result, result_verdict
+from app.core.file_utils import FoundFile
+
+class DuplicateDetectorTest(unittest.TestCase):
+    """Поиск копий по размеру, быстрому и полному хэшу"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.detector = DuplicateDetector()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def found(self, name, content):
+        path = os.path.join(self.directory.name, name)
+        with open(path, 'wb') as file:
+            file.write(content)
+        return FoundFile(path, size=len(content))
+
+    def test_copies_point_to_first_file(self):
+        original = self.found('a.docx', b'PK' + b'1' * 100)
+        self.assertIsNone(self.detector.find_original(original))
+        self.assertEqual(self.detector.find_original(self.found('b.docx', b'PK' + b'1' * 100)), original.path)
+        self.assertEqual(self.detector.find_original(self.found('c.docx', b'PK' + b'1' * 100)), original.path)
+
+    def test_same_size_different_content(self):
+        self.assertIsNone(self.detector.find_original(self.found('a.docx', b'1' * 100)))
+        self.assertIsNone(self.detector.find_original(self.found('b.docx', b'2' * 100)))
+
+    def test_unique_size_is_not_read(self):
+        with mock.patch.object(dedup, 'partial_hash') as partial_hash:
+            self.assertIsNone(self.detector.find_original(self.found('a.docx', b'1' * 10)))
+            self.assertIsNone(self.detector.find_original(self.found('b.docx', b'1' * 20)))
+        partial_hash.assert_not_called()
+
+    def test_unknown_size(self):
+        self.assertIsNone(self.detector.find_original(FoundFile(os.path.join(self.directory.name, 'x.docx'))))
+
+class DuplicateResultTest(unittest.TestCase):
+    """Передача вердикта исходного файла копии"""
+
+    def test_duplicate_result(self):
+        verdict = result_verdict({'file_name': 'a.docx', 'file_type': "Word", 'file_path': '/docs/a.docx',
+                                  'result': "Не пройден", 'comment': "Найдено: комментарии"})
+        result = make_duplicate_result(verdict, '/copies/b.docx', '/docs/a.docx')
+        self.assertEqual(result['file_name'], 'b.docx')
+        self.assertEqual(result['file_path'], '/copies/b.docx')
+        self.assertEqual((result['file_type'], result['result'], result['comment']), verdict)
+        self.assertEqual(result['note'], "Дубликат файла: /docs/a.docx")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import os
+import tempfile
+import unittest
+
+from app.core.cfb_reader import CompoundFile
+from app.core.com_pool import ComFallbackDeferred, defer_com_fallback
+from app.core.doc_reader import WordBinaryDocument
+from app.core.word_checker import check_word_file
+from tests.fixtures import build_word_document
+
+class WordBinaryDocumentTest(unittest.TestCase):
+    """Разбор документа Word 97-2003"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, data, name='test.doc'):
+        path = os.path.join(self.directory.name, name)
+        with open(path, 'wb') as file:
+            file.write(data)
+        return path
+
+    def read(self, data):
+        with CompoundFile(self.write(data)) as compound_file:
+            return WordBinaryDocument(compound_file)
+
+    def test_reads_compressed_and_unicode_pieces(self):
+        document = self.read(build_word_document([
+            ("Hello \x13 HYPERLINK \"http://example.com\" \x14link\x15 world\r", True),
+            ("Привет, 2024\rконец", False)
+        ]))
+
+        # Код поля исключен, абзацы собраны через границу фрагментов
+        self.assertEqual(list(document.iter_paragraphs()), ["Hello link world", "Привет, 2024", "конец"])
+        self.assertEqual(document.comment_count, 0)
+        self.assertEqual(document.highlight_colors(), set())
+
+    def test_paragraph_continues_across_pieces(self):
+        document = self.read(build_word_document([("начало ", False), ("text\r", True)]))
+        self.assertEqual(list(document.iter_paragraphs()), ["начало text"])
+
+    def test_reads_highlight_and_comments(self):
+        document = self.read(build_word_document([("text\r", True)], highlight_ico=7, comment_count=2))
+        self.assertEqual(document.highlight_colors(), {'yellow'})
+        self.assertEqual(document.comment_count, 2)
+
+    def test_rejects_encrypted_document(self):
+        with self.assertRaisesRegex(ValueError, "зашифрован"):
+            self.read(build_word_document([("text\r", True)], encrypted=True))
+
+    def test_checker_reports_issues_without_office(self):
+        path = self.write(build_word_document([("Секретно 2024\r", False)], highlight_ico=7, comment_count=1))
+        result = check_word_file(path, "test.doc", True, ["2024"])
+
+        self.assertEqual(result['result'], "Не пройден")
+        for issue in ("комментарии", "найдены заданные значения: 2024"):
+            self.assertIn(issue, result['comment'])
+
+    def test_checker_defers_encrypted_document_to_office(self):
+        path = self.write(build_word_document([("text\r", True)], encrypted=True))
+        defer_com_fallback(True, current_thread=True)
+        try:
+            with self.assertRaises(ComFallbackDeferred):
+                check_word_file(path, "test.doc")
+        finally:
+            defer_com_fallback(False, current_thread=True)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import io
+import unittest
+
+from app.core.docx_stream import WordScanState, iter_word_part
+from app.core.word_styles import parse_word_styles
+
+WORD_NS = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+
+def document_xml(body):
+    return io.BytesIO(f'<w:document xmlns:w="{WORD_NS}"><w:body>{body}</w:body></w:document>'.encode('utf-8'))
+
+def styles_xml(styles):
+    return io.BytesIO(f'<w:styles xmlns:w="{WORD_NS}">{styles}</w:styles>'.encode('utf-8'))
+
+class WordPartScanTest(unittest.TestCase):
+    """Потоковое сканирование частей документа Word"""
+
+    def scan(self, body, style_colors=None):
+        state = WordScanState(style_colors)
+        paragraphs = list(iter_word_part(document_xml(body), state))
+        return paragraphs, state
+
+    def test_paragraph_text_joins_runs_and_skips_field_codes(self):
+        body = ('<w:p><w:r><w:t>сек</w:t></w:r><w:r><w:t>рет</w:t></w:r></w:p>'
+                '<w:p><w:r><w:fldChar w:fldCharType="begin"/></w:r><w:r><w:instrText>PAGE</w:instrText></w:r>'
+                '<w:r><w:t>код</w:t></w:r><w:r><w:fldChar w:fldCharType="separate"/></w:r>'
+                '<w:r><w:t>1</w:t></w:r><w:r><w:fldChar w:fldCharType="end"/></w:r></w:p>')
+        paragraphs, state = self.scan(body)
+        self.assertEqual(paragraphs, ["секрет", "1"])
+        self.assertEqual(state.highlights, set())
+        self.assertFalse(state.has_comments)
+
+    def test_highlight_and_comments(self):
+        body = ('<w:p><w:commentRangeStart w:id="0"/><w:r><w:rPr><w:highlight w:val="yellow"/></w:rPr>'
+                '<w:t>текст</w:t></w:r></w:p>')
+        _, state = self.scan(body)
+        self.assertEqual(state.highlights, {'yellow'})
+        self.assertTrue(state.has_comments)
+
+    def test_run_shading_counts_as_highlight(self):
+        body = '<w:p><w:r><w:rPr><w:shd w:val="clear" w:color="auto" w:fill="FFFF00"/></w:rPr><w:t>x</w:t></w:r></w:p>'
+        _, state = self.scan(body)
+        self.assertEqual(state.highlights, {'yellow'})
+
+    def test_table_and_paragraph_shading_is_not_highlight(self):
+        # Оформление шапки таблицы (синий и зеленый цвета темы Office) и заливка абзаца
+        body = ('<w:tbl><w:tr><w:tc><w:tcPr><w:shd w:val="clear" w:fill="4472C4"/></w:tcPr>'
+                '<w:p><w:r><w:t>Шапка</w:t></w:r></w:p></w:tc>'
+                '<w:tc><w:tcPr><w:shd w:val="clear" w:fill="70AD47"/></w:tcPr><w:p/></w:tc></w:tr></w:tbl>'
+                '<w:p><w:pPr><w:shd w:val="clear" w:fill="FF0000"/>'
+                '<w:rPr><w:shd w:val="clear" w:fill="FFFF00"/></w:rPr></w:pPr><w:r><w:t>x</w:t></w:r></w:p>')
+        paragraphs, state = self.scan(body)
+        self.assertEqual(paragraphs, ["Шапка", "x"])
+        self.assertEqual(state.highlights, set())
+
+    def test_style_colors_only_from_text_properties(self):
+        styles = ('<w:style w:styleId="Marked"><w:rPr><w:shd w:val="clear" w:fill="FFFF00"/></w:rPr></w:style>'
+                  '<w:style w:styleId="MarkedChild"><w:basedOn w:val="Marked"/></w:style>'
+                  '<w:style w:styleId="Header"><w:pPr><w:shd w:val="clear" w:fill="4472C4"/></w:pPr></w:style>'
+                  '<w:style w:styleId="Grid"><w:tblPr><w:shd w:val="clear" w:fill="70AD47"/></w:tblPr></w:style>')
+        style_colors = parse_word_styles(styles_xml(styles))
+        self.assertEqual(style_colors, {'Marked': 'yellow', 'MarkedChild': 'yellow'})
+
+        _, state = self.scan('<w:p><w:pPr><w:pStyle w:val="MarkedChild"/></w:pPr><w:r><w:t>x</w:t></w:r></w:p>',
+                             style_colors)
+        self.assertEqual(state.highlights, {'yellow'})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import os
+import tempfile
+import unittest
+
+from app.core.file_utils import iter_files_to_check
+
+EXTENSIONS = ['.docx', '.xls']
+
+class DirectoryWalkTest(unittest.TestCase):
+    """Параллельный обход папок с поиском файлов для проверки"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.root = self.directory.name
+        for relative in ('a.docx', 'b.XLS', 'c.txt', '~$a.docx', 'sub/d.docx', 'sub/deep/e.xls',
+                         'skip/f.docx', 'other/g.docx'):
+            path = os.path.join(self.root, *relative.split('/'))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as file:
+                file.write(b'x' * len(relative))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def walk(self, path=None, **kwargs):
+        # Пути возвращаются с обратными слешами (см. normalize_path)
+        return sorted(os.path.relpath(found.path.replace('\\', '/'), self.root.replace('\\', '/')).replace(os.sep, '/')
+                      for found in iter_files_to_check(path or self.root, EXTENSIONS, **kwargs))
+
+    def test_finds_files_recursively(self):
+        self.assertEqual(self.walk(), ['a.docx', 'b.XLS', 'other/g.docx', 'skip/f.docx', 'sub/d.docx', 'sub/deep/e.xls'])
+
+    def test_sizes_come_from_directory_entries(self):
+        sizes = {os.path.basename(found.path.replace('\\', '/')): found.size
+                 for found in iter_files_to_check(self.root, EXTENSIONS)}
+        self.assertEqual(sizes['e.xls'], len('sub/deep/e.xls'))
+
+    def test_excluded_dirs_by_name_and_path(self):
+        self.assertNotIn('skip/f.docx', self.walk(excluded_dirs=['skip']))
+        excluded = self.walk(excluded_dirs=[os.path.join(self.root, 'other')])
+        self.assertNotIn('other/g.docx', excluded)
+        self.assertIn('skip/f.docx', excluded)
+
+    @unittest.skipUnless(hasattr(os, 'symlink'), "нет символических ссылок")
+    def test_symlink_cycle_is_walked_once(self):
+        try:
+            os.symlink(self.root, os.path.join(self.root, 'sub', 'loop'), target_is_directory=True)
+            os.symlink(os.path.join(self.root, 'sub'), os.path.join(self.root, 'alias'), target_is_directory=True)
+        except OSError:
+            self.skipTest("создание ссылок недоступно")
+
+        found = self.walk()
+        self.assertEqual(len(found), 6)
+        self.assertEqual(len({os.path.basename(path) for path in found}), 6)
+        self.assertEqual(len(self.walk(follow_links=False)), 6)
+
+    def test_file_list(self):
+        paths = '|||'.join(os.path.join(self.root, name) for name in ('a.docx', 'c.txt', '~$a.docx'))
+        self.assertEqual(self.walk(paths), ['a.docx'])
+
+if __name__ == '__main__':
+    unittest.main()
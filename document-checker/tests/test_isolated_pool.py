@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import multiprocessing
+import os
+import time
+import unittest
+from unittest import mock
+
+from app.core import isolated_pool
+from app.core.check_runner import CheckPlan
+from app.core.isolated_pool import IsolatedWorkerPool
+from app.utils.threading_utils import report_phase
+
+def fake_check_files_chunk(chunk, plan, on_result=None):
+    """
+    Проверка порции в процессе-исполнителе без разбора файлов: файл 'hang'
+    зависает на этапе 'чтение листа', файл 'crash' завершает процесс.
+    """
+    for file_index, file_path, file_size in chunk:
+        if 'hang' in file_path:
+            report_phase("чтение листа")
+            time.sleep(60)
+        if 'crash' in file_path:
+            os._exit(1)
+        on_result(file_index, file_path, {'file_path': file_path, 'result': "Пройден", 'comment': ""})
+
+@unittest.skipUnless('fork' in multiprocessing.get_all_start_methods(),
+                     "подмена проверки передается процессам только при fork")
+class IsolatedWorkerPoolTest(unittest.TestCase):
+    """Восстановление пула после тайм-аута и аварийного завершения процесса"""
+
+    def setUp(self):
+        patcher = mock.patch.object(isolated_pool, 'check_files_chunk', fake_check_files_chunk)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.pool = IsolatedWorkerPool(1)
+        # Подмена проверки должна попасть в процессы-исполнители
+        self.pool._context = multiprocessing.get_context('fork')
+        self.addCleanup(self.pool.shutdown)
+
+    def check(self, names, plan):
+        chunk = [(file_index, name, None) for file_index, name in enumerate(names)]
+        results = self.pool.submit_chunk(chunk, plan).result(timeout=20)
+        return [(file_index, result['result']) for file_index, file_path, result in results]
+
+    def test_chunk_results(self):
+        self.assertEqual(self.check(['a.docx', 'b.xlsx'], CheckPlan()), [(0, "Пройден"), (1, "Пройден")])
+
+    def test_timeout_kills_worker_and_continues_chunk(self):
+        plan = CheckPlan(file_timeout=0.5)
+        chunk = [(0, 'a.docx', None), (1, 'hang.docx', None), (2, 'c.docx', None)]
+        results = self.pool.submit_chunk(chunk, plan).result(timeout=20)
+
+        self.assertEqual([(file_index, result['result']) for file_index, file_path, result in results],
+                         [(0, "Пройден"), (1, "Тайм-аут"), (2, "Пройден")])
+        self.assertIn("этап: чтение листа", results[1][2]['comment'])
+        # Пул остается пригодным для следующих порций
+        self.assertEqual(self.check(['d.docx'], plan), [(0, "Пройден")])
+
+    def test_crashed_worker_is_replaced(self):
+        results = self.check(['crash.xlsx', 'b.xlsx'], CheckPlan())
+        self.assertEqual(results, [(0, "Ошибка"), (1, "Пройден")])
+        self.assertEqual(self.check(['c.xlsx'], CheckPlan()), [(0, "Пройден")])
+
+    def test_cancelled_chunk_stops_worker(self):
+        future = self.pool.submit_chunk([(0, 'hang.docx', None)], CheckPlan())
+        time.sleep(0.5)
+        self.assertTrue(future.cancel())
+        self.assertEqual(self.check(['a.docx'], CheckPlan()), [(0, "Пройден")])
+
+if __name__ == '__main__':
+    unittest.main()
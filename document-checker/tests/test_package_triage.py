@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import unittest
+
+from app.core.package_triage import read_part_rels, resolve_rel_target, triage_package
+from tests.fixtures import OFFICE_REL_NS, RELATIONSHIPS_NS, build_docx, open_package
+
+COMMENTS_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.wordprocessingml.comments+xml'
+
+def content_types(*parts):
+    overrides = ''.join(f'<Override PartName="/{name}" ContentType="{COMMENTS_CONTENT_TYPE}"/>' for name in parts)
+    return f'<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">{overrides}</Types>'
+
+def document_rels(*targets):
+    return f'<Relationships xmlns="{RELATIONSHIPS_NS}">' + ''.join(
+        f'<Relationship Id="rId{index}" Type="{OFFICE_REL_NS}/comments" Target="{target}"/>'
+        for index, target in enumerate(targets, 1)) + '</Relationships>'
+
+class PackageTriageTest(unittest.TestCase):
+    """Предварительная проверка пакета по метаданным"""
+
+    def triage(self, extra_parts):
+        with open_package(build_docx('<w:p/>', extra_parts=extra_parts)) as package:
+            return triage_package(package)
+
+    def test_referenced_comments_part(self):
+        triage = self.triage({
+            '[Content_Types].xml': content_types('word/comments.xml'),
+            'word/_rels/document.xml.rels': document_rels('comments.xml'),
+            'word/comments.xml': '<w:comments/>'
+        })
+        self.assertEqual(triage.comment_parts, ['word/comments.xml'])
+        self.assertEqual(triage.issues, ["комментарии"])
+        self.assertTrue(triage.is_decided(first_issue_only=True))
+        self.assertFalse(triage.is_decided(first_issue_only=True, need_content=True))
+        self.assertFalse(triage.is_decided())
+
+    def test_orphan_comments_part_is_ignored(self):
+        # Часть с типом комментариев есть, но связи документа на нее не ссылаются
+        triage = self.triage({
+            '[Content_Types].xml': content_types('word/comments.xml'),
+            'word/_rels/document.xml.rels': document_rels(),
+            'word/comments.xml': '<w:comments/>'
+        })
+        self.assertEqual(triage.issues, [])
+
+    def test_content_types_without_relationships(self):
+        triage = self.triage({'[Content_Types].xml': content_types('word/comments.xml'), 'word/comments.xml': ''})
+        self.assertEqual(triage.comment_parts, ['word/comments.xml'])
+
+    def test_relationship_targets(self):
+        self.assertEqual(resolve_rel_target('word/document.xml', 'comments.xml'), 'word/comments.xml')
+        self.assertEqual(resolve_rel_target('xl/worksheets/sheet1.xml', '../comments1.xml'), 'xl/comments1.xml')
+        self.assertEqual(resolve_rel_target('xl/workbook.xml', '/xl/styles.xml'), 'xl/styles.xml')
+
+        with open_package(build_docx('<w:p/>', extra_parts={'word/_rels/document.xml.rels': document_rels('c.xml')})) as package:
+            self.assertEqual(read_part_rels(package, 'word/document.xml'), [(f'{OFFICE_REL_NS}/comments', 'word/c.xml')])
+
+if __name__ == '__main__':
+    unittest.main()
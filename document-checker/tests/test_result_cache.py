@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from app.core.result_cache import ResultCache
+
+def make_result(path, result="Не пройден", comment="Найдено: комментарии"):
+    return {'file_name': os.path.basename(path), 'file_type': "Word", 'file_path': path,
+            'result': result, 'comment': comment}
+
+class ResultCacheTest(unittest.TestCase):
+    """Кэш результатов проверки между запусками"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.directory.name, 'cache.sqlite')
+        self.file_path = os.path.join(self.directory.name, 'docs', 'report.docx')
+        self.cache = ResultCache(self.db_path)
+
+    def tearDown(self):
+        self.cache.close()
+        self.directory.cleanup()
+
+    def reopen(self):
+        self.cache.close()
+        self.cache = ResultCache(self.db_path)
+
+    def test_hit_after_flush_and_reopen(self):
+        self.cache.store(self.file_path, 100, 1.5, 'plan', make_result(self.file_path))
+        # До записи результат не виден
+        self.assertIsNone(self.cache.lookup(self.file_path, 100, 1.5, 'plan'))
+        self.reopen()
+
+        cached = self.cache.lookup(self.file_path, 100, 1.5, 'plan')
+        self.assertEqual(cached['result'], "Не пройден")
+        self.assertEqual(cached['comment'], "Найдено: комментарии")
+        self.assertTrue(cached['note'].startswith("Из кэша"))
+
+    def test_invalidated_by_size_mtime_and_settings(self):
+        self.cache.store(self.file_path, 100, 1.5, 'plan', make_result(self.file_path))
+        self.cache.flush()
+
+        self.assertIsNone(self.cache.lookup(self.file_path, 101, 1.5, 'plan'))
+        self.assertIsNone(self.cache.lookup(self.file_path, 100, 2.5, 'plan'))
+        self.assertIsNone(self.cache.lookup(self.file_path, 100, 1.5, 'other plan'))
+
+        # Новый результат того же файла заменяет прежний
+        self.cache.store(self.file_path, 200, 3.0, 'plan', make_result(self.file_path, "Пройден", "Проблем не обнаружено"))
+        self.cache.flush()
+        self.assertIsNone(self.cache.lookup(self.file_path, 100, 1.5, 'plan'))
+        self.assertEqual(self.cache.lookup(self.file_path, 200, 3.0, 'plan')['result'], "Пройден")
+
+    def test_key_is_normalized(self):
+        self.cache.store(self.file_path, 100, 1.5, 'plan', make_result(self.file_path))
+        self.cache.flush()
+        other_spelling = os.path.join(self.directory.name, 'docs', '..', 'docs', '.', 'report.docx')
+        self.assertIsNotNone(self.cache.lookup(other_spelling, 100, 1.5, 'plan'))
+
+    def test_temporary_results_are_not_cached(self):
+        for result in ("Ошибка", "Пропущен", "Тайм-аут", "Предупреждение"):
+            self.cache.store(self.file_path, 100, 1.5, result, make_result(self.file_path, result))
+        self.cache.flush()
+        for result in ("Ошибка", "Пропущен", "Тайм-аут", "Предупреждение"):
+            self.assertIsNone(self.cache.lookup(self.file_path, 100, 1.5, result))
+
+    def test_legacy_uncacheable_rows_are_purged(self):
+        # Предупреждение, сохраненное прежней версией кэша
+        self.cache.close()
+        connection = sqlite3.connect(self.db_path)
+        connection.execute("INSERT INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                           (ResultCache._key(self.file_path), 100, 1.5, 'plan', "Word", "Предупреждение",
+                            "Office не ответил", "01.01.2026 00:00:00"))
+        connection.commit()
+        connection.close()
+
+        self.cache = ResultCache(self.db_path)
+        self.assertIsNone(self.cache.lookup(self.file_path, 100, 1.5, 'plan'))
+
+if __name__ == '__main__':
+    unittest.main()
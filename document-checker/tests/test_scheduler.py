@@ -0,0 +1,47 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import unittest
+
+from app.core.scheduler import (MAX_TASK_FILES, TASK_TARGET_COST, UNKNOWN_SIZE_COST,
+                                CheckScheduler, estimate_cost)
+
+class EstimateCostTest(unittest.TestCase):
+    """Оценка трудоемкости проверки файла"""
+
+    def test_packages_weigh_more(self):
+        for extension in ('.docx', '.docm', '.xlsx', '.xlsm', '.XLSM'):
+            with self.subTest(extension=extension):
+                self.assertEqual(estimate_cost('report' + extension, 1000), 4000)
+        for extension in ('.doc', '.xls'):
+            with self.subTest(extension=extension):
+                self.assertEqual(estimate_cost('report' + extension, 1000), 1000)
+
+    def test_unknown_size(self):
+        self.assertEqual(estimate_cost('report.docx', None), UNKNOWN_SIZE_COST)
+
+    def test_skipped_large_file(self):
+        size = 200 * 1024 * 1024
+        self.assertEqual(estimate_cost('report.docx', size), 0)
+        self.assertEqual(estimate_cost('report.docx', size, skip_large_files=False), size * 4)
+
+class CheckSchedulerTest(unittest.TestCase):
+    """Порядок выдачи файлов на проверку"""
+
+    def test_largest_first(self):
+        scheduler = CheckScheduler()
+        scheduler.add(0, 'small.doc', 10)
+        scheduler.add(1, 'big.xlsm', TASK_TARGET_COST)
+        scheduler.add(2, 'medium.docx', 1000)
+        self.assertEqual(scheduler.take_task(), [(1, 'big.xlsm', TASK_TARGET_COST)])
+        self.assertEqual(scheduler.take_task(), [(2, 'medium.docx', 1000), (0, 'small.doc', 10)])
+        self.assertEqual(len(scheduler), 0)
+
+    def test_task_file_limit(self):
+        scheduler = CheckScheduler()
+        for file_index in range(MAX_TASK_FILES + 1):
+            scheduler.add(file_index, f'{file_index}.doc', 10)
+        self.assertEqual(len(scheduler.take_task()), MAX_TASK_FILES)
+        self.assertEqual(len(scheduler.take_task()), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import unittest
+
+from app.core.value_matcher import ValueMatcher, compile_search_values
+
+class ValueMatcherTest(unittest.TestCase):
+    """Автомат Ахо-Корасик для значений поиска"""
+
+    def test_finds_all_values_in_one_pass(self):
+        matcher = ValueMatcher(["he", "she", "his", "hers"])
+        self.assertEqual(matcher.match("ushers"), frozenset({0, 1, 3}))
+        self.assertEqual(matcher.match("this"), frozenset({2}))
+        self.assertEqual(matcher.match("nothing"), frozenset())
+
+    def test_overlapping_and_nested_values(self):
+        matcher = ValueMatcher(["2023", "023-05", "3"])
+        self.assertEqual(matcher.match("2023-05-01"), frozenset({0, 1, 2}))
+
+    def test_unicode_text_and_bytes(self):
+        matcher = ValueMatcher(["секрет", "ДСП"])
+        self.assertEqual(matcher.match("Гриф ДСП: совсекретно"), frozenset({0, 1}))
+        self.assertEqual(matcher.match("секрет".encode('utf-8')), frozenset({0}))
+        # Регистр учитывается, как и при прежней проверке оператором in
+        self.assertEqual(matcher.match("СЕКРЕТ"), frozenset())
+
+    def test_duplicate_and_empty_values_are_dropped(self):
+        matcher = ValueMatcher(["a", "", "b", "a"])
+        self.assertEqual(matcher.values, ["a", "b"])
+
+    def test_compiled_matcher_is_reused(self):
+        self.assertIs(compile_search_values(["2023", "x"]), compile_search_values(["2023", "x"]))
+
+class ValueSearchTest(unittest.TestCase):
+    """Состояние поиска значений в одном документе"""
+
+    def test_accumulates_and_reports_in_user_order(self):
+        value_search = compile_search_values(["beta", "alpha", "gamma"]).new_search()
+        self.assertFalse(value_search.feed("alpha"))
+        self.assertFalse(value_search.feed("beta"))
+        self.assertEqual(value_search.found_values(), ["beta", "alpha"])
+        self.assertTrue(value_search.add_found({2}))
+        self.assertTrue(value_search.complete)
+
+    def test_continuous_feed_matches_across_fragments(self):
+        value_search = compile_search_values(["секрет"]).new_search()
+        value_search.feed("сек")
+        value_search.feed("рет")
+        self.assertEqual(value_search.found_values(), [])
+
+        value_search.feed("сек")
+        value_search.feed("рет", continuous=True)
+        self.assertEqual(value_search.found_values(), ["секрет"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import os
+import tempfile
+import unittest
+
+from app.core.word_checker import check_word_file
+from tests.fixtures import build_docx
+
+# Стиль символов с красной заливкой текста
+RED_STYLE = '<w:style w:styleId="Alert"><w:rPr><w:shd w:val="clear" w:fill="FF0000"/></w:rPr></w:style>'
+
+class DocxCheckTest(unittest.TestCase):
+    """Проверка документа Word одним потоковым проходом"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def check(self, data, **kwargs):
+        path = os.path.join(self.directory.name, 'test.docx')
+        with open(path, 'wb') as file:
+            file.write(data)
+        return check_word_file(path, 'test.docx', **kwargs)
+
+    def test_literal_highlight_does_not_hide_style_highlight(self):
+        # Прямое желтое выделение в начале документа и красная заливка через стиль символов
+        body = ('<w:p><w:r><w:rPr><w:highlight w:val="yellow"/></w:rPr><w:t>первый</w:t></w:r></w:p>'
+                '<w:p><w:r><w:rPr><w:rStyle w:val="Alert"/></w:rPr><w:t>второй</w:t></w:r></w:p>')
+        result = self.check(build_docx(body, RED_STYLE))
+
+        self.assertEqual(result['result'], "Не пройден")
+        self.assertIn("желтые выделения", result['comment'])
+        self.assertIn("красные выделения", result['comment'])
+
+    def test_values_and_highlights_in_one_pass(self):
+        body = ('<w:p><w:r><w:t>номер 2023-</w:t></w:r><w:r><w:t>05</w:t></w:r></w:p>'
+                '<w:p><w:r><w:rPr><w:highlight w:val="green"/></w:rPr><w:t>x</w:t></w:r></w:p>')
+        result = self.check(build_docx(body), enable_value_search=True, search_values=["2023-05", "нет"])
+
+        self.assertIn("зеленые выделения", result['comment'])
+        self.assertIn("найдены заданные значения: 2023-05", result['comment'])
+
+    def test_clean_document_passes(self):
+        body = ('<w:tbl><w:tr><w:tc><w:tcPr><w:shd w:val="clear" w:fill="4472C4"/></w:tcPr>'
+                '<w:p><w:r><w:t>Шапка</w:t></w:r></w:p></w:tc></w:tr></w:tbl>')
+        result = self.check(build_docx(body))
+        self.assertEqual(result['result'], "Пройден")
+
+if __name__ == '__main__':
+    unittest.main()
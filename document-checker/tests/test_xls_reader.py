@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import os
+import tempfile
+import unittest
+
+from app.core.cfb_reader import CompoundFile
+from app.core.value_matcher import ValueSearch, compile_search_values
+from app.core.xls_reader import scan_xls_workbook
+from tests.fixtures import (XLS_XF_CUSTOM_DATE, XLS_XF_DATE, XLS_XF_PLAIN, build_workbook, sst_header,
+                            sst_string)
+
+class XlsWorkbookScanTest(unittest.TestCase):
+    """Разбор книги Excel 97-2003 (BIFF8)"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def scan(self, data, search_values=None):
+        path = os.path.join(self.directory.name, 'test.xls')
+        with open(path, 'wb') as file:
+            file.write(data)
+        value_search = ValueSearch(compile_search_values(search_values)) if search_values else None
+        with CompoundFile(path) as compound_file:
+            return scan_xls_workbook(compound_file, value_search), value_search
+
+    def test_sst_strings_split_by_continue(self):
+        fragments = [
+            sst_string("alpha", False) + sst_header(6, True) + "се".encode('utf-16-le'),
+            # Продолжение строки: байт флагов, затем оставшиеся символы UTF-16
+            b'\x01' + "крет".encode('utf-16-le') + sst_header(10, True) + "valu".encode('utf-16-le'),
+            # Продолжение той же строки однобайтовыми символами
+            b'\x00' + b"e 2024"
+        ]
+        scan, value_search = self.scan(build_workbook("Лист1", fragments, 3, [0, 1, 2]),
+                                       ["секрет", "value 2024", "alpha"])
+
+        self.assertEqual(scan.sheet_names, ["Лист1"])
+        self.assertEqual(sorted(value_search.found_values()), ["alpha", "value 2024", "секрет"])
+
+    def test_only_referenced_strings_are_found(self):
+        fragments = [sst_string("alpha", False) + sst_string("beta", False)]
+        scan, value_search = self.scan(build_workbook("Data", fragments, 2, [1]), ["alpha", "beta"])
+        self.assertEqual(value_search.found_values(), ["beta"])
+
+    def test_flagged_cells_and_notes(self):
+        fragments = [sst_string("text", False)]
+        scan, _ = self.scan(build_workbook("Data", fragments, 1, [0], yellow_xf=True, notes=2))
+
+        self.assertTrue(scan.has_flagged_cells)
+        self.assertEqual([(item.sheet_name, item.notes) for item in scan.sheet_comments], [("Data", 2)])
+
+        scan, _ = self.scan(build_workbook("Data", fragments, 1, [0]))
+        self.assertFalse(scan.has_flagged_cells)
+        self.assertEqual(scan.sheet_comments, [])
+
+    def test_date_cells_are_searched_as_date_text(self):
+        fragments = [sst_string("text", False)]
+        # 45047 - 01.05.2023 (RK), 45047.75 - 01.05.2023 18:00 (NUMBER), 2023 - обычное число
+        numbers = [(45047, XLS_XF_DATE), (45047.75, XLS_XF_CUSTOM_DATE), (2023, XLS_XF_PLAIN)]
+        workbook = build_workbook("Data", fragments, 1, [0], numbers=numbers)
+
+        _, value_search = self.scan(workbook, ["2023-05-01 00:00:00", "2023-05-01 18:00:00", "2023", "45047"])
+        self.assertEqual(value_search.found_values(), ["2023-05-01 00:00:00", "2023-05-01 18:00:00", "2023"])
+
+        # В системе дат 1904 то же число - на 1462 дня позже
+        workbook = build_workbook("Data", fragments, 1, [0], numbers=numbers[:1], date1904=True)
+        _, value_search = self.scan(workbook, ["2027-05-02"])
+        self.assertEqual(value_search.found_values(), ["2027-05-02"])
+
+    def test_rejects_encrypted_workbook(self):
+        fragments = [sst_string("text", False)]
+        with self.assertRaisesRegex(ValueError, "зашифрована"):
+            self.scan(build_workbook("Data", fragments, 1, [0], encrypted=True))
+
+if __name__ == '__main__':
+    unittest.main()
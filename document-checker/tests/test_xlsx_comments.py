@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import unittest
+
+from app.core.xlsx_comments import find_sheet_comments
+from app.core.xlsx_stream import read_sheet_parts
+from tests.fixtures import OFFICE_REL_NS, RELATIONSHIPS_NS, SPREADSHEET_NS, build_xlsx, open_package
+
+THREADED_NS = 'http://schemas.microsoft.com/office/spreadsheetml/2018/threadedcomments'
+THREADED_REL_TYPE = 'http://schemas.microsoft.com/office/2017/10/relationships/threadedComment'
+
+def sheet_rels(*rels):
+    return f'<Relationships xmlns="{RELATIONSHIPS_NS}">' + ''.join(
+        f'<Relationship Id="rId{index}" Type="{rel_type}" Target="{target}"/>'
+        for index, (rel_type, target) in enumerate(rels, 1)) + '</Relationships>'
+
+def notes_part(count):
+    comments = ''.join(f'<comment ref="A{index}"><text><t>n</t></text></comment>' for index in range(1, count + 1))
+    return f'<comments xmlns="{SPREADSHEET_NS}"><commentList>{comments}</commentList></comments>'
+
+class XlsxSheetCommentsTest(unittest.TestCase):
+    """Примечания и комментарии листов по связям листов"""
+
+    def sheet_comments(self, extra_parts, sheet_count=2):
+        sheets = [(f"Лист{index}", '<sheetData/>') for index in range(1, sheet_count + 1)]
+        with open_package(build_xlsx(sheets, extra_parts=extra_parts)) as package:
+            return [(item.sheet_name, item.notes, item.threaded_comments)
+                    for item in find_sheet_comments(package, read_sheet_parts(package))]
+
+    def test_notes_per_sheet(self):
+        parts = {
+            'xl/worksheets/_rels/sheet2.xml.rels': sheet_rels((f'{OFFICE_REL_NS}/comments', '../comments1.xml')),
+            'xl/comments1.xml': notes_part(3)
+        }
+        self.assertEqual(self.sheet_comments(parts), [("Лист2", 3, 0)])
+
+    def test_threaded_comments_replace_placeholder_notes(self):
+        # Цепочка из комментария и ответа; Excel сохраняет для нее примечание-заглушку
+        threaded = (f'<ThreadedComments xmlns="{THREADED_NS}">'
+                    '<threadedComment ref="A1" id="{1}"><text>вопрос</text></threadedComment>'
+                    '<threadedComment ref="A1" id="{2}" parentId="{1}"><text>ответ</text></threadedComment>'
+                    '</ThreadedComments>')
+        parts = {
+            'xl/worksheets/_rels/sheet1.xml.rels': sheet_rels((f'{OFFICE_REL_NS}/comments', '../comments1.xml'),
+                                                              (THREADED_REL_TYPE, '../threadedComments/tc1.xml')),
+            'xl/comments1.xml': notes_part(2),
+            'xl/threadedComments/tc1.xml': threaded
+        }
+        self.assertEqual(self.sheet_comments(parts), [("Лист1", 1, 2)])
+
+    def test_vml_notes_without_comments_part(self):
+        vml = '<xml><v:shape><x:ClientData ObjectType="Note"/></v:shape><v:shape><x:ClientData ObjectType="Drop"/></v:shape>'
+        parts = {
+            'xl/worksheets/_rels/sheet1.xml.rels': sheet_rels((f'{OFFICE_REL_NS}/vmlDrawing', '../drawings/vml1.vml')),
+            'xl/drawings/vml1.vml': vml
+        }
+        self.assertEqual(self.sheet_comments(parts), [("Лист1", 1, 0)])
+
+    def test_orphan_comments_part_is_ignored(self):
+        self.assertEqual(self.sheet_comments({'xl/comments1.xml': notes_part(1)}), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import unittest
+
+from app.core.value_matcher import compile_search_values
+from app.core.xlsx_search import search_workbook_values
+from app.core.xlsx_stream import read_sheet_parts
+from tests.fixtures import build_xlsx, open_package
+
+# Стили: 0 - общий формат, 1 - встроенный формат даты, 2 - собственный формат даты, 3 - число
+DATE_STYLES = (
+    '<numFmts count="2"><numFmt numFmtId="164" formatCode="dd/mm/yyyy\\ hh:mm"/>'
+    '<numFmt numFmtId="165" formatCode="0.00&quot;d&quot;"/></numFmts>'
+    '<cellXfs count="4"><xf numFmtId="0"/><xf numFmtId="14"/><xf numFmtId="164"/><xf numFmtId="165"/></cellXfs>'
+)
+
+class XlsxValueSearchTest(unittest.TestCase):
+    """Потоковый поиск значений в книге Excel"""
+
+    def search(self, data, search_values):
+        value_search = compile_search_values(search_values).new_search()
+        with open_package(data) as package:
+            search_workbook_values(package, read_sheet_parts(package), value_search)
+        return value_search.found_values()
+
+    def test_shared_inline_and_number_cells(self):
+        sheet = ('<sheetData><row r="1">'
+                 '<c r="A1" t="s"><v>1</v></c>'
+                 '<c r="B1" t="inlineStr"><is><r><t>сек</t></r><r><t>рет</t></r></is></c>'
+                 '<c r="C1"><v>15.5</v></c>'
+                 '<c r="D1" t="b"><v>1</v></c>'
+                 '</row></sheetData>')
+        data = build_xlsx([("Лист1", sheet)], shared_strings=["alpha", "beta"])
+
+        self.assertEqual(self.search(data, ["alpha", "beta", "секрет", "15.5", "1"]), ["beta", "секрет", "15.5", "1"])
+        self.assertEqual(self.search(data, ["alpha"]), [])
+
+    def test_date_cells_are_searched_as_date_text(self):
+        # 45047 - 01.05.2023; 45047.5 - 01.05.2023 12:00
+        sheet = ('<sheetData><row r="1">'
+                 '<c r="A1" s="1"><v>45047</v></c>'
+                 '<c r="B1" s="2"><v>45047.5</v></c>'
+                 '<c r="C1" s="3"><v>2023</v></c>'
+                 '</row></sheetData>')
+        data = build_xlsx([("Лист1", sheet)], styles=DATE_STYLES)
+
+        self.assertEqual(self.search(data, ["2023-05-01 00:00:00", "2023-05-01 12:00:00"]),
+                         ["2023-05-01 00:00:00", "2023-05-01 12:00:00"])
+        # Серийный номер даты в тексте ячейки не участвует
+        self.assertEqual(self.search(data, ["45047"]), [])
+
+    def test_default_year_matches_date_cell(self):
+        sheet = '<sheetData><row r="1"><c r="A1" s="1"><v>45047</v></c></row></sheetData>'
+        data = build_xlsx([("Лист1", sheet)], styles=DATE_STYLES)
+        self.assertEqual(self.search(data, ["2023"]), ["2023"])
+
+        # Та же дата в системе 1904 сдвинута на 1462 дня
+        data = build_xlsx([("Лист1", sheet)], styles=DATE_STYLES, workbook_pr='date1904="1"')
+        self.assertEqual(self.search(data, ["2027-05-02"]), ["2027-05-02"])
+
+    def test_shared_strings_part_from_relationships(self):
+        sheet = '<sheetData><row r="1"><c r="A1" t="s"><v>0</v></c></row></sheetData>'
+        data = build_xlsx([("Лист1", sheet)], shared_strings=["alpha"], shared_strings_part='xl/strings.xml')
+        self.assertEqual(self.search(data, ["alpha"]), ["alpha"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import unittest
+
+from app.core.colors import RED, YELLOW
+from app.core.xlsx_stream import find_colored_tabs, read_sheet_parts, sheet_has_flagged_cells
+from app.core.xlsx_styles import load_flagged_styles, load_workbook_colors
+from tests.fixtures import build_xlsx, open_package
+
+# Заливки: 0 - нет, 1 - серый узор (обязателен по спецификации), 2 - желтый RGB,
+# 3 - желтый индексный, 4 - голубой RGB, 5 - желтый RGB без узора
+FILLS = (
+    '<fills count="6">'
+    '<fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill>'
+    '<fill><patternFill patternType="solid"><fgColor rgb="FFFFFF00"/></patternFill></fill>'
+    '<fill><patternFill patternType="solid"><fgColor indexed="13"/></patternFill></fill>'
+    '<fill><patternFill patternType="solid"><fgColor rgb="FF9BC2E6"/></patternFill></fill>'
+    '<fill><patternFill patternType="none"><fgColor rgb="FFFFFF00"/></patternFill></fill>'
+    '</fills>'
+)
+CELL_XFS = ('<cellXfs count="6"><xf fillId="0"/><xf fillId="2"/><xf fillId="3"/>'
+            '<xf fillId="4"/><xf fillId="5"/><xf fillId="1"/></cellXfs>')
+
+class XlsxFlaggedCellsTest(unittest.TestCase):
+    """Желтые ячейки книги Excel: стили по styles.xml и потоковый просмотр листов"""
+
+    def has_flagged_cells(self, sheet_data, styles=FILLS + CELL_XFS):
+        with open_package(build_xlsx([("Лист1", sheet_data)], styles=styles)) as package:
+            flagged_xfs = load_flagged_styles(package)
+            (_, sheet_part), = read_sheet_parts(package)
+            with package.open(sheet_part) as stream:
+                return flagged_xfs, sheet_has_flagged_cells(stream, flagged_xfs)
+
+    def test_flagged_styles_from_rgb_and_indexed_fills(self):
+        flagged_xfs, _ = self.has_flagged_cells('<sheetData/>')
+        self.assertEqual(flagged_xfs, {1, 2})
+
+    def test_indexed_palette_override(self):
+        # Переопределенная палитра: индекс 13 становится синим
+        styles = '<colors><indexedColors>' + '<rgbColor rgb="FF000000"/>' * 13 + \
+                 '<rgbColor rgb="FF0000FF"/></indexedColors></colors>' + FILLS + CELL_XFS
+        flagged_xfs, _ = self.has_flagged_cells('<sheetData/>', styles)
+        self.assertEqual(flagged_xfs, {1})
+
+    def test_cell_with_flagged_style(self):
+        sheet = '<sheetData><row r="1"><c r="A1" s="3"/><c r="B1" s="2"><v>1</v></c></row></sheetData>'
+        self.assertTrue(self.has_flagged_cells(sheet)[1])
+
+    def test_row_style_counts_only_with_custom_format(self):
+        self.assertFalse(self.has_flagged_cells('<sheetData><row r="1" s="1"/></sheetData>')[1])
+        self.assertTrue(self.has_flagged_cells('<sheetData><row r="1" s="1" customFormat="1"/></sheetData>')[1])
+
+    def test_column_style(self):
+        # У столбцов стиль задается атрибутом style
+        self.assertTrue(self.has_flagged_cells('<cols><col min="1" max="3" style="1"/></cols><sheetData/>')[1])
+        self.assertFalse(self.has_flagged_cells('<cols><col min="1" max="3" style="3"/></cols><sheetData/>')[1])
+
+    def test_sheet_without_flagged_styles(self):
+        sheet = '<sheetData><row r="1"><c r="A1" s="3"/><c r="B1" s="4"/><c r="C1" s="5"/></row></sheetData>'
+        self.assertFalse(self.has_flagged_cells(sheet)[1])
+
+# Тема книги: accent4 (индекс 7) - желтый
+THEME = ('<a:theme xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main"><a:themeElements>'
+         '<a:clrScheme name="Office"><a:dk1><a:sysClr val="windowText" lastClr="000000"/></a:dk1>'
+         '<a:lt1><a:sysClr val="window" lastClr="FFFFFF"/></a:lt1><a:dk2><a:srgbClr val="44546A"/></a:dk2>'
+         '<a:lt2><a:srgbClr val="E7E6E6"/></a:lt2><a:accent1><a:srgbClr val="4472C4"/></a:accent1>'
+         '<a:accent2><a:srgbClr val="ED7D31"/></a:accent2><a:accent3><a:srgbClr val="A5A5A5"/></a:accent3>'
+         '<a:accent4><a:srgbClr val="FFC000"/></a:accent4></a:clrScheme></a:themeElements></a:theme>')
+
+class XlsxTabColorTest(unittest.TestCase):
+    """Цвета вкладок листов по заголовкам частей листов"""
+
+    def colored_tabs(self, sheets, **kwargs):
+        data = build_xlsx(sheets, extra_parts={'xl/theme/theme1.xml': THEME})
+        with open_package(data) as package:
+            return find_colored_tabs(package, load_workbook_colors(package), (YELLOW, RED), **kwargs)
+
+    def test_rgb_theme_and_missing_tab_colors(self):
+        sheets = [
+            ("Желтый", '<sheetPr><tabColor rgb="FFFFFF00"/></sheetPr><sheetData/>'),
+            ("Тема", '<sheetPr codeName="x"><tabColor theme="7"/></sheetPr><sheetData/>'),
+            ("Синий", '<sheetPr><tabColor rgb="FF0070C0"/></sheetPr><sheetData/>'),
+            ("Без заголовка", '<dimension ref="A1"/><sheetData/>'),
+            ("Без цвета", '<sheetPr><pageSetUpPr fitToPage="1"/></sheetPr><sheetData/>'),
+            ("Красный", '<sheetPr><tabColor indexed="10"/></sheetPr><sheetData/>')
+        ]
+        self.assertEqual(self.colored_tabs(sheets), [("Желтый", YELLOW), ("Тема", YELLOW), ("Красный", RED)])
+        self.assertEqual(self.colored_tabs(sheets, first_only=True), [("Желтый", YELLOW)])
+
+    def test_only_sheet_header_is_read(self):
+        # Данные листа после заголовка повреждены: разбор прекращается раньше
+        sheet = '<sheetPr><tabColor rgb="FFFF0000"/></sheetPr><sheetData><row><c><v>1</broken>'
+        header_only = '<dimension ref="A1"/><sheetData><row><c><v>1</broken>'
+        self.assertEqual(self.colored_tabs([("Лист1", sheet), ("Лист2", header_only)]), [("Лист1", RED)])
+
+if __name__ == '__main__':
+    unittest.main()
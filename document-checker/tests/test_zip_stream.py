@@ -0,0 +1,37 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import io
+import unittest
+from zipfile import ZIP_DEFLATED, ZipFile
+
+from app.core.zip_stream import iter_member_chunks
+
+class MemberChunksTest(unittest.TestCase):
+    """Порционная распаковка части ZIP-архива"""
+
+    def setUp(self):
+        self.data = bytes(range(256)) * 100
+        buffer = io.BytesIO()
+        with ZipFile(buffer, 'w', ZIP_DEFLATED) as package:
+            package.writestr('part.bin', self.data)
+        self.package = ZipFile(io.BytesIO(buffer.getvalue()))
+
+    def tearDown(self):
+        self.package.close()
+
+    def test_whole_member_in_chunks(self):
+        chunks = list(iter_member_chunks(self.package, 'part.bin', chunk_size=4096))
+        self.assertEqual(b''.join(chunks), self.data)
+        self.assertTrue(all(len(chunk) == 4096 for chunk in chunks[:-1]))
+
+    def test_byte_budget(self):
+        chunks = list(iter_member_chunks(self.package, 'part.bin', chunk_size=4096, max_bytes=5000))
+        self.assertEqual([len(chunk) for chunk in chunks], [4096, 904])
+        self.assertEqual(b''.join(chunks), self.data[:5000])
+
+    def test_missing_member(self):
+        with self.assertRaises(KeyError):
+            next(iter_member_chunks(self.package, 'missing.bin'))
+
+if __name__ == '__main__':
+    unittest.main()